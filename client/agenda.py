@@ -12,19 +12,42 @@
 
 import time
 import gc
+import json
 import displayio
-import traceback
 
 from vectorio import Rectangle
-from adafruit_display_text import label
-from adafruit_display_shapes.line import Line
-from adafruit_bitmap_font import bitmap_font
 
 from ui_settings import UI_SETTINGS, COLORS, UI_COLOR_MAP, UI_PALETTE
-from frame import Frame
 
 from settings import app_config
 
+# characters used by the client in addition to the data (per font-role)
+STATIC_GLYPHS = {
+  "time":   "23:59",
+  "text":   "Mg",
+  "status": "Updated: Offline since 0123456789.V/"
+  }
+
+# compressed transfer needs zlib (not available on all ports)
+try:
+  import zlib
+  HEADERS = {"Accept-Encoding": "deflate"}
+except ImportError:
+  zlib    = None
+  HEADERS = None
+
+# Note: library-imports (fonts, labels, frame) are deferred to the phase
+# that actually needs them. This keeps startup-time low.
+
+# font-roles and font-files (loading order)
+FONTS = [
+  ("time",   UI_SETTINGS.TIME_FONT),
+  ("text",   UI_SETTINGS.TEXT_FONT),
+  ("day",    UI_SETTINGS.DAY_FONT),
+  ("date",   UI_SETTINGS.DATE_FONT),
+  ("status", UI_SETTINGS.STATUS_FONT)
+  ]
+
 # --- Agenda Class for layout   ----------------------------------------------
 
 class Agenda:
@@ -35,13 +58,33 @@ class Agenda:
     """ constructor: create ressources """
 
     self._view        = None
-    self._time_font   = bitmap_font.load_font(UI_SETTINGS.TIME_FONT)
-    self._text_font   = bitmap_font.load_font(UI_SETTINGS.TEXT_FONT)
+    self._frame       = None
+    self._fonts       = {}
+    self._header_key  = None
+    self._header_h    = 0
+    self._events_key  = None
     self._margin      = UI_SETTINGS.MARGIN
     self._padding     = UI_SETTINGS.PADDING
     self._display     = None
     self._data        = None
     self._wifi        = None
+    self._cache       = None
+    self._store       = None
+    self._profiler    = None
+    self._page        = 0
+    self._page_info   = None
+    self._bat_level   = 0.0
+    self.offline      = False
+
+  # --- load font for given role   -------------------------------------------
+
+  def _load_font(self,role,fontfile):
+    """ load font (once) """
+    if not role in self._fonts:
+      self._begin(f"font {role}")
+      from adafruit_bitmap_font import bitmap_font
+      self._fonts[role] = bitmap_font.load_font(fontfile)
+      self._end(f"font {role}")
 
   # --- set wifi-object   ----------------------------------------------------
 
@@ -49,6 +92,42 @@ class Agenda:
     """ set wifi-object """
     self._wifi   = wifi
 
+  # --- set state-store   ----------------------------------------------------
+
+  def set_store(self,store):
+    """ set state-store (keeps the current page) """
+    self._store = store
+    self._page  = store.get("agenda_page","<B",(0,))[0]
+
+  # --- set heap-profiler   -------------------------------------------------
+
+  def set_profiler(self,profiler):
+    """ set heap-profiler (app_config.heap_profile) """
+    self._profiler = profiler
+
+  def _begin(self,name):
+    """ start phase of the heap-profiler """
+    if self._profiler:
+      self._profiler.begin(name)
+
+  def _end(self,name):
+    """ end phase of the heap-profiler """
+    if self._profiler:
+      self._profiler.end(name)
+
+  def _collect(self,name):
+    """ collect garbage (measured by the heap-profiler) """
+    if self._profiler:
+      self._profiler.collect(name)
+    else:
+      gc.collect()
+
+  # --- set display   --------------------------------------------------------
+
+  def set_display(self,display):
+    """ set display (needed for the geometry before ui-creation) """
+    self._display = display
+
   # --- helper method for debugging   ----------------------------------------
 
   def print_size(self,label,obj):
@@ -60,14 +139,14 @@ class Agenda:
   def _get_day_box(self):
     """ create box with day-number """
 
+    from adafruit_display_text import label
     day_box = displayio.Group()
 
     if self._data["weekday"]:
       bg_color = COLORS.BLACK
     else:
       bg_color = COLORS.RED
-    day_font = bitmap_font.load_font(UI_SETTINGS.DAY_FONT)
-    day = label.Label(day_font,text=self._data["day"],
+    day = label.Label(self._fonts["day"],text=self._data["day"],
                       color=UI_PALETTE[COLORS.WHITE],
                       background_color=UI_PALETTE[bg_color],
                       background_tight=True,
@@ -84,17 +163,19 @@ class Agenda:
 
   # --- create agenda events   -----------------------------------------------
 
-  def _get_events(self):
-    """ create agenda events """
+  def _get_events(self,max_height):
+    """ create agenda events of the current page """
+
+    from adafruit_display_text import label
 
     # each event-box has (up to) four labels. We first measure the maximum
     # sizes needed, then we create the events
-    text = label.Label(self._text_font,
+    text = label.Label(self._fonts["text"],
                        text="Mg",
                        background_tight=True,
                        color=UI_PALETTE[COLORS.BLACK],
                        background_color=UI_PALETTE[COLORS.WHITE])
-    ts = label.Label(self._time_font,
+    ts = label.Label(self._fonts["time"],
                        text="23:59",
                        background_tight=True,
                        color=UI_PALETTE[COLORS.BLACK],
@@ -102,10 +183,12 @@ class Agenda:
     h_box      = 2*max(text.bounding_box[3],ts.bounding_box[3]) + 3*self._padding
     txt_offset = self._margin + ts.bounding_box[2] + self._margin
 
-    # create all agenda-entries
+    # create agenda-entries of the current page
     events = displayio.Group()
+    gc_events = getattr(UI_SETTINGS,"GC_EVENTS",True)
     y = 0
-    for event in self._data["events"]:
+    for n,event in enumerate(self._get_page(h_box,max_height)):
+      self._begin(f"event {n}")
       entry = displayio.Group()
       bg_color,color = UI_COLOR_MAP[event["color"]]
 
@@ -118,7 +201,7 @@ class Agenda:
 
       # create time-info (except for full-day events)
       if not (event["start"] == "00:00" and event["end"] == "23:59"):
-        ts  = label.Label(self._time_font,
+        ts  = label.Label(self._fonts["time"],
                           text=event["start"],
                           background_tight=True,
                           color=UI_PALETTE[color],
@@ -126,7 +209,7 @@ class Agenda:
                           anchor_point=(0,0.5),
                           anchored_position=(self._margin,y+int(0.3*h_box)))
         entry.append(ts)
-        ts  = label.Label(self._time_font,
+        ts  = label.Label(self._fonts["time"],
                           text=event["end"],
                           background_tight=True,
                           color=UI_PALETTE[color],
@@ -136,7 +219,7 @@ class Agenda:
         entry.append(ts)
 
       # create event-info
-      text = label.Label(self._text_font,
+      text = label.Label(self._fonts["text"],
                          text=event["summary"],
                          background_tight=True,
                          color=UI_PALETTE[color],
@@ -145,7 +228,7 @@ class Agenda:
                          anchored_position=(txt_offset,y+int(0.3*h_box)))
       entry.append(text)
       if event["location"]:
-        text = label.Label(self._text_font,
+        text = label.Label(self._fonts["text"],
                            text=event["location"],
                            background_tight=True,
                            color=UI_PALETTE[color],
@@ -156,66 +239,423 @@ class Agenda:
 
       # save entry and advance y-offset
       events.append(entry)
-      gc.collect()
+      if gc_events:
+        self._collect("event")
+      self._end(f"event {n}")
+      y += h_box + self._padding
+
+    return events
+
+  # --- create agenda events (single bitmap)   -------------------------------
+
+  def _get_events_bitmap(self,max_height):
+    """ render agenda events into a single bitmap """
+
+    from text_renderer import BitmapRenderer
+
+    events = displayio.Group()
+
+    # same geometry as _get_events(), but relative to the left margin
+    text_font  = self._fonts["text"]
+    time_font  = self._fonts["time"]
+    text_box   = BitmapRenderer.text_box(text_font,"Mg")
+    ts_box     = BitmapRenderer.text_box(time_font,"23:59")
+    h_box      = (2*max(text_box[0]-text_box[1],ts_box[0]-ts_box[1]) +
+                  3*self._padding)
+    txt_offset = BitmapRenderer.text_width(time_font,"23:59") + self._margin
+    width      = self._display.width - 2*self._margin
+    page       = self._get_page(h_box,max_height)
+    if not page:
+      return events
+    height     = min(len(page)*(h_box+self._padding),max_height)
+    renderer   = BitmapRenderer(width,height,UI_SETTINGS.BACKGROUND)
+
+    y = 0
+    for event in page:
+      bg_color,color = UI_COLOR_MAP[event["color"]]
+      renderer.fill_rect(0,y,width,h_box,bg_color)
+      y1 = y+int(0.3*h_box)
+      y2 = y+int(0.75*h_box)
+
+      # time-info (except for full-day events)
+      if not (event["start"] == "00:00" and event["end"] == "23:59"):
+        renderer.text(time_font,event["start"],0,y1,color,ts_box)
+        renderer.text(time_font,event["end"],0,y2,color,ts_box)
+
+      # event-info
+      renderer.text(text_font,event["summary"],txt_offset,y1,color,text_box)
+      if event["location"]:
+        renderer.text(text_font,event["location"],txt_offset,y2,color,
+                      text_box)
       y += h_box + self._padding
 
+    events.append(renderer.get_tilegrid(x=self._margin))
     return events
 
+  # --- events of the current page   -----------------------------------------
+
+  def _get_page(self,h_box,max_height):
+    """ return events of the current page (wraps around), set the
+        page-info for the footer
+    """
+
+    events   = self._data["events"]
+    per_page = max(1,(max_height+self._padding)//(h_box+self._padding))
+    pages    = max(1,(len(events)+per_page-1)//per_page)
+    self._page = self._page % pages
+    if self._store:
+      self._store.put("agenda_page","<B",(self._page,))
+    if pages > 1:
+      self._page_info = f"{self._page+1}/{pages}"
+    else:
+      self._page_info = None
+    return events[self._page*per_page:(self._page+1)*per_page]
+
   # --- placeholder image   --------------------------------------------------
 
   def _get_no_events(self):
     """ return centered image """
 
-    f = open(UI_SETTINGS.NO_EVENTS, "rb")
-    pic = displayio.OnDiskBitmap(f)
-    x = int((self._display.width-pic.width)/2)
-    y = int((self._display.height-pic.height)/2)
-    t = displayio.TileGrid(pic, x=x,y=y, pixel_shader=UI_PALETTE)
-    return t
+    import rle_image
+    return rle_image.get_centered(UI_SETTINGS.NO_EVENTS,self._display)
 
   # --- update data from server   --------------------------------------------
 
   def update_data(self,app_data):
     """ update data """
 
+    self._bat_level = app_data.get("bat_level",0.0)
     if not self._wifi.radio or not self._wifi.radio.connected:
       self._wifi.connect()
-    app_data.update(self._wifi.get(app_config.data_url).json())
+    data = self._get_udp()
+    if data is None:
+      response = self._wifi.get(self._get_url(),headers=HEADERS)
+      data = self._decode(response)
+    app_data.update(data)
+    self._wifi.radio.enabled = False
+    self._set_data(app_data)
+
+  # --- fetch data with the UDP-protocol   -----------------------------------
+
+  def _get_udp(self):
+    """ fetch data with the UDP-protocol (app_config.udp_url). Returns
+        None if not configured or failed (fallback to HTTP).
+    """
+
+    url = getattr(app_config,"udp_url",None)
+    if not url:
+      return None
+    from base_app.udp_client import UNCHANGED
+
+    # the server only answers "unchanged" for the hash of our cached payload
+    cache  = self._get_cache()
+    cached = cache.load() if cache else None
+    last_hash = 0
+    cookie    = 0
+    if self._store:
+      cookie = self._store.get("udp_cookie","<I",(0,))[0]
+      if cached:
+        last_hash = self._store.get("udp_hash","<I",(0,))[0]
+    try:
+      response = self._wifi.get_udp(
+        url,device_id=getattr(app_config,"device_id",""),last_hash=last_hash,
+        width=self._display.width if self._display else 0,
+        margin=self._margin,deflate=zlib is not None,cookie=cookie)
+      if response.kind == UNCHANGED:
+        volatile = json.loads(response.body)
+        data = dict(cached[0])
+        data["now"] = volatile["now"]
+        data.pop("stale",None)
+        if volatile.get("stale"):
+          data["stale"] = volatile["stale"]
+        if "glyphs" in data:
+          data["glyphs"] = dict(data["glyphs"],status=volatile["status"])
+      elif zlib:
+        data = json.loads(zlib.decompress(response.body))
+      else:
+        data = json.loads(response.body)
+    except Exception as ex:
+      print(f"udp: request failed ({ex}), using http")
+      if self._store:
+        self._store.delete("udp_hash")    # cache will hold the http-payload
+      return None
+    if getattr(app_config,"debug",False):
+      print(f"udp: {response.sent} sent, {response.received} received, "
+            f"{len(response.body)} bytes")
+    if self._store:
+      self._store.put("udp_hash","<I",(response.hash,))
+      self._store.put("udp_cookie","<I",(response.cookie,))
+    return data
+
+  # --- next page from the last payload   ------------------------------------
+
+  def update_page(self,app_data):
+    """ advance to the next page of the last payload (no network). Returns
+        False if no payload of today is available.
+    """
+
+    cache = self._get_cache()
+    cached = cache.load() if cache else None
+    if not cached:
+      return False
+    now = time.localtime()
+    now_hm = f"{now.tm_hour:02d}:{now.tm_min:02d}"
+    app_data.update(cached[0])
+    app_data["events"] = [e for e in app_data["events"] if e["end"] >= now_hm]
+    self._bat_level = app_data.get("bat_level",0.0)
+    self._data  = app_data
+    self._page += 1
+    return True
+
+  # --- set and save data   --------------------------------------------------
+
+  def _set_data(self,app_data):
+    """ set data and save it as last good payload """
+
+    self._data   = app_data
+    self._page   = 0
+    self.offline = False
+    cache = self._get_cache()
+    if cache:
+      cache.save(app_data)
+
+  # --- return cache of last good payload   ----------------------------------
+
+  def _get_cache(self):
+    """ create cache (once), returns None if disabled """
+
+    filename = getattr(app_config,"payload_cache","payload_cache.json")
+    if not self._cache and filename:
+      from payload_cache import PayloadCache
+      self._cache = PayloadCache(filename,getattr(app_config,"debug",False))
+    return self._cache
+
+  # --- data-url with display-geometry   -------------------------------------
+
+  def _get_url(self,url=None):
+    """ return data-url. The server needs the geometry to fit the texts """
+
+    url = url or app_config.data_url
+    if not self._display:
+      return url
+    sep = "&" if "?" in url else "?"
+    return f"{url}{sep}width={self._display.width}&margin={self._margin}"
+
+  # --- decode (compressed) response   ---------------------------------------
+
+  def _decode(self,response):
+    """ decompress and parse response """
+
+    encoding = response.headers.get("content-encoding","identity")
+    if encoding == "deflate" and zlib:
+      return json.loads(zlib.decompress(response.content))
+    return response.json()
+
+  # --- connect to AP (asyncio)   --------------------------------------------
+
+  async def connect_async(self):
+    """ connect before the ui-setup starts (see WifiImpl.connect_async) """
+    await self._wifi.connect_async()
+
+  # --- update data from server (asyncio)   ----------------------------------
+
+  async def update_data_async(self,app_data):
+    """ update data, other tasks run while waiting for the response """
+
+    self._bat_level = app_data.get("bat_level",0.0)
+    await self._wifi.connect_async()
+    stream_url = getattr(app_config,"stream_url",None)
+    data = self._get_udp()
+    if data is not None:
+      app_data.update(data)
+    elif stream_url:
+      app_data.update(await self._read_stream(stream_url))
+    else:
+      response = await self._wifi.get_async(self._get_url(),headers=HEADERS)
+      app_data.update(self._decode(response))
     self._wifi.radio.enabled = False
-    self._data = app_data
+    self._set_data(app_data)
+
+  # --- read agenda as stream (asyncio)   ------------------------------------
+
+  async def _read_stream(self,stream_url):
+    """ read newline-delimited json (header, events, trailer). The header
+        is rendered as soon as it arrives and glyphs of events are loaded
+        while the server still reads slower providers.
+    """
+
+    data    = {"events": []}
+    trailer = {}
+
+    def on_line(line):
+      item = json.loads(line)
+      if "start" in item:
+        data["events"].append(item)
+        self._load_event_glyphs(item)
+      elif "day" in item:
+        data.update(item)
+        self._prebuild_header(data)
+      else:
+        trailer.update(item)
+
+    await self._wifi.get_lines_async(self._get_url(stream_url),on_line)
+    if "error" in trailer:
+      raise RuntimeError(f"server: {trailer['error']}")
+    if not "day" in data or not "is_holiday" in trailer:
+      raise RuntimeError("incomplete stream")
+
+    # events are only sorted per provider
+    data["events"].sort(key=lambda e: e["start"])
+    data["weekday"] = data["weekday"] and not trailer["is_holiday"]
+    for key in ["stale", "glyphs"]:
+      if key in trailer:
+        data[key] = trailer[key]
+    return data
+
+  # --- render header before the events are available   ----------------------
+
+  def _prebuild_header(self,data):
+    """ create header if the frame is ready (update_ui() rebuilds it if
+        the holiday-flag of the trailer changes the day-box)
+    """
+
+    if not self._frame or not self._view:
+      return
+    self._frame.set_data(data)
+    (header,self._header_h) = self._frame.get_header()
+    self._set_part(1,header)
+    self._header_key = (data["day"],data["weekday"],data["date"])
+
+  # --- load glyphs of a single event   --------------------------------------
+
+  def _load_event_glyphs(self,event):
+    """ load glyphs of an event if the fonts are already loaded """
+
+    for role,text in [("time",event["start"]+event["end"]),
+                      ("text",event["summary"]+event["location"])]:
+      font = self._fonts.get(role,None)
+      if font:
+        font.load_glyphs(text)
 
   # --- create complete content   --------------------------------------------
 
   def create_ui(self,display):
     """ create content """
 
-    # save display and return view (which might not exist)
-    # ui creation is deferred to update_ui
+    # load fonts and create static frame, data-dependent parts of the
+    # ui are deferred to update_ui
     self._display = display
+    for role,fontfile in FONTS:
+      self._load_font(role,fontfile)
+    self._create_frame()
+
+  # --- create complete content (asyncio)   ----------------------------------
+
+  async def create_ui_async(self,display):
+    """ create content, yield after every font """
+
+    import asyncio
+    self._display = display
+    for role,fontfile in FONTS:
+      self._load_font(role,fontfile)
+      await asyncio.sleep(0)
+    self._create_frame()
+
+  # --- create static frame   ------------------------------------------------
+
+  def _create_frame(self):
+    """ create frame and root-group with background """
+
+    from frame import Frame
+    self._frame = Frame(self._display,self._fonts)
+    self._view  = self._frame.get_group()
+    self._header_key = None
+    self._events_key = None
+
+  # --- preload glyphs   -----------------------------------------------------
+
+  def _load_glyphs(self):
+    """ load all glyphs from the manifest of the server in one pass per font
+        (instead of one pass for every label with new characters)
+    """
+
+    glyphs = self._data.get("glyphs",None)
+    if not glyphs:
+      return
+    start = time.monotonic()
+    for role,font in self._fonts.items():
+      chars = glyphs.get(role,"") + STATIC_GLYPHS.get(role,"")
+      if chars:
+        font.load_glyphs(chars)
+    if getattr(app_config,"debug",False):
+      print(f"load_glyphs: {time.monotonic()-start:f}s")
 
   # --- update ui   ----------------------------------------------------------
 
   def update_ui(self):
     """ update data: callback for Application """
 
-    # clear existing ui
-    self.clear_ui()
+    # the view has a fixed layout: [background,header,events,footer].
+    # Only parts with changed data are rebuilt (footer: always)
+    if not self._view:
+      self._view = self._frame.get_group()
+
+    self._begin("glyphs")
+    self._load_glyphs()
+    self._end("glyphs")
+    frame = self._frame
+    frame.set_data(self._data)
+
+    header_key = (self._data["day"],self._data["weekday"],self._data["date"])
+    if header_key != self._header_key:
+      self._begin("header")
+      (header,self._header_h) = frame.get_header()
+      self._set_part(1,header)
+      self._header_key = header_key
+      self._end("header")
+
+    if (self._data["events"],self._page) != self._events_key:
+      self._begin("events")
+      self._set_part(2,None)              # free memory of old events
+      self._set_part(2,self._create_events(self._header_h))
+      self._events_key = (self._data["events"],self._page)
+      self._end("events")
+
+    self._begin("footer")
+    self._data["page"] = self._page_info
+    self._set_part(3,frame.get_footer())
+    self._end("footer")
+    return self._view
+
+  # --- create events or placeholder   ---------------------------------------
 
-    frame = Frame(self._display,self._data)
-    self._view = frame.get_group()
-    (header,h) = frame.get_header()
-    self._view.append(header)
-    gc.collect()
+  def _create_events(self,h):
+    """ create events between header with height h and footer """
 
-    events = self._get_events()
+    max_height = (self._display.height - h - self._margin -
+                  self._frame.get_footer_height())
+    if getattr(UI_SETTINGS,"RENDER_BITMAP",False):
+      events = self._get_events_bitmap(max_height)
+    else:
+      events = self._get_events(max_height)
     if len(events):
       events.y = h + self._margin
-      self._view.append(events)
+      return events
     else:
-      no_events = self._get_no_events()
-      self._view.append(no_events)
-    self._view.append(frame.get_footer())
-    return self._view
+      return self._get_no_events()
+
+  # --- replace part of the view   -------------------------------------------
+
+  def _set_part(self,index,group):
+    """ replace or append part of view """
+
+    if group is None:
+      group = displayio.Group()
+    if index < len(self._view):
+      self._view[index] = group
+    else:
+      self._view.append(group)
+    self._collect("set_part")
 
   # --- clear UI and free memory   -------------------------------------------
 
@@ -226,19 +666,65 @@ class Agenda:
       for _ in range(len(self._view)):
         self._view.pop()
     self._view = None
-    gc.collect()
+    self._header_key = None
+    self._events_key = None
+    self._collect("clear_ui")
+
+  # --- data of last good payload   ------------------------------------------
+
+  def _get_offline_data(self):
+    """ return (data,unchanged) from the last good payload of today or None.
+        Ended events are dropped (using the RTC), unchanged is True if the
+        display already shows the same offline-content.
+    """
+
+    cache = self._get_cache()
+    if not self._frame or not cache:
+      return None
+    cached = cache.load()
+    if not cached:
+      return None
+    data,since,shown = cached
+
+    now  = time.localtime()
+    now_hm = f"{now.tm_hour:02d}:{now.tm_min:02d}"
+    data = dict(data)
+    data["events"] = [e for e in data["events"] if e["end"] >= now_hm]
+    data["bat_level"] = self._bat_level
+    t = time.localtime(int(since))
+    data["offline"] = (f"{t.tm_mday:02d}.{t.tm_mon:02d}.{t.tm_year%100:02d} "
+                       f"{t.tm_hour:02d}:{t.tm_min:02d}")
+    cache.set_offline(since,len(data["events"]))
+    return (data,shown == len(data["events"]))
 
   # --- handle exception   ---------------------------------------------------
 
   def handle_exception(self,ex):
-    """ handle exception """
+    """ handle exception: show last good payload or error-image. Returns
+        None if the display already shows the offline-content.
+    """
 
+    import traceback
     try:
       traceback.print_exception(ex)
     except:
       print(''.join(traceback.format_exception(
         None, ex, ex.__traceback__)))
 
+    self.offline = False
+    try:
+      offline = self._get_offline_data()
+      if offline:
+        self.offline = True
+        data,unchanged = offline
+        if unchanged:
+          return None
+        self._data = data
+        return self.update_ui()
+    except Exception as ex2:
+      print(f"offline-rendering failed: {ex2}")
+      self.offline = False
+
     g = displayio.Group()
     background = Rectangle(pixel_shader=UI_PALETTE,x=0,y=0,
                            width=self._display.width,
@@ -246,10 +732,6 @@ class Agenda:
                            color_index=COLORS.WHITE)
     g.append(background)
 
-    f = open(UI_SETTINGS.NO_NETWORK, "rb")
-    pic = displayio.OnDiskBitmap(f)
-    x = int((self._display.width-pic.width)/2)
-    y = int((self._display.height-pic.height)/2)
-    t = displayio.TileGrid(pic, x=x,y=y, pixel_shader=UI_PALETTE)
-    g.append(t)
+    import rle_image
+    g.append(rle_image.get_centered(UI_SETTINGS.NO_NETWORK,self._display))
     return g
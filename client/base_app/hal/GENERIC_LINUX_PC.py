@@ -10,38 +10,13 @@
 import sys
 import time
 
-import socket
-import adafruit_requests
-
 from .hal_base import HalBase
 
-class WifiImpl:
-  """ request-implementation using sockets from CPython """
-
-  def __init__(self,debug=False):
-    """ constructor """
-    self.debug = debug
-    self._http = None
-
-  def connect(self):
-    self._http = adafruit_requests.Session(socket)
-
-  def get(self,url):
-    return self._http.get(url)
-
-  @property
-  def radio(self):
-    """ return ourselves as radio """
-    return self
-
-  @property
-  def connected(self):
-    """ emulate radio.connected """
-    return self._http is not None
-
 class HalPygame(HalBase):
   """ GENERIC_LINUX_PC specific HAL-class """
 
+  STATE_MEMORY = "state_store.bin"
+
   def bat_level(self):
     """ return battery level """
     return 3.6
@@ -50,10 +25,6 @@ class HalPygame(HalBase):
     """ set status LED (not-supported)"""
     pass
 
-  def wifi(self,debug=False):
-    """ return wifi-interface """
-    return WifiImpl(debug=debug)
-
   def shutdown(self):
     """ leave program (here: wait for quit) """
     if not self._display:
@@ -63,7 +34,7 @@ class HalPygame(HalBase):
 
   def sleep(self,duration):
     if not self._display:
-      super.sleep(duration)
+      super().sleep(duration)
       return
 
     start = time.monotonic()
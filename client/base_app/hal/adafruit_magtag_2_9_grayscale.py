@@ -19,6 +19,8 @@ from .hal_base import HalBase
 class HalMagtag(HalBase):
   """ Magtag specific HAL-class """
 
+  KEY_PINS = [board.D14,board.D12,board.D15,board.D11]
+
   def bat_level(self):
     """ return battery level """
     from analogio import AnalogIn
@@ -33,7 +35,7 @@ class HalMagtag(HalBase):
     if not self._keypad:
       import keypad
       self._keypad = keypad.Keys(
-        [board.D14,board.D12,board.D15,board.D11],
+        HalMagtag.KEY_PINS,
         value_when_pressed=False,pull=True,
         interval=0.1,max_events=4
       )
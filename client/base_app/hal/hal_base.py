@@ -11,6 +11,7 @@
 # ----------------------------------------------------------------------------
 
 import board
+import sys
 import time
 try:
   import alarm
@@ -23,12 +24,59 @@ try:
 except:
   pass
 
+HAL_RECORD = "<I32s"            # crc32 of board_id, name of the HAL
+
+def get_state_memory(kind):
+  """ return memory for the state-store: "sleep_memory" (lost on
+      power-off), "nvm" or a filename. Unavailable memories fall back to
+      the next one.
+  """
+  if kind == "sleep_memory":
+    try:
+      if len(alarm.sleep_memory):
+        return alarm.sleep_memory
+    except:
+      pass
+    kind = "nvm"
+  if kind == "nvm":
+    try:
+      import microcontroller
+      if microcontroller.nvm:
+        return microcontroller.nvm
+    except:
+      pass
+    kind = "state_store.bin"
+  from ..state_store import FileMemory
+  return FileMemory(kind)
+
+def load_hal_name(board_id):
+  """ return name of the HAL saved for board_id by a former boot (or
+      None). The HAL (and its STATE_MEMORY) is not known yet, so all
+      memories are checked (read only).
+  """
+  from ..state_store import StateStore, crc32
+  key = crc32(board_id.encode()) & 0xffffffff
+  for kind in [getattr(hw_config,'STATE_MEMORY',None) or "sleep_memory",
+               "nvm"]:
+    record = StateStore(get_state_memory(kind)).get("hal",HAL_RECORD)
+    if record and record[0] == key:
+      return record[1].rstrip(b"\0").decode()
+  return None
+
+def save_hal_name(store,board_id,hal_name):
+  """ save name of the HAL for board_id (see load_hal_name()) """
+  from ..state_store import crc32
+  store.put("hal",HAL_RECORD,(crc32(board_id.encode()) & 0xffffffff,
+                              hal_name.encode()[:32]))
+
 class HalBase:
   def __init__(self):
     """ constructor """
     self.debug = False
     self._display = None
     self._keypad = None
+    self._store = None
+    self._pressed = None
     self.I2C  = self._get_attrib('I2C')
     self.SDA  = self._get_attrib('SDA')
     self.SCL  = self._get_attrib('SCL')
@@ -98,7 +146,10 @@ class HalBase:
 
   def wifi(self,debug=False):
     """ return wifi-interface """
-    from ..wifi_impl_builtin import WifiImpl
+    if sys.implementation.name == "cpython":
+      from ..wifi_impl_cpython import WifiImpl
+    else:
+      from ..wifi_impl_builtin import WifiImpl
     return WifiImpl(debug=debug)
 
   def get_display(self):
@@ -117,6 +168,28 @@ class HalBase:
     except:
       return None
 
+  def get_wake_policy(self,debug=False):
+    """ return battery-aware wake-policy, if configured """
+    config = self._get_attrib('wake_policy')
+    if not config:
+      return None
+    from ..wake_policy import WakePolicy
+    return WakePolicy(config,self.get_state_store(debug),debug=debug)
+
+  def get_state_store(self,debug=False):
+    """ return persistent state-store (created once) """
+    if not self._store:
+      from ..state_store import StateStore
+      self._store = StateStore(self._get_state_memory(),debug=debug)
+    return self._store
+
+  def _get_state_memory(self):
+    """ return memory for the state-store. Attribute STATE_MEMORY selects
+        the memory (default: "sleep_memory", see get_state_memory()).
+    """
+    return get_state_memory(self._get_attrib('STATE_MEMORY') or
+                            "sleep_memory")
+
   def shutdown(self):
     """ shutdown system """
     shutdown = self._get_attrib('shutdown')
@@ -141,6 +214,34 @@ class HalBase:
     """ sleep for the given duration in seconds """
     time.sleep(duration)
 
+  def light_sleep(self,duration,alarms=[]):
+    """ light-sleep for duration seconds (or until one of alarms) """
+    try:
+      t_alarm = alarm.time.TimeAlarm(monotonic_time=time.monotonic()+duration)
+      alarm.light_sleep_until_alarms(t_alarm,*alarms)
+    except:
+      # no alarm-module or alarms not supported
+      time.sleep(duration)
+
+  def wait_for_panel(self,display):
+    """ wait until the panel finished the refresh with timed light-sleeps
+        of panel_poll seconds. The display-driver owns the busy-pin, so a
+        PinAlarm on it is not possible. Returns (seconds,wakeups).
+    """
+    start = time.monotonic()
+    if not getattr(display,"busy",False):
+      return (0,0)
+
+    deadline = start + (self._get_attrib('panel_timeout') or 60)
+    interval = self._get_attrib('panel_poll') or 1.0
+    wakeups  = 0
+    while display.busy and time.monotonic() < deadline:
+      self.light_sleep(interval)
+      wakeups += 1
+    duration = time.monotonic() - start
+    self.msg(f"wait_for_panel: {duration:0.1f}s, {wakeups} wakeups")
+    return (duration,wakeups)
+
   def get_keypad(self):
     """ return configured keypad """
     try:
@@ -152,6 +253,32 @@ class HalBase:
     except:
       return None
 
+  def _get_pressed_keys(self):
+    """ return numbers of the keys pressed at wakeup. The event-queue is
+        read once, so every check_key() sees the same keys. A key that woke
+        the device from deep-sleep (PinAlarm) counts as pressed.
+    """
+    if self._pressed is None:
+      self._pressed = []
+      pins = self._get_attrib('KEY_PINS')
+      try:
+        wake_pin = alarm.wake_alarm.pin
+      except:
+        wake_pin = None
+      if pins and wake_pin in pins:
+        self.msg(f"key-event: wakeup, knr: {pins.index(wake_pin)}")
+        self._pressed.append(pins.index(wake_pin))
+      keypad = self.get_keypad()
+      if keypad:
+        queue = keypad.events
+        ev = queue.get()
+        while ev:
+          self.msg(f"key-event: pressed: {ev.pressed}, knr: {ev.key_number}")
+          if ev.pressed:
+            self._pressed.append(ev.key_number)
+          ev = queue.get()
+    return self._pressed
+
   def check_key(self,name):
     """ check if key is pressed """
 
@@ -159,25 +286,47 @@ class HalBase:
     self.msg(f"check_key({name}): {nr=}")
     if nr is None:
       return False
-    keypad = self.get_keypad()
-    if not keypad:
-      return False
-    queue = keypad.events
-    ev = queue.get()
-    if ev:
-      self.msg(f"check_key({name}): pressed: {ev.pressed}, knr: {ev.key_number}")
-      return ev.pressed and ev.key_number == nr
-    else:
-      self.msg("ckeck_key({name}): empty event-queue")
+    return nr in self._get_pressed_keys()
+
+  def _get_key_alarms(self):
+    """ return PinAlarms of the keys key_on, key_upd and key_page. Needs
+        attribute KEY_PINS (pins of the keypad, keys are active low).
+    """
+    pins = self._get_attrib('KEY_PINS')
+    if not pins:
+      return []
+    try:
+      self._keypad.deinit()             # release pins
+    except:
+      pass
+    alarms = []
+    for name in ["key_on","key_upd","key_page"]:
+      nr = getattr(hw_config,name,None)
+      if nr is None:
+        continue
+      if nr >= len(pins):
+        self.msg(f"{name}: no pin with index {nr} in KEY_PINS")
+        continue
+      try:
+        alarms.append(alarm.pin.PinAlarm(pins[nr],value=False,pull=True))
+      except Exception as ex:
+        self.msg(f"{name}: no PinAlarm ({ex})")
+    return alarms
 
   def deep_sleep(self,alarms=[]):
-    """ activate deep-sleep """
+    """ activate deep-sleep (keys with KEY_PINS also wake the device) """
 
     ds = getattr(hw_config,"deep_sleep",None)
     if ds:
       ds(alarms)
     else:
       try:
+        alarm.exit_and_deep_sleep_until_alarms(*alarms,
+                                               *self._get_key_alarms())
+      except:
+        pass
+      try:
+        # e.g. too many PinAlarms for the port
         alarm.exit_and_deep_sleep_until_alarms(*alarms)
       except:
         while True:
@@ -16,6 +16,8 @@ from .hal_base import HalBase
 class HalBadger2040W(HalBase):
   """ Badger2040W specific HAL-class """
 
+  STATE_MEMORY = "nvm"          # shutdown() cuts the power
+
   def _init_led(self,value):
     """ initialize LED/Neopixel """
     if not hasattr(self,"_led"):
@@ -17,10 +17,13 @@ from .hal_base import HalBase
 class HALInkyFrame57(HalBase):
   """ InkyFrame 5.7 specific HAL-class """
 
+  STATE_MEMORY = "nvm"          # shutdown() cuts the power
+
   def __init__(self):
     """ constructor """
     super().__init__()
     self.LED = board.LED_ACT
+    self._refresh_pending = False     # refresh started, end not seen
 
   def get_rtc_ext(self,net_update=False,debug=False):
     """ return external rtc, if available """
@@ -30,24 +33,44 @@ class HALInkyFrame57(HalBase):
 
   def shutdown(self):
     """ turn off power by pulling enable pin low """
-    self._wait_for_display()
+    if self._refresh_pending:
+      self.wait_for_panel(None)
     board.ENABLE_DIO.value = 0
 
-  def _wait_for_display(self):
-    """ wait for display update to finish """
+  def wait_for_panel(self,display):
+    """ wait for display update to finish. The busy-pin is only available
+        from the shift-register, so we light-sleep between scans. A refresh
+        stays pending if the wait is interrupted (shutdown() then waits),
+        but not after a timeout.
+    """
 
-    keypad = self.get_keypad()
+    start    = time.monotonic()
+    if display is not None:
+      self._refresh_pending = True
+    deadline = start + (self._get_attrib('panel_timeout') or 60)
+    interval = self._get_attrib('panel_poll') or 1.0
+    keypad   = self.get_keypad()
 
     # we check the busy-pin of the shift-register
     queue = keypad.events
-    while True:
+    wakeups = 0
+    ready   = False
+    while time.monotonic() < deadline:
       if not len(queue):
-        time.sleep(0.1)
+        self.light_sleep(interval)
+        wakeups += 1
         continue
       ev = queue.get()
       if ev.key_number == board.KEYCODES.INKY_BUS and ev.pressed:
         # i.e. busy-pin is high, so no longer busy
-        return
+        ready = True
+        break
+    self._refresh_pending = False
+    if not ready:
+      print("wait_for_panel: timeout, busy-pin not seen")
+    duration = time.monotonic() - start
+    self.msg(f"wait_for_panel: {duration:0.1f}s, {wakeups} wakeups")
+    return (duration,wakeups)
 
   def get_keypad(self):
     """ return configured keypad """
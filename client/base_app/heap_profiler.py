@@ -0,0 +1,183 @@
+# ----------------------------------------------------------------------------
+# heap_profiler.py: allocations, free heap and gc-time per phase.
+#
+# Enabled with app_config.heap_profile = True. Phases are nested (e.g. the
+# fonts within create_ui, every event-box within update_ui). For every
+# phase the profiler records:
+#
+#   alloc: allocated heap after the phase (gc.mem_alloc() or tracemalloc)
+#   delta: change of the allocated heap during the phase
+#   free:  free heap after the phase (CircuitPython only)
+#   block: largest free block (CircuitPython, app_config.heap_profile =
+#          "blocks": binary search with a collect after every probe, so
+#          this shows fragmentation that a collect does not fix)
+#   gc:    time spent in gc.collect() (CPython: including automatic
+#          collections)
+#
+# Explicit collects are also summarized per name (count, time, bytes freed).
+# On CPython (GENERIC_LINUX_PC), the report lists the top allocation-sites
+# (tracemalloc) of every top-level phase.
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# ----------------------------------------------------------------------------
+
+import gc
+import time
+try:
+  import tracemalloc
+except ImportError:
+  tracemalloc = None
+
+BLOCK_RESOLUTION = 256             # resolution of the largest-block probe
+
+# --- class HeapProfiler   ---------------------------------------------------
+
+class HeapProfiler:
+
+  # --- constructor   --------------------------------------------------------
+
+  def __init__(self,blocks=False,top=5):
+    """ constructor """
+
+    self._blocks   = blocks and hasattr(gc,"mem_free")
+    self._top      = top
+    self._stack    = []     # (index,alloc,gc_ns,snapshot)
+    self._phases   = []     # (depth,name,alloc,delta,free,block,gc_ns)
+    self._collects = {}     # name -> [count,ns,freed]
+    self._sites    = []     # (name,[lines])
+    self._gc_ns    = 0      # total gc-time
+    self._gc_start = None
+    if tracemalloc:
+      if not tracemalloc.is_tracing():
+        tracemalloc.start()
+      gc.callbacks.append(self._gc_callback)
+
+  # --- gc-callback (CPython)   ----------------------------------------------
+
+  def _gc_callback(self,phase,info):
+    """ accumulate time of (automatic) collections """
+
+    if phase == "start":
+      self._gc_start = time.monotonic_ns()
+    elif self._gc_start is not None:
+      self._gc_ns += time.monotonic_ns() - self._gc_start
+      self._gc_start = None
+
+  # --- heap-metrics   -------------------------------------------------------
+
+  def _alloc(self):
+    """ return allocated heap """
+    if tracemalloc:
+      return tracemalloc.get_traced_memory()[0]
+    return gc.mem_alloc()
+
+  def _free(self):
+    """ return free heap (or None) """
+    return gc.mem_free() if hasattr(gc,"mem_free") else None
+
+  def _largest_block(self):
+    """ return size of the largest free block (or None). The probe
+        collects after every allocation, i.e. the result is independent
+        of garbage.
+    """
+
+    if not self._blocks:
+      return None
+    gc.collect()
+    low, high = 0, gc.mem_free()
+    while high - low > BLOCK_RESOLUTION:
+      size = (low+high)//2
+      try:
+        bytearray(size)
+        low = size
+      except MemoryError:
+        high = size
+      gc.collect()
+    return low
+
+  def _get_sites(self,snapshot):
+    """ return top allocation-sites since snapshot (without the
+        allocations of the profiler)
+    """
+
+    stats = tracemalloc.take_snapshot().compare_to(snapshot,"lineno")
+    own   = (__file__,tracemalloc.__file__)
+    return [f"{s.size_diff:+9d} {s.count_diff:+5d} {s.traceback}"
+            for s in stats if s.size_diff > 0 and
+            s.traceback[0].filename not in own][:self._top]
+
+  # --- phases   -------------------------------------------------------------
+
+  def begin(self,name):
+    """ start phase """
+
+    snapshot = None
+    if tracemalloc and not self._stack:
+      snapshot = tracemalloc.take_snapshot()
+    self._phases.append((len(self._stack),name))    # completed by end()
+    self._stack.append((len(self._phases)-1,self._alloc(),self._gc_ns,
+                        snapshot))
+
+  def end(self,name):
+    """ end phase (and all nested phases left open by an exception) """
+
+    while self._stack:
+      index,alloc,gc_ns,snapshot = self._stack.pop()
+      block  = self._largest_block()
+      now    = self._alloc()
+      p_name = self._phases[index][1]
+      self._phases[index] = (len(self._stack),p_name,now,now-alloc,
+                             self._free(),block,self._gc_ns-gc_ns)
+      if snapshot:
+        self._sites.append((p_name,self._get_sites(snapshot)))
+      if p_name == name:
+        break
+
+  # --- collect with measurement   -------------------------------------------
+
+  def collect(self,name):
+    """ run gc.collect() and account time and freed memory to name """
+
+    before = self._alloc()
+    start  = time.monotonic_ns()
+    gc.collect()
+    duration = time.monotonic_ns() - start
+    if not tracemalloc:
+      self._gc_ns += duration             # CPython: added by the callback
+    entry = self._collects.setdefault(name,[0,0,0])
+    entry[0] += 1
+    entry[1] += duration
+    entry[2] += before - self._alloc()
+
+  # --- report   -------------------------------------------------------------
+
+  def report(self):
+    """ print and reset results (closes phases left open by exceptions) """
+
+    self.end(None)
+    def fmt(value):
+      return f"{value:9d}" if value is not None else "        -"
+
+    print("heap-profile:")
+    print(f"  {'phase':24s} {'alloc':>9s} {'delta':>9s} {'free':>9s} "
+          f"{'block':>9s} {'gc-ms':>8s}")
+
+    for depth,name,alloc,delta,free,block,gc_ns in self._phases:
+      print(f"  {'  '*depth+name:24s} {alloc:9d} {delta:+9d} {fmt(free)} "
+            f"{fmt(block)} {gc_ns/1e6:8.2f}")
+
+    for name,(count,ns,freed) in self._collects.items():
+      print(f"  gc.collect({name}): {count}x, {ns/1e6:.2f}ms, "
+            f"freed {freed} bytes ({freed//max(count,1)}/collect)")
+    for name,lines in self._sites:
+      print(f"  allocation-sites of {name}:")
+      for line in lines:
+        print(f"    {line}")
+
+    self._phases   = []
+    self._collects = {}
+    self._sites    = []
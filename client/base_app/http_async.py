@@ -0,0 +1,236 @@
+# ----------------------------------------------------------------------------
+# http_async.py: minimal non-blocking HTTP-GET for the asyncio-lifecycle.
+#
+# adafruit_requests blocks until the complete response is available. This
+# module sends the request and then polls the socket in non-blocking mode,
+# yielding to other asyncio-tasks (e.g. font-loading) while the server is
+# still busy.
+#
+# Only plain http without keep-alive is supported. get() uses HTTP/1.0,
+# get_lines() reads newline-delimited responses (optionally chunked) and
+# passes every line to a callback as soon as it is available.
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# ----------------------------------------------------------------------------
+
+import asyncio
+import json
+import time
+
+EAGAIN    = 11              # errno.EAGAIN/EWOULDBLOCK
+BUF_SIZE  = 1024
+POLL_TIME = 0.01
+
+# --- minimal response object   ----------------------------------------------
+
+class Response:
+  """ subset of adafruit_requests.Response """
+
+  def __init__(self,status_code,headers,content):
+    """ constructor """
+    self.status_code = status_code
+    self.headers     = headers
+    self.content     = content
+
+  @property
+  def text(self):
+    """ return content as string """
+    return str(self.content,"utf-8")
+
+  def json(self):
+    """ return content as json """
+    return json.loads(self.content)
+
+# --- split url into host, port and path   -----------------------------------
+
+def split_url(url):
+  """ split url into (host,port,path) """
+
+  if not url.startswith("http://"):
+    raise ValueError(f"unsupported url: {url}")
+  host, _, path = url[7:].partition("/")
+  if ":" in host:
+    host, port = host.split(":")
+    port = int(port)
+  else:
+    port = 80
+  return (host,port,"/"+path)
+
+# --- parse raw response   ---------------------------------------------------
+
+def _parse_response(data):
+  """ split raw data into status, headers and body """
+
+  head_end = data.find(b"\r\n\r\n")
+  if head_end < 0:
+    raise RuntimeError("incomplete http-response")
+  lines = str(data[:head_end],"utf-8").split("\r\n")
+  status_code = int(lines[0].split(" ")[1])
+  headers = {}
+  for line in lines[1:]:
+    key, _, value = line.partition(":")
+    headers[key.strip().lower()] = value.strip()
+  return Response(status_code,headers,bytes(data[head_end+4:]))
+
+# --- split (chunked) body into lines   -------------------------------------
+
+class LineReader:
+  """ split body into lines, optionally decode chunked transfer """
+
+  def __init__(self,on_line,chunked):
+    """ constructor """
+    self._on_line = on_line
+    self._chunked = chunked
+    self._raw     = b""
+    self._line    = b""
+    self._size    = 0            # remaining bytes of current chunk
+
+  def feed(self,data):
+    """ add data of the body """
+
+    if not self._chunked:
+      self._add(data)
+      return
+    self._raw += data
+    while self._raw:
+      if not self._size:
+        end = self._raw.find(b"\r\n")
+        if end < 0:
+          return
+        size = self._raw[:end].split(b";")[0]
+        self._raw = self._raw[end+2:]
+        if not size:
+          continue                                 # end of chunk-data
+        self._size = int(size,16)
+        if not self._size:
+          self._raw = b""                          # last chunk
+          return
+      n = min(self._size,len(self._raw))
+      self._add(self._raw[:n])
+      self._raw   = self._raw[n:]
+      self._size -= n
+
+  def _add(self,data):
+    """ add data to current line, pass complete lines to the callback """
+
+    self._line += data
+    while True:
+      end = self._line.find(b"\n")
+      if end < 0:
+        return
+      line = self._line[:end]
+      self._line = self._line[end+1:]
+      if line.strip():
+        self._on_line(line)
+
+  def close(self):
+    """ pass last (unterminated) line """
+    if self._line.strip():
+      self._on_line(self._line)
+    self._line = b""
+
+# --- send request   ---------------------------------------------------------
+
+def _send(pool,url,headers,version):
+  """ connect and send GET-request, return socket """
+
+  host, port, path = split_url(url)
+  addr = pool.getaddrinfo(host,port)[0][-1]
+  sock = pool.socket(pool.AF_INET,pool.SOCK_STREAM)
+  try:
+    sock.connect(addr)
+    request = f"GET {path} {version}\r\nHost: {host}\r\n"
+    if version != "HTTP/1.0":
+      request += "Connection: close\r\n"
+    if headers:
+      for key, value in headers.items():
+        request += f"{key}: {value}\r\n"
+    request = (request + "\r\n").encode()
+    sent = 0
+    while sent < len(request):
+      sent += sock.send(request[sent:])
+  except:
+    sock.close()
+    raise
+  sock.settimeout(0)
+  return sock
+
+# --- read from non-blocking socket   ----------------------------------------
+
+async def _recv(sock,buf,deadline):
+  """ read into buf, yield while no data is available. Returns the number
+      of bytes (0: connection closed)
+  """
+
+  while True:
+    try:
+      return sock.recv_into(buf)
+    except OSError as ex:
+      if ex.errno != EAGAIN:
+        raise
+      if time.monotonic() > deadline:
+        raise RuntimeError("timeout while reading response")
+      await asyncio.sleep(POLL_TIME)
+
+# --- execute GET-request   --------------------------------------------------
+
+async def get(pool,url,headers=None,timeout=30):
+  """ GET url using sockets from pool, yield while waiting for data.
+      pool is either a socketpool.SocketPool or CPython's socket-module.
+  """
+
+  sock = _send(pool,url,headers,"HTTP/1.0")
+  try:
+    # poll for response: this is where other tasks can run
+    data     = bytearray()
+    buf      = bytearray(BUF_SIZE)
+    deadline = time.monotonic() + timeout
+    while True:
+      n = await _recv(sock,buf,deadline)
+      if not n:
+        break
+      data.extend(memoryview(buf)[:n])
+  finally:
+    sock.close()
+  return _parse_response(data)
+
+# --- execute GET-request for newline-delimited data   -----------------------
+
+async def get_lines(pool,url,on_line,headers=None,timeout=30):
+  """ GET url and pass every line of the body to on_line as soon as it
+      is available. Returns the response (without content).
+  """
+
+  sock = _send(pool,url,headers,"HTTP/1.1")
+  try:
+    data     = b""
+    buf      = bytearray(BUF_SIZE)
+    deadline = time.monotonic() + timeout
+    response = None
+    while True:
+      n = await _recv(sock,buf,deadline)
+      if not n:
+        break
+      if response:
+        reader.feed(bytes(buf[:n]))
+        continue
+      data += buf[:n]
+      if data.find(b"\r\n\r\n") < 0:
+        continue
+      response = _parse_response(data)
+      if response.status_code != 200:
+        raise RuntimeError(f"http-status {response.status_code}")
+      chunked = response.headers.get("transfer-encoding","") == "chunked"
+      reader  = LineReader(on_line,chunked)
+      reader.feed(response.content)
+      response.content = b""
+    if not response:
+      raise RuntimeError("incomplete http-response")
+    reader.close()
+  finally:
+    sock.close()
+  return response
@@ -0,0 +1,122 @@
+#-----------------------------------------------------------------------------
+# Drift-model for RTCs.
+#
+# Every successful sync with a time-server records the pair (RTC-time,
+# server-time). From these pairs the model estimates the drift-rate of the
+# RTC and corrects the time locally. A network-sync is only necessary if
+# the predicted error exceeds a threshold (secrets.time_max_error).
+#
+# The state is kept in the state-store (see base_app.state_store).
+#
+# Author: Bernhard Bablok
+#
+# Website: https://github.com/pcb-pico-datalogger
+#-----------------------------------------------------------------------------
+
+# --- class DriftModel   -----------------------------------------------------
+
+class DriftModel:
+
+  MIN_INTERVAL = 3600        # minimal seconds between syncs for a rate-sample
+  SAMPLES      = 8           # number of saved pairs and rates
+  SYNC_ERROR   = 1           # error of a sync (resolution of server-time)
+
+  # --- constructor   --------------------------------------------------------
+
+  def __init__(self,max_error,store,ppm=100,debug=False):
+    """ constructor. ppm is the assumed drift without rate-samples """
+
+    self.max_error = max_error
+    self._store    = store
+    self._ppm      = ppm
+    self._debug    = debug
+    self._load()
+
+  # --- print debug-message   ------------------------------------------------
+
+  def _msg(self,text):
+    """ print (debug) message """
+    if self._debug:
+      print(text)
+
+  # --- persistent state   ---------------------------------------------------
+
+  def _load(self):
+    """ load state (times are epoch-seconds, 0 is unset) """
+
+    self._pairs = self._store.ring("rtc_pairs","<II",DriftModel.SAMPLES)
+    self._rates = self._store.ring("rtc_rates","<If",DriftModel.SAMPLES)
+    rate,sync,corr = self._store.get("rtc_drift","<fII",(0.0,0,0))
+    self._rate  = rate                     # estimated drift (s/s)
+    self._sync  = sync or None             # time of last sync
+    self._corr  = corr or None             # time of last local correction
+
+  def _save(self):
+    """ save state (written with the next commit of the store) """
+
+    self._store.put("rtc_drift","<fII",
+                    (self._rate,self._sync or 0,self._corr or 0))
+
+  # --- record sync   --------------------------------------------------------
+
+  def record(self,rtc_time,server_time):
+    """ record result of a sync. rtc_time is the (locally corrected) time
+        of the RTC at server_time, or None if the RTC was invalid.
+    """
+
+    if rtc_time is not None and self._sync is not None:
+      interval = server_time - self._sync
+      if interval >= DriftModel.MIN_INTERVAL:
+        # error of the RTC without the local corrections since the last sync
+        corrected = self._rate*((self._corr or self._sync) - self._sync)
+        rate = (rtc_time - server_time + corrected)/interval
+        self._rates.append((int(interval),rate))
+        self._rate = (sum(i*r for i,r in self._rates)/
+                      sum(i for i,_ in self._rates))
+        self._msg(f"rtc: error {rtc_time-server_time:+.1f}s, "
+                  f"drift {rate*1e6:+.1f}ppm, estimate {self._rate*1e6:+.1f}ppm")
+    if rtc_time is not None:
+      self._pairs.append((int(rtc_time+0.5),int(server_time)))
+    self._sync = int(server_time)
+    self._corr = None
+    self._save()
+
+  # --- local correction   ---------------------------------------------------
+
+  def correction(self,now):
+    """ return correction (seconds) for the RTC since the last correction.
+        Corrections smaller than one second are deferred.
+    """
+
+    if not len(self._rates) or self._sync is None:
+      return 0
+    correction = -self._rate*(now - (self._corr or self._sync))
+    if abs(correction) < 1:
+      return 0
+    self._corr = int(now + correction + 0.5)
+    self._save()
+    return correction
+
+  # --- predicted error   ----------------------------------------------------
+
+  def predicted_error(self,now):
+    """ return predicted error of the (corrected) RTC in seconds """
+
+    if self._sync is None:
+      return float("inf")
+    n = len(self._rates)
+    if n < 2:
+      uncertainty = self._ppm*1e-6
+    else:
+      mean = sum(r for _,r in self._rates)/n
+      uncertainty = (sum((r-mean)**2 for _,r in self._rates)/(n-1))**0.5
+    return DriftModel.SYNC_ERROR + uncertainty*(now - self._sync)
+
+  # --- check if sync is necessary   -----------------------------------------
+
+  def needs_sync(self,now):
+    """ check if predicted error exceeds the threshold """
+
+    error = self.predicted_error(now)
+    self._msg(f"rtc: predicted error: {error:.1f}s (max: {self.max_error}s)")
+    return error > self.max_error
@@ -46,6 +46,7 @@ class ExtBase:
     self._net_update = net_update
     self._debug      = debug
     self._rtc_int    = rtc.RTC()
+    self._drift      = None
     self._init_rtc()             # basic settings, clear alarms etc.
 
   # --- init wifi-object if not supplied   ----------------------------------
@@ -103,55 +104,23 @@ class ExtBase:
 
   # --- get alarm from table   ---------------------------------------------
 
-  def get_table_alarm(self,time_table):
-    """ get alarm from time-table.
-        This is a list of daily entries in
-        the form
-          [((h_start,h_end,h_incr),(m_start,m_end,m_incr)),
-           ((h_start,h_end,h_incr),(m_start,m_end,m_incr)),
-           ...
-           ]
-        with one entry per day (starting with Monday==0).
-        x_start and x_end are inclusive, i.e. (0,23,1),(0,59,1) will trigger
-        every minute.
-        Replace (h_start,h_end,h_inc) with None to skip a day.
+  def get_table_alarm(self,time_table,policy=None):
+    """ get alarm from time-table (see base_app.time_table.next_slot()).
+        An optional policy (see base_app.wake_policy) might skip slots.
     """
 
-    now_epoch = time.time()                          # seconds since 01/01/1970
-    now_ts    = time.localtime(now_epoch)            # struct-time
-    now_day   = (int(now_epoch/86400)+3) % 7         # 01/01/1970 is Thursday
-    sod       = now_epoch - (now_ts.tm_hour*3600 +   # start of day
-                             now_ts.tm_min*60 +
-                             now_ts.tm_sec)
+    from ..time_table import next_slot
 
+    now_epoch = time.time()
     self._msg("rtc: looking up next boot from time-table")
-    self.print_ts("rtc: now",now_ts)
-    self._msg(f"rtc: weekday: {now_day}")
-
-    # search table (wrap-around, starting from current weekday)
-    for i in range(now_day,now_day+7,1):
-      wd_index = i % 7
-      hours, minutes = time_table[wd_index]
-      if not hours:       # no alarm on given day
-        sod += 86400      # advance start of day
-        continue
-      (h_start,h_end,h_inc) = hours
-      (m_start,m_end,m_inc) = minutes
-      # iterate over all hours/minutes and find first time-point larger
-      # than now
-      for h in range(h_start,h_end+1,h_inc):
-        for m in range(m_start,m_end+1,m_inc):
-          alarm_epoch = sod + h*3600 + m*60
-          if alarm_epoch > now_epoch:
-            next_alarm = time.localtime(alarm_epoch)
-            self.print_ts("rtc: next alarm",next_alarm)
-            return next_alarm
-
-      # no suitable time-point today. Try next day
-      sod += 86400      # advance start of day
-
-    # we should not be here
-    raise Exception("no alarm from time-table")
+    self.print_ts("rtc: now",now_epoch)
+    self._msg(f"rtc: weekday: {(int(now_epoch/86400)+3) % 7}")
+    if policy:
+      next_alarm = time.localtime(policy.next_slot(time_table,now_epoch))
+    else:
+      next_alarm = time.localtime(next_slot(time_table,now_epoch))
+    self.print_ts("rtc: next alarm",next_alarm)
+    return next_alarm
 
   # --- check state of external RTC   ---------------------------------------
 
@@ -170,6 +139,25 @@ class ExtBase:
     """ init rtc, must be implemented by subclass """
     pass
 
+  # --- init drift-model   --------------------------------------------------
+
+  def set_store(self,store):
+    """ set state-store and create drift-model if secrets.time_max_error
+        is set (call before update())
+    """
+
+    try:
+      from settings import secrets
+      max_error = getattr(secrets,"time_max_error",None)
+      if max_error is None:
+        return
+      from .drift_model import DriftModel
+      self._drift = DriftModel(max_error,store,
+                               getattr(secrets,"time_drift_ppm",100),
+                               debug=self._debug)
+    except Exception as ex:
+      print(f"rtc: could not create drift-model: {ex}")
+
   # --- check power-state   --------------------------------------------------
 
   def _lost_power(self):
@@ -194,9 +182,10 @@ class ExtBase:
     # update internal rtc to valid date
     self.print_ts("rtc: int-rtc time",self._rtc_int.datetime)
     if force or self._check_rtc(self._rtc_int):
-      if force or self._lost_power() or self._check_rtc(self._rtc_ext):
+      invalid = self._lost_power() or self._check_rtc(self._rtc_ext)
+      if force or invalid:
         self.print_ts("rtc: ext-rtc time",self._rtc_ext.datetime)
-        if not self._fetch_time():
+        if not self._sync_time(not invalid):
           print("rtc: ext-rtc not updated from time-server")
           print("rtc: setting ext-rtc to 2022-01-01 12:00:00")
           self._rtc_ext.datetime = time.struct_time((2022,1,1,12,00,00,5,1,-1))
@@ -217,6 +206,53 @@ class ExtBase:
       self._rtc_ext.datetime = int_ts
       print("rtc: updated external rtc from internal rtc")
       rc = ExtBase.TIME_SOURCE_INT
+    return self._check_drift(rc)
+
+  # --- sync time and record drift   -----------------------------------------
+
+  def _sync_time(self,valid):
+    """ update time from time-server and record pair for the drift-model.
+        valid: the ext-rtc was valid before the sync
+    """
+
+    if self._drift and valid:
+      before = time.mktime(self._rtc_ext.datetime)
+      start  = time.monotonic()
+    if not self._fetch_time():
+      return False
+    if self._drift:
+      server = time.mktime(self._rtc_ext.datetime)
+      if valid:
+        self._drift.record(before + (time.monotonic() - start),server)
+      else:
+        self._drift.record(None,server)
+    return True
+
+  # --- apply drift-correction   ---------------------------------------------
+
+  def _check_drift(self,rc):
+    """ correct RTCs locally and sync if predicted error is too large """
+
+    if (not self._drift or
+        rc in [ExtBase.TIME_SOURCE_NONE,ExtBase.TIME_SOURCE_NET]):
+      return rc
+
+    now = time.time()
+    if self._drift.needs_sync(now):
+      print("rtc: predicted error too large, syncing with time-server")
+      if self._sync_time(True):
+        ext_ts = self._rtc_ext.datetime   # needs two statements!
+        self._rtc_int.datetime = ext_ts
+        self.print_ts("rtc: new time",ext_ts)
+        return ExtBase.TIME_SOURCE_NET
+      return rc
+
+    correction = self._drift.correction(now)
+    if correction:
+      self._msg(f"rtc: correcting drift by {correction:+.1f}s")
+      new_time = time.localtime(int(now + correction + 0.5))
+      self._rtc_ext.datetime = new_time
+      self._rtc_int.datetime = new_time
     return rc
 
   # --- update time from time-server   ---------------------------------------
@@ -0,0 +1,237 @@
+# ----------------------------------------------------------------------------
+# state_store.py: typed persistent state that survives deep-sleep.
+#
+# The store keeps single records and ring-buffers of records with a fixed
+# binary format (struct-format) in a byte-buffer: alarm.sleep_memory (RAM,
+# lost on power-off), microcontroller.nvm (flash) or a file (FileMemory,
+# Linux-hosts). Layout of the buffer:
+#
+#   header:  magic "ST", version, reserved, payload-length (2), crc32 (4)
+#   payload: per key: key, struct-format, capacity, count, records
+#
+# A record is a ring-buffer with capacity 0. Slots of ring-buffers are
+# reserved, so the layout only changes with new keys. Changes are kept in
+# RAM until commit(), which only writes if the content changed and then
+# only the span of changed bytes (wear of flash).
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# ----------------------------------------------------------------------------
+
+import struct
+try:
+  from binascii import crc32
+except ImportError:
+  from zlib import crc32
+
+MAGIC       = b"ST"
+VERSION     = 1
+HEADER      = "<2sBBHI"
+HEADER_SIZE = struct.calcsize(HEADER)
+
+# --- file with the interface of alarm.sleep_memory   ------------------------
+
+class FileMemory:
+  """ byte-buffer backed by a file (Linux-hosts) """
+
+  def __init__(self,filename,size=1024):
+    """ constructor """
+
+    self._filename = filename
+    try:
+      with open(filename,"rb") as f:
+        self._data = bytearray(f.read(size))
+    except OSError:
+      self._data = bytearray()
+    self._data.extend(bytes(size-len(self._data)))
+
+  def __len__(self):
+    return len(self._data)
+
+  def __getitem__(self,index):
+    return self._data[index]
+
+  def __setitem__(self,index,value):
+    self._data[index] = value
+    with open(self._filename,"wb") as f:
+      f.write(self._data)
+
+# --- ring-buffer of records   -----------------------------------------------
+
+class RingBuffer:
+  """ ring-buffer of records (oldest first) """
+
+  def __init__(self,items,capacity):
+    """ constructor """
+    self._items   = items
+    self.capacity = capacity
+
+  def __len__(self):
+    return len(self._items)
+
+  def __getitem__(self,index):
+    return self._items[index]
+
+  def __iter__(self):
+    return iter(self._items)
+
+  def __setitem__(self,index,values):
+    self._items[index] = tuple(values)
+
+  def append(self,values):
+    """ add record, drop oldest record if full """
+    self._items.append(tuple(values))
+    del self._items[:-self.capacity]
+
+  def clear(self):
+    """ remove all records """
+    del self._items[:]
+
+# --- class StateStore   -----------------------------------------------------
+
+class StateStore:
+
+  # --- constructor   --------------------------------------------------------
+
+  def __init__(self,memory,debug=False):
+    """ constructor: memory is the backing byte-buffer """
+
+    self._memory  = memory
+    self._debug   = debug
+    self._entries = {}          # key -> [fmt,capacity,items]
+    self._image   = None        # content of memory after load/commit
+    self._load()
+
+  # --- print debug-message   ------------------------------------------------
+
+  def _msg(self,text):
+    """ print (debug) message """
+    if self._debug:
+      print(text)
+
+  # --- read and check content of memory   -----------------------------------
+
+  def _load(self):
+    """ read entries from memory, start empty if invalid """
+
+    try:
+      magic,version,_,length,crc = struct.unpack(
+        HEADER,bytes(self._memory[0:HEADER_SIZE]))
+      if magic != MAGIC or version != VERSION:
+        raise ValueError("no store or other version")
+      payload = bytes(self._memory[HEADER_SIZE:HEADER_SIZE+length])
+      if len(payload) != length or crc32(payload) & 0xffffffff != crc:
+        raise ValueError("checksum error")
+      self._entries = StateStore._decode(payload)
+      self._image   = bytes(self._memory[0:HEADER_SIZE+length])
+    except Exception as ex:
+      self._msg(f"state_store: starting empty ({ex})")
+      self._entries = {}
+
+  @staticmethod
+  def _decode(payload):
+    """ decode payload """
+
+    entries = {}
+    pos = 0
+    while pos < len(payload):
+      n   = payload[pos]
+      key = payload[pos+1:pos+1+n].decode()
+      pos += 1+n
+      n   = payload[pos]
+      fmt = payload[pos+1:pos+1+n].decode()
+      pos += 1+n
+      capacity,count = struct.unpack_from("<HH",payload,pos)
+      pos += 4
+      size = struct.calcsize(fmt)
+      items = [struct.unpack_from(fmt,payload,pos+i*size)
+               for i in range(count)]
+      pos += max(capacity,1)*size
+      entries[key] = [fmt,capacity,items]
+    return entries
+
+  def _encode(self):
+    """ encode header and payload """
+
+    parts = []
+    for key in sorted(self._entries):
+      fmt,capacity,items = self._entries[key]
+      size = struct.calcsize(fmt)
+      data = bytearray(max(capacity,1)*size)
+      for i,values in enumerate(items):
+        struct.pack_into(fmt,data,i*size,*values)
+      key = key.encode()
+      fmt = fmt.encode()
+      parts.append(bytes([len(key)]) + key + bytes([len(fmt)]) + fmt +
+                   struct.pack("<HH",capacity,len(items)) + data)
+    payload = b"".join(parts)
+    return struct.pack(HEADER,MAGIC,VERSION,0,len(payload),
+                       crc32(payload) & 0xffffffff) + payload
+
+  # --- single records   -----------------------------------------------------
+
+  def get(self,key,fmt,default=None):
+    """ return record (tuple) for key or default """
+
+    entry = self._entries.get(key,None)
+    if not entry or entry[0] != fmt or entry[1] or not entry[2]:
+      return default
+    return entry[2][0]
+
+  def put(self,key,fmt,values):
+    """ set record for key """
+    self._entries[key] = [fmt,0,[tuple(values)]]
+
+  def delete(self,key):
+    """ remove record or ring-buffer """
+    self._entries.pop(key,None)
+
+  # --- ring-buffers   -------------------------------------------------------
+
+  def ring(self,key,fmt,capacity):
+    """ return ring-buffer for key. Records are kept if only the
+        capacity changed.
+    """
+
+    entry = self._entries.get(key,None)
+    if not entry or entry[0] != fmt or entry[1] != capacity:
+      if entry and entry[0] == fmt and entry[1]:
+        items = entry[2][-capacity:]
+      else:
+        items = []
+      entry = self._entries[key] = [fmt,capacity,items]
+    return RingBuffer(entry[2],capacity)
+
+  # --- write changes   ------------------------------------------------------
+
+  def commit(self):
+    """ write changed bytes to memory, return True if written """
+
+    image = self._encode()
+    if image == self._image:
+      return False
+    if len(image) > len(self._memory):
+      self._msg(f"state_store: {len(image)} bytes exceed memory")
+      return False
+
+    # write only the span of changed bytes
+    old   = self._image or b""
+    start = 0
+    n     = min(len(old),len(image))
+    while start < n and old[start] == image[start]:
+      start += 1
+    end = len(image)
+    if len(old) == end:
+      while end > start and old[end-1] == image[end-1]:
+        end -= 1
+    try:
+      self._memory[start:end] = image[start:end]
+    except OSError as ex:
+      self._msg(f"state_store: could not write: {ex}")
+      return False
+    self._image = image
+    self._msg(f"state_store: wrote {end-start} of {len(image)} bytes")
+    return True
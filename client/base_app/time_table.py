@@ -0,0 +1,61 @@
+# ----------------------------------------------------------------------------
+# time_table.py: lookup of the next slot from a time-table.
+#
+# This is independent of any RTC, so it is usable on systems without
+# the rtc-module (e.g. Linux-hosts).
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# ----------------------------------------------------------------------------
+
+import time
+
+# --- get next slot from table   ---------------------------------------------
+
+def next_slot(time_table,now_epoch=None):
+  """ return epoch-time of the next slot after now_epoch from time-table.
+      This is a list of daily entries in
+      the form
+        [((h_start,h_end,h_incr),(m_start,m_end,m_incr)),
+         ((h_start,h_end,h_incr),(m_start,m_end,m_incr)),
+         ...
+         ]
+      with one entry per day (starting with Monday==0).
+      x_start and x_end are inclusive, i.e. (0,23,1),(0,59,1) will trigger
+      every minute.
+      Replace (h_start,h_end,h_inc) with None to skip a day.
+  """
+
+  if now_epoch is None:
+    now_epoch = time.time()                        # seconds since 01/01/1970
+  now_ts    = time.localtime(now_epoch)            # struct-time
+  now_day   = now_ts.tm_wday                       # local weekday (Monday==0)
+  sod       = now_epoch - (now_ts.tm_hour*3600 +   # start of day
+                           now_ts.tm_min*60 +
+                           now_ts.tm_sec)
+
+  # search table (wrap-around, starting from current weekday)
+  for i in range(now_day,now_day+7,1):
+    wd_index = i % 7
+    hours, minutes = time_table[wd_index]
+    if not hours:       # no alarm on given day
+      sod += 86400      # advance start of day
+      continue
+    (h_start,h_end,h_inc) = hours
+    (m_start,m_end,m_inc) = minutes
+    # iterate over all hours/minutes and find first time-point larger
+    # than now
+    for h in range(h_start,h_end+1,h_inc):
+      for m in range(m_start,m_end+1,m_inc):
+        alarm_epoch = sod + h*3600 + m*60
+        if alarm_epoch > now_epoch:
+          return alarm_epoch
+
+    # no suitable time-point today. Try next day
+    sod += 86400        # advance start of day
+
+  # we should not be here
+  raise Exception("no alarm from time-table")
@@ -0,0 +1,128 @@
+# ----------------------------------------------------------------------------
+# udp_client.py: client for the compact UDP-protocol of the server.
+#
+# A request is a single datagram with the hash of the last payload, the
+# geometry of the display and the device-id. The server answers with one
+# or more datagrams (data, "unchanged" or error). Missing datagrams are
+# requested again with the same nonce and the mask of the received chunks.
+# Without a valid cookie (proof of the address), the server only answers
+# with a new cookie and the request is repeated with it. Callers should
+# keep the cookie of the response for the next request.
+# See class Calendar2udp of the server for the format.
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# ----------------------------------------------------------------------------
+
+import os
+import struct
+try:
+  from binascii import crc32
+except ImportError:
+  from zlib import crc32
+
+MAGIC         = b"C2J"
+VERSION       = 2
+REQUEST       = "<3sBBIIIIHB"  # magic,version,flags,nonce,cookie,hash,mask,
+                               # width,margin
+RESPONSE      = "<3sBBIBBII"   # magic,version,type,nonce,seq,count,hash,crc
+RESPONSE_SIZE = struct.calcsize(RESPONSE)
+FLAG_DEFLATE  = 0x01
+DATA, UNCHANGED, ERROR, COOKIE = 1, 2, 3, 4
+BUF_SIZE      = 1500
+
+# --- response object   ------------------------------------------------------
+
+class Response:
+  """ response of the server """
+
+  def __init__(self,kind,hash,cookie,body,sent,received):
+    """ constructor """
+    self.kind     = kind             # DATA or UNCHANGED
+    self.hash     = hash             # hash of the content
+    self.cookie   = cookie           # cookie for the next request
+    self.body     = body
+    self.sent     = sent             # number of datagrams
+    self.received = received
+
+# --- split url into host and port   -----------------------------------------
+
+def split_url(url):
+  """ split udp://host:port into (host,port) """
+
+  if not url.startswith("udp://"):
+    raise ValueError(f"unsupported url: {url}")
+  host, port = url[6:].rstrip("/").split(":")
+  return (host,int(port))
+
+# --- execute request   ------------------------------------------------------
+
+def get(pool,url,device_id="",last_hash=0,width=0,margin=0,deflate=False,
+        timeout=1.0,retries=3,cookie=0):
+  """ request agenda. pool is either a socketpool.SocketPool or CPython's
+      socket-module.
+  """
+
+  host, port = split_url(url)
+  addr  = pool.getaddrinfo(host,port)[0][-1]
+  nonce = struct.unpack("<I",os.urandom(4))[0]
+  flags = FLAG_DEFLATE if deflate else 0
+  ident = device_id.encode()[:32]
+
+  chunks = {}
+  count  = None
+  crc    = None
+  buf    = bytearray(BUF_SIZE)
+  sent   = 0
+  received = 0
+  tries  = 0
+  renewed = False
+  sock = pool.socket(pool.AF_INET,pool.SOCK_DGRAM)
+  try:
+    sock.settimeout(timeout)
+    while count is None or len(chunks) < count:
+      if tries > retries:
+        raise RuntimeError(f"no response from {host}:{port}")
+      mask = 0
+      for seq in chunks:
+        mask |= 1 << seq
+      sock.sendto(struct.pack(REQUEST,MAGIC,VERSION,flags,nonce,cookie,
+                              last_hash,mask,width,margin) + ident,addr)
+      sent  += 1
+      tries += 1
+      try:
+        while count is None or len(chunks) < count:
+          n, _ = sock.recvfrom_into(buf)
+          received += 1
+          if n < RESPONSE_SIZE:
+            continue
+          (magic,version,kind,r_nonce,seq,
+           r_count,r_hash,r_crc) = struct.unpack_from(RESPONSE,buf,0)
+          if magic != MAGIC or version != VERSION or r_nonce != nonce:
+            continue
+          if kind == COOKIE:
+            if r_hash != cookie:
+              cookie = r_hash           # repeat request with the new cookie
+              if not renewed:
+                tries  -= 1             # (once) not counted as a retry
+                renewed = True
+              break
+            continue
+          if crc is not None and r_crc != crc:
+            chunks = {}                 # server created a new response
+          count, crc, s_hash = r_count, r_crc, r_hash
+          chunks[seq] = bytes(buf[RESPONSE_SIZE:n])
+      except OSError:
+        continue                        # timeout: retry missing chunks
+  finally:
+    sock.close()
+
+  body = b"".join([chunks[i] for i in range(count)])
+  if crc32(body) & 0xffffffff != crc:
+    raise RuntimeError("checksum error")
+  if kind == ERROR:
+    raise RuntimeError(f"server: {str(body,'utf-8')}")
+  return Response(kind,s_hash,cookie,body,sent,received)
@@ -11,6 +11,7 @@
 # --- imports   -----------------------------------------------------------
 
 import builtins
+import os
 import time
 import board
 import gc
@@ -26,10 +27,17 @@ class UIApplication:
 
   # --- constructor   --------------------------------------------------------
 
-  def __init__(self,dataprovider,uiprovider,with_rtc=True):
+  def __init__(self,dataprovider,uiprovider,with_rtc=True,start=None):
     """ constructor """
 
+    self._start = start if start is not None else time.monotonic()
     self._debug = getattr(app_config, "debug", False)
+    self._profiler = None
+    profile = getattr(app_config,"heap_profile",False)
+    if profile:
+      from .heap_profiler import HeapProfiler
+      self._profiler = HeapProfiler(blocks=profile == "blocks")
+    self._begin("setup")
     self._setup(with_rtc)  # setup hardware
     blink_time = getattr(hw_config,"led_blink_init",0.1)
     self.blink(blink_time)
@@ -39,11 +47,19 @@ class UIApplication:
 
     # update internal rtc from external rtc/internet
     if self._rtc_ext:
+      self._rtc_ext.set_store(self._impl.get_state_store(self._debug))
       self._rtc_ext.update(force=self._impl.check_key("key_upd"))
     self._dataprovider = dataprovider
     self._dataprovider.set_wifi(self._impl.wifi(debug=secrets.debugflag))
+    if hasattr(self._dataprovider,"set_display"):
+      self._dataprovider.set_display(self.display)
+    if hasattr(self._dataprovider,"set_store"):
+      self._dataprovider.set_store(self._impl.get_state_store(self._debug))
     self._uiprovider = uiprovider
+    if self._profiler and hasattr(self._uiprovider,"set_profiler"):
+      self._uiprovider.set_profiler(self._profiler)
     self.data = {}
+    self._end("setup")
 
   # --- get HAL   ------------------------------------------------------------
 
@@ -51,19 +67,44 @@ class UIApplication:
   # This expects an object "impl" within the implementing hal_file.
   # All hal implementations are within src/hal/. Filenames must be
   # board.board_id.py, e.g. src/hal/pimoroni_inky_frame_5_7.py
+  #
+  # The name of the HAL can be fixed with hw_config.HAL (e.g. "hal_default"),
+  # otherwise the name resolved by a former boot is read from the
+  # state-store. Only the first boot checks for the file before importing:
+  # a failed import is expensive, since it searches the complete
+  # module-path.
+
+  def _hal_exists(self,hal_name):
+    """ check if a HAL-file for the given name exists """
+
+    hal_dir = __file__.rsplit("/",1)[0] + "/hal/"
+    for ext in [".mpy",".py"]:
+      try:
+        os.stat(hal_dir+hal_name+ext)
+        return True
+      except OSError:
+        pass
+    return False
 
   def _get_hal(self):
     """ read and return hal-object """
 
-    try:
-      hal_file = "base_app.hal."+board.board_id.replace(".","_")
-      hal = builtins.__import__(hal_file,None,None,["impl"],0)
-      self.msg("using board-specific implementation")
-    except Exception as ex:
-      self.msg(f"info: no board specific HAL (ex: {ex})")
-      hal_file = "base_app.hal.hal_default"
-      hal = builtins.__import__(hal_file,None,None,["impl"],0)
-      self.msg("info: using default implementation from HalBase")
+    hal_name = getattr(hw_config,"HAL",None)
+    probed   = False
+    if not hal_name:
+      from .hal.hal_base import load_hal_name, save_hal_name
+      hal_name = load_hal_name(board.board_id)
+    if not hal_name:
+      probed   = True
+      hal_name = board.board_id.replace(".","_")
+      if not self._hal_exists(hal_name):
+        self.msg(f"info: no board specific HAL for {hal_name}")
+        hal_name = "hal_default"
+    hal = builtins.__import__("base_app.hal."+hal_name,None,None,["impl"],0)
+    self.msg(f"using HAL {hal_name}{' (probed)' if probed else ''}")
+    if probed:
+      save_hal_name(hal.impl.get_state_store(self._debug),
+                    board.board_id,hal_name)
     return hal
 
   def _setup(self,with_rtc):
@@ -101,6 +142,23 @@ class UIApplication:
     if self._debug:
       print(text)
 
+  # --- phases of the heap-profiler   ---------------------------------------
+
+  def _begin(self,name):
+    """ start phase of the heap-profiler (app_config.heap_profile) """
+    if self._profiler:
+      self._profiler.begin(name)
+
+  def _end(self,name):
+    """ end phase of the heap-profiler """
+    if self._profiler:
+      self._profiler.end(name)
+
+  def _report(self):
+    """ print report of the heap-profiler """
+    if self._profiler:
+      self._profiler.report()
+
   # --- blink status-led   ---------------------------------------------------
 
   def blink(self,duration,color=RED):
@@ -109,6 +167,15 @@ class UIApplication:
     time.sleep(duration)
     self._impl.led(0,color=color)
 
+  # --- blink status-led (asyncio)   -----------------------------------------
+
+  async def blink_async(self,duration,color=RED):
+    """ blink status-led without blocking other tasks """
+    import asyncio
+    self._impl.led(1,color=color)
+    await asyncio.sleep(duration)
+    self._impl.led(0,color=color)
+
   # --- update data from server   --------------------------------------------
 
   def update_data(self):
@@ -119,22 +186,57 @@ class UIApplication:
     self.data["bat_level"] = self._impl.bat_level()
 
     start = time.monotonic()
+    self._begin("update_data")
     self._dataprovider.update_data(self.data)
+    self._end("update_data")
     duration = time.monotonic()-start
     self.blink(blink_time,color=UIApplication.GREEN)
     self.msg(f"update_data (dataprovider): {duration:f}s")
 
+  # --- update data from server (asyncio)   ----------------------------------
+
+  async def update_data_async(self):
+    """ update data, yield to other tasks while waiting for the server """
+
+    # connect first: a blocking connect then ends before the ui-task starts
+    # and the request is in flight during the complete ui-setup
+    if hasattr(self._dataprovider,"connect_async"):
+      await self._dataprovider.connect_async()
+    blink_time = getattr(hw_config,"led_blink_data",0.3)
+    await self.blink_async(blink_time,color=UIApplication.RED)
+    self.data["bat_level"] = self._impl.bat_level()
+
+    start = time.monotonic()
+    if hasattr(self._dataprovider,"update_data_async"):
+      await self._dataprovider.update_data_async(self.data)
+    else:
+      self._dataprovider.update_data(self.data)
+    duration = time.monotonic()-start
+    await self.blink_async(blink_time,color=UIApplication.GREEN)
+    self.msg(f"update_data_async (dataprovider): {duration:f}s")
+
   # --- handle data-exception   ----------------------------------------------
 
   def handle_exception(self,ex):
-    """ pass exception of data-provider to ui-provider """
+    """ pass exception of data-provider to ui-provider. The ui-provider
+        returns None if the display is unchanged and sets the attribute
+        offline if it shows cached data. Returns True in this case, so
+        the next wakeup is configured.
+    """
 
     blink_time = getattr(hw_config,"led_blink_exception",0.6)
     self.blink(blink_time,color=UIApplication.RED)
     start = time.monotonic()
-    self.update_display(self._uiprovider.handle_exception(ex))
+    self._begin("handle_exception")
+    content = self._uiprovider.handle_exception(ex)
+    self._end("handle_exception")
+    if content is None:
+      self.msg("handle_exception: display unchanged")
+    else:
+      self.update_display(content)
     duration = time.monotonic()-start
     self.msg(f"handle_exception (uiprovider): {duration:f}s")
+    return getattr(self._uiprovider,"offline",False)
 
   # --- create ui   ----------------------------------------------------------
 
@@ -142,10 +244,25 @@ class UIApplication:
     """ create UI. UI-provider might buffer UI for performance """
 
     start = time.monotonic()
+    self._begin("create_ui")
     self._uiprovider.create_ui(self.display)
+    self._end("create_ui")
     duration = time.monotonic()-start
     self.msg(f"create_ui (uiprovider): {duration:f}s")
 
+  # --- create ui (asyncio)   ------------------------------------------------
+
+  async def create_ui_async(self):
+    """ create UI while data is in flight """
+
+    start = time.monotonic()
+    if hasattr(self._uiprovider,"create_ui_async"):
+      await self._uiprovider.create_ui_async(self.display)
+    else:
+      self._uiprovider.create_ui(self.display)
+    duration = time.monotonic()-start
+    self.msg(f"create_ui_async (uiprovider): {duration:f}s")
+
   # --- free memory from UI   ------------------------------------------------
 
   def free_ui_memory(self):
@@ -166,12 +283,15 @@ class UIApplication:
     # update UI with current model
     if not content:
       start = time.monotonic()
+      self._begin("update_ui")
       self._ui = self._uiprovider.update_ui()
+      self._end("update_ui")
       duration = time.monotonic()-start
       self.msg(f"update_ui (uiprovider): {duration:f}s")
 
     # and show content on screen
     start = time.monotonic()
+    self._begin("refresh")
     if content:
       self.display.root_group = content
     else:
@@ -179,17 +299,26 @@ class UIApplication:
     if hasattr(self.display,"time_to_refresh"):
       if self.display.time_to_refresh > 0.0:
         # ttr will be >0 only if system is on running on USB-power
-        time.sleep(self.display.time_to_refresh)
+        self._impl.light_sleep(self.display.time_to_refresh)
     try:
       self.display.refresh()
-      if hasattr(self.display,"busy"):
-        while self.display.busy:
-          time.sleep(0.1)
+      self._impl.wait_for_panel(self.display)
     except RuntimeError:
       pass
+    self._end("refresh")
     duration = time.monotonic()-start
     self.msg(f"update display: {duration:f}s")
 
+  # --- battery-aware wake-policy   ------------------------------------------
+
+  def _get_wake_policy(self):
+    """ return wake-policy (or None) with the current battery-level """
+
+    policy = self._impl.get_wake_policy(debug=self._debug)
+    if policy:
+      policy.record(self.data.get("bat_level",0.0))
+    return policy
+
   # --- shutdown device   ----------------------------------------------------
 
   def shutdown(self,rc):
@@ -197,12 +326,14 @@ class UIApplication:
     self.msg(f"shutdown with {rc=}:")
     if rc:
       if self._rtc_ext and getattr(app_config,"time_table",None):
-        wakeup = self._rtc_ext.get_table_alarm(app_config.time_table)
+        wakeup = self._rtc_ext.get_table_alarm(app_config.time_table,
+                                               self._get_wake_policy())
         self._rtc_ext.set_alarm(wakeup)
       else:
         self.msg("could not configure wakeup")
     else:
       self.msg("not configuring wakeup due to exception")
+    self._impl.get_state_store(self._debug).commit()
     self._impl.shutdown()
 
   # --- cleanup ressources at exit   -----------------------------------------
@@ -211,23 +342,117 @@ class UIApplication:
     """ cleanup ressources """
     self._impl.at_exit()
 
+  # --- sequential lifecycle   -----------------------------------------------
+
+  def _run_sync(self):
+    """ create ui, update data and display in strict sequence """
+
+    self.create_ui()      # ui-provider should buffer this for performance
+    self.update_data()
+    self.update_display()
+
+  # --- next page without network   ------------------------------------------
+
+  def _run_page(self):
+    """ show next page of the last data (key_page), returns False if the
+        data-provider has no data for paging
+    """
+
+    if not hasattr(self._dataprovider,"update_page"):
+      return False
+    self.data["bat_level"] = self._impl.bat_level()
+    if not self._dataprovider.update_page(self.data):
+      self.msg("no data for paging, updating data")
+      return False
+    self.create_ui()
+    self.update_display()
+    return True
+
+  # --- overlapping lifecycle   ----------------------------------------------
+
+  async def _run_tasks(self):
+    """ start data-task first, create ui while the network is busy """
+
+    import asyncio
+    data_task = asyncio.create_task(self.update_data_async())
+    await asyncio.sleep(0)          # let the data-task start the radio
+    await self.create_ui_async()
+    await data_task
+
+  def _run_async(self):
+    """ overlap network and ui-creation using asyncio """
+
+    import asyncio
+    self._begin("run_tasks")                # data and ui overlap
+    asyncio.run(self._run_tasks())
+    self._end("run_tasks")
+    self.update_display()
+
+  # --- sleep until next slot of time-table   --------------------------------
+
+  def _sleep_until_next_slot(self):
+    """ sleep until next slot of the time-table """
+
+    time_table = getattr(app_config,"time_table",None)
+    policy = self._get_wake_policy()
+    if time_table and policy:
+      duration = policy.next_slot(time_table) - time.time()
+    elif time_table:
+      from .time_table import next_slot
+      duration = next_slot(time_table) - time.time()
+    else:
+      duration = getattr(app_config,"loop_interval",900)
+    self.msg(f"sleeping for {duration:.0f}s")
+    self._impl.get_state_store(self._debug).commit()
+    self._impl.sleep(max(duration,0))
+
+  # --- run resident loop   --------------------------------------------------
+
+  def run_forever(self):
+    """ resident main processing (Linux-hosts): fonts, display, session and
+        ui-objects are kept, the ui-provider only rebuilds changed parts
+    """
+
+    self.create_ui()
+    while True:
+      try:
+        self.update_data()
+        self.update_display()
+        self.msg(f"refresh: {time.monotonic()-self._start:f}s")
+      except Exception as ex1:
+        self.msg(f"failed: {ex1=}")
+        try:
+          self.handle_exception(ex1)
+        except Exception as ex2:
+          self.msg(f"failed to handle exception: {ex2=}")
+      self._report()
+      self._sleep_until_next_slot()
+      self._start = time.monotonic()
+
   # --- run single execution   -----------------------------------------------
 
   def run_once(self):
     """ single execution main processing """
 
+    if getattr(app_config,"async_lifecycle",False):
+      mode, run = "async", self._run_async
+    else:
+      mode, run = "sync", self._run_sync
     try:
-      self.create_ui()      # ui-provider should buffer this for performance
-      self.update_data()
-      self.update_display()
+      if self._impl.check_key("key_page") and self._run_page():
+        mode = "page"
+      else:
+        run()
+      self.msg(f"wake-to-refresh ({mode}): {time.monotonic()-self._start:f}s")
       rc = True
     except Exception as ex1:
       self.msg(f"failed: {ex1=}")
+      rc = False
       try:
-        self.handle_exception(ex1)
+        rc = self.handle_exception(ex1)
       except Exception as ex2:
         self.msg(f"failed to handle exception: {ex2=}")
-      rc = False
 
+    self._report()
     self.shutdown(rc)                      # pygame will instead wait for quit
     self._impl.deep_sleep()                # in case shutdown is a noop
@@ -0,0 +1,157 @@
+# ----------------------------------------------------------------------------
+# wake_policy.py: battery-aware selection of wake-slots from a time-table.
+#
+# The policy keeps a history of battery-voltages, estimates the remaining
+# runtime and skips slots of the time-table at low voltages. Configuration
+# (hw_config.wake_policy or attribute wake_policy of the HAL):
+#
+#   {
+#     "levels":   [(3.3,"hourly"),(3.1,"daily")],  # (below volts, mode)
+#     "v_empty":  3.0,           # voltage of an empty battery
+#     "min_days": 3,             # use next mode if estimated runtime is shorter
+#     "samples":  24,            # size of the voltage-history
+#     "interval": 21600          # minimal seconds between samples (flash-wear)
+#   }
+#
+# The history is kept in the state-store (see base_app.state_store).
+#
+# Modes: "all" (every slot), "hourly" (only slots on the hour) and
+# "daily" (only the first slot of a day).
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# ----------------------------------------------------------------------------
+
+import time
+
+from .time_table import next_slot
+
+# --- class WakePolicy   -----------------------------------------------------
+
+class WakePolicy:
+
+  MODES = ["all", "hourly", "daily"]
+
+  # --- constructor   --------------------------------------------------------
+
+  def __init__(self,config,store,debug=False):
+    """ constructor """
+
+    self._levels   = sorted(config.get("levels",[]),reverse=True)
+    self._v_empty  = config.get("v_empty",3.0)
+    self._min_days = config.get("min_days",0)
+    self._samples  = config.get("samples",24)
+    self._interval = config.get("interval",21600)
+    self._store    = store
+    self._debug    = debug
+    self._history  = None
+    self._level    = None            # current voltage (not persisted)
+
+  # --- print debug-message   ------------------------------------------------
+
+  def _msg(self,text):
+    """ print (debug) message """
+    if self._debug:
+      print(text)
+
+  # --- persistent voltage-history   -----------------------------------------
+
+  def _load(self):
+    """ return history: ring-buffer of (epoch,volts) """
+
+    if self._history is None:
+      self._history = self._store.ring("wake_policy","<If",self._samples)
+    return self._history
+
+  # --- record battery-level   -----------------------------------------------
+
+  def record(self,level,now=None):
+    """ add voltage to history (at most one sample per interval, so the
+        state-store only writes to flash once per interval)
+    """
+
+    if not level or level <= 0:
+      return                                       # no voltage-monitor
+    if now is None:
+      now = time.time()
+    self._level = level
+    history = self._load()
+    if len(history) and now - history[-1][0] < self._interval:
+      return
+    history.append((int(now),level))
+
+  # --- estimate remaining runtime   -----------------------------------------
+
+  def runtime(self):
+    """ return estimated remaining runtime in seconds (or None) """
+
+    history = self._load()
+    n = len(history)
+    if n < 2:
+      return None
+
+    # least-squares slope of voltage over time
+    t0 = history[0][0]
+    mean_t = sum(h[0]-t0 for h in history)/n
+    mean_v = sum(h[1] for h in history)/n
+    var_t  = sum((h[0]-t0-mean_t)**2 for h in history)
+    if not var_t:
+      return None
+    slope = sum((h[0]-t0-mean_t)*(h[1]-mean_v) for h in history)/var_t
+    if slope >= 0:
+      return None
+    level = self._level or history[-1][1]
+    return max(0,(level-self._v_empty)/-slope)
+
+  # --- select mode   --------------------------------------------------------
+
+  def mode(self):
+    """ return mode for the current voltage and estimated runtime """
+
+    history = self._load()
+    if not len(history):
+      return WakePolicy.MODES[0]
+    level = self._level or history[-1][1]
+    mode = WakePolicy.MODES[0]
+    for threshold,level_mode in self._levels:
+      if level < threshold:
+        mode = level_mode
+    runtime = self.runtime()
+    if runtime is not None and runtime < self._min_days*86400:
+      index = min(WakePolicy.MODES.index(mode)+1,len(WakePolicy.MODES)-1)
+      mode = WakePolicy.MODES[index]
+    if runtime is None:
+      self._msg(f"wake_policy: {level:0.2f}V, runtime: unknown, mode: {mode}")
+    else:
+      self._msg(f"wake_policy: {level:0.2f}V, runtime: {runtime/86400:0.1f}d, "
+                f"mode: {mode}")
+    return mode
+
+  # --- next slot   ----------------------------------------------------------
+
+  def next_slot(self,time_table,now_epoch=None):
+    """ return epoch-time of the next slot allowed by the current mode """
+
+    if now_epoch is None:
+      now_epoch = time.time()
+    mode = self.mode()
+    first = slot = next_slot(time_table,now_epoch)
+    for _ in range(200):
+      ts  = time.localtime(slot)
+      sod = slot - (ts.tm_hour*3600 + ts.tm_min*60 + ts.tm_sec)
+      if mode == "hourly":
+        if ts.tm_min == 0:
+          return slot
+        # skip to the end of the hour
+        slot = next_slot(time_table,slot - ts.tm_min*60 - ts.tm_sec + 3599)
+      elif mode == "daily":
+        if next_slot(time_table,sod-1) == slot:
+          return slot
+        # skip to the end of the day
+        slot = next_slot(time_table,sod + 86399)
+      else:
+        return slot
+    return first
@@ -11,7 +11,6 @@
 import board
 import time
 import socketpool
-import adafruit_requests
 
 from settings import secrets
 
@@ -27,6 +26,8 @@ class WifiImpl:
       secrets.channel = 0
     if not hasattr(secrets,'timeout'):
       secrets.timeout = None
+    if not hasattr(secrets,'connect_wait'):
+      secrets.connect_wait = 10
 
     self._debug    = debug
     self._radio    = None
@@ -74,11 +75,38 @@ class WifiImpl:
     self._pool = socketpool.SocketPool(self._radio)
     self._requests = None
 
+  # --- connect without blocking other tasks (asyncio)   --------------------
+
+  async def connect_async(self):
+    """ connect to AP. radio.connect() blocks, but if the supervisor
+        connects (CIRCUITPY_WIFI_SSID in settings.toml), other tasks run
+        while waiting for the connection (at most secrets.connect_wait
+        seconds, then connect() takes over).
+    """
+
+    import asyncio
+    import os
+    if not self._radio:
+      import wifi
+      self._radio = wifi.radio
+    if (not self._pool and self._radio.enabled and
+        os.getenv("CIRCUITPY_WIFI_SSID")):
+      if self._debug:
+        print("waiting for connection to %s" % secrets.ssid)
+      deadline = time.monotonic() + secrets.connect_wait
+      while not self._radio.connected and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+      if self._radio.connected:
+        self._pool = socketpool.SocketPool(self._radio)
+        self._requests = None
+    self.connect()
+
   # --- return requests-object   --------------------------------------------
 
   def _get_request(self):
     """ return requests-object """
     if not self._requests:
+      import adafruit_requests           # deferred: expensive import
       self._requests = adafruit_requests.Session(self._pool)
     return self._requests
 
@@ -91,12 +119,42 @@ class WifiImpl:
 
   # --- execute get-request   -----------------------------------------------
 
-  def get(self,url):
+  def get(self,url,headers=None):
     """ process get-request """
     self.connect()
     if self._debug:
       print(f"wifi: get({url})")
-    return self._get_request().get(url)
+    return self._get_request().get(url,headers=headers)
+
+  # --- execute get-request (asyncio)   -------------------------------------
+
+  async def get_async(self,url,headers=None):
+    """ process get-request without blocking other tasks """
+    from .http_async import get
+    await self.connect_async()
+    if self._debug:
+      print(f"wifi: get_async({url})")
+    return await get(self._pool,url,headers=headers)
+
+  # --- execute get-request for line-data (asyncio)   -----------------------
+
+  async def get_lines_async(self,url,on_line,headers=None):
+    """ process get-request, pass every line of the body to on_line """
+    from .http_async import get_lines
+    await self.connect_async()
+    if self._debug:
+      print(f"wifi: get_lines_async({url})")
+    return await get_lines(self._pool,url,on_line,headers=headers)
+
+  # --- execute request with the UDP-protocol   -----------------------------
+
+  def get_udp(self,url,**kwargs):
+    """ process request with the compact UDP-protocol (see udp_client) """
+    from .udp_client import get
+    self.connect()
+    if self._debug:
+      print(f"wifi: get_udp({url})")
+    return get(self._pool,url,**kwargs)
 
   # --- execute transmit-command   ------------------------------------------
 
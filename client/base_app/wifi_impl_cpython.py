@@ -0,0 +1,71 @@
+# ----------------------------------------------------------------------------
+# wifi_impl_cpython.py: Wifi-implementation for CPython (Linux-hosts)
+#
+# The network is managed by the host, so this class only maintains a
+# requests-session. The session (and its sockets) is kept for the
+# lifetime of the object.
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# ----------------------------------------------------------------------------
+
+import socket
+
+class WifiImpl:
+  """ request-implementation using sockets from CPython """
+
+  def __init__(self,debug=False):
+    """ constructor """
+    self.debug = debug
+    self._http = None
+
+  def connect(self):
+    """ create requests-session (once) """
+    if not self._http:
+      import adafruit_requests
+      self._http = adafruit_requests.Session(socket)
+
+  async def connect_async(self):
+    """ create requests-session (the host manages the network) """
+    self.connect()
+
+  def get(self,url,headers=None):
+    """ process get-request """
+    self.connect()
+    if self.debug:
+      print(f"wifi: get({url})")
+    return self._http.get(url,headers=headers)
+
+  async def get_async(self,url,headers=None):
+    """ process get-request without blocking other tasks """
+    from .http_async import get
+    return await get(socket,url,headers=headers)
+
+  async def get_lines_async(self,url,on_line,headers=None):
+    """ process get-request, pass every line of the body to on_line """
+    from .http_async import get_lines
+    return await get_lines(socket,url,on_line,headers=headers)
+
+  def get_udp(self,url,**kwargs):
+    """ process request with the compact UDP-protocol (see udp_client) """
+    from .udp_client import get
+    if self.debug:
+      print(f"wifi: get_udp({url})")
+    return get(socket,url,**kwargs)
+
+  @property
+  def radio(self):
+    """ return ourselves as radio """
+    return self
+
+  @property
+  def connected(self):
+    """ emulate radio.connected """
+    return self._http is not None
+
+  def deep_sleep(self):
+    """ nothing to do """
+    pass
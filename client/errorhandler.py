@@ -16,6 +16,7 @@ import displayio
 from vectorio import Rectangle
 
 from ui_settings import UI_SETTINGS, UI_PALETTE, COLORS
+import rle_image
 
 class ErrorHandler:
 
@@ -51,10 +52,5 @@ class ErrorHandler:
                            color_index=COLORS.WHITE)
     g.append(background)
 
-    f = open(UI_SETTINGS.NO_NETWORK, "rb")
-    pic = displayio.OnDiskBitmap(f)
-    x = int((self._display.width-pic.width)/2)
-    y = int((self._display.height-pic.height)/2)
-    t = displayio.TileGrid(pic, x=x,y=y, pixel_shader=UI_PALETTE)
-    g.append(t)
+    g.append(rle_image.get_centered(UI_SETTINGS.NO_NETWORK,self._display))
     return g
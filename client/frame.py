@@ -15,8 +15,6 @@ import gc
 import displayio
 from vectorio import Rectangle
 from adafruit_display_text import label
-from adafruit_display_shapes.line import Line
-from adafruit_bitmap_font import bitmap_font
 
 from ui_settings import UI_SETTINGS, COLORS, UI_COLOR_MAP, UI_PALETTE
 
@@ -26,14 +24,21 @@ class Frame:
 
   # --- constructor   --------------------------------------------------------
 
-  def __init__(self,display,data):
+  def __init__(self,display,fonts,data=None):
     """ constructor: create ressources """
 
     self._display     = display
+    self._fonts       = fonts
     self._data        = data
-    self._status_font = bitmap_font.load_font(UI_SETTINGS.STATUS_FONT)
+    self._status_font = fonts["status"]
     self._margin      = UI_SETTINGS.MARGIN
 
+  # --- set data   -----------------------------------------------------------
+
+  def set_data(self,data):
+    """ set data for header and footer """
+    self._data = data
+
   # --- create root-group   --------------------------------------------------
 
   def get_group(self):
@@ -58,8 +63,7 @@ class Frame:
       bg_color = COLORS.BLACK
     else:
       bg_color = COLORS.RED
-    day_font = bitmap_font.load_font(UI_SETTINGS.DAY_FONT)
-    day = label.Label(day_font,text=self._data["day"],
+    day = label.Label(self._fonts["day"],text=self._data["day"],
                       color=UI_PALETTE[UI_SETTINGS.BACKGROUND],
                       background_color=UI_PALETTE[bg_color],
                       background_tight=True,
@@ -86,11 +90,12 @@ class Frame:
     day_box.y = 0
     header.append(day_box)
 
-    sep = Line(0,h,self._display.width,h,color=UI_PALETTE[UI_SETTINGS.FOREGROUND])
+    sep = Rectangle(pixel_shader=UI_PALETTE,x=0,y=h,
+                    width=self._display.width,height=1,
+                    color_index=UI_SETTINGS.FOREGROUND)
     header.append(sep)
 
-    date_font   = bitmap_font.load_font(UI_SETTINGS.DATE_FONT)
-    date = label.Label(date_font,text=self._data["date"],
+    date = label.Label(self._fonts["date"],text=self._data["date"],
                       color=UI_PALETTE[UI_SETTINGS.FOREGROUND],
                       background_color=UI_PALETTE[UI_SETTINGS.BACKGROUND],
                       background_tight=True,
@@ -99,15 +104,29 @@ class Frame:
     header.append(date)
     return (header,h)
 
+  # --- height of footer   ---------------------------------------------------
+
+  def get_footer_height(self):
+    """ return (maximal) height of the footer """
+    return self._status_font.get_bounding_box()[1] + 2*self._margin
+
   # --- create footer   ------------------------------------------------------
 
   def get_footer(self):
     """ create complete footer """
 
     footer = displayio.Group()
+    if self._data.get("offline",None):
+      text  = f"Offline since {self._data['offline']}"
+      color = UI_PALETTE[COLORS.RED]
+    else:
+      text  = f"Updated: {self._data['now']}"
+      color = UI_PALETTE[UI_SETTINGS.FOREGROUND]
+    if self._data.get("page",None):
+      text += f"  {self._data['page']}"
     status = label.Label(self._status_font,
-                         text=f"Updated: {self._data['now']}",
-                         color=UI_PALETTE[UI_SETTINGS.FOREGROUND],
+                         text=text,
+                         color=color,
                          background_color=UI_PALETTE[UI_SETTINGS.BACKGROUND],
                          base_alignment=True,
                          anchor_point=(0,1),
@@ -130,9 +149,9 @@ class Frame:
 
     h = max(status.bounding_box[3],level.bounding_box[3]) + 2*self._margin
     status.anchor_point = (0,level.bounding_box[3]/status.bounding_box[3])
-    sep = Line(0,self._display.height-h,
-               self._display.width,self._display.height-h,
-               color=UI_PALETTE[UI_SETTINGS.FOREGROUND])
+    sep = Rectangle(pixel_shader=UI_PALETTE,x=0,y=self._display.height-h,
+                    width=self._display.width,height=1,
+                    color_index=UI_SETTINGS.FOREGROUND)
 
     footer.append(status)
     footer.append(level)
@@ -35,6 +35,9 @@ if getattr(app_config,"debug",False):
 app = None
 atexit.register(at_exit,app)
 agenda = Agenda()                                 
-app = UIApplication(agenda,agenda,with_rtc=True)
+app = UIApplication(agenda,agenda,with_rtc=True,start=start)
 print(f"startup: {time.monotonic()-start:f}s")
-app.run_once()
+if getattr(app_config,"resident",False):
+  app.run_forever()
+else:
+  app.run_once()
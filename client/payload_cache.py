@@ -0,0 +1,115 @@
+# -------------------------------------------------------------------------
+# Display Agenda of the current day on a 5.7" ACEP e-paper display.
+#
+# This class keeps the last good payload of the server on flash. The file
+# is only written if the content changes (flash-wear), so the "now"-field
+# of the payload is not part of the comparison.
+#
+# Note: on CircuitPython, the filesystem must be writable by code
+# (storage.remount("/",readonly=False) in boot.py). Otherwise the cache
+# is silently disabled.
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import time
+import json
+
+# fields of the payload that are saved
+KEYS = ["day", "weekday", "date", "now", "events", "glyphs"]
+
+# --- PayloadCache class   ---------------------------------------------------
+
+class PayloadCache:
+
+  # --- constructor   --------------------------------------------------------
+
+  def __init__(self,filename,debug=False):
+    """ constructor """
+
+    self._filename = filename
+    self._debug    = debug
+    self._state    = None
+
+  # --- read state from flash   ----------------------------------------------
+
+  def _read(self):
+    """ read state (once) """
+
+    if self._state is None:
+      try:
+        with open(self._filename,"r") as f:
+          self._state = json.load(f)
+      except (OSError,ValueError):
+        self._state = {}
+    return self._state
+
+  # --- write state to flash   -----------------------------------------------
+
+  def _write(self,state):
+    """ write state, ignore errors (read-only filesystem) """
+
+    self._state = state
+    try:
+      with open(self._filename,"w") as f:
+        json.dump(state,f,separators=(",",":"))
+      return True
+    except OSError as ex:
+      if self._debug:
+        print(f"could not write {self._filename}: {ex}")
+      return False
+
+  # --- compare payloads   ---------------------------------------------------
+
+  @staticmethod
+  def _content(data):
+    """ return data without the time of the update """
+    return {key: data.get(key,None) for key in KEYS if key != "now"}
+
+  # --- save payload   -------------------------------------------------------
+
+  def save(self,data):
+    """ save payload if the content changed or if we were offline """
+
+    state = self._read()
+    if (not state.get("offline",None) and "data" in state and
+        PayloadCache._content(state["data"]) == PayloadCache._content(data)):
+      return False
+    payload = {key: data[key] for key in KEYS if key in data}
+    return self._write({"data": payload, "saved": time.time()})
+
+  # --- load payload for offline-rendering   ---------------------------------
+
+  def load(self):
+    """ return (data,since,shown) or None if the cache is missing or
+        not from today. since is the time of the first failure, shown is
+        the number of events displayed at the last offline-refresh.
+    """
+
+    state = self._read()
+    if not "data" in state:
+      return None
+    now = time.localtime()
+    saved = time.localtime(int(state["saved"]))
+    if saved[:3] != now[:3]:
+      return None
+    return (state["data"],
+            state.get("offline",None) or time.time(),
+            state.get("shown",None))
+
+  # --- remember offline-state   ---------------------------------------------
+
+  def set_offline(self,since,shown):
+    """ save start of offline-period and number of displayed events """
+
+    state = self._read()
+    if state.get("offline",None) == since and state.get("shown",None) == shown:
+      return
+    state = dict(state)
+    state["offline"] = since
+    state["shown"]   = shown
+    self._write(state)
@@ -0,0 +1,70 @@
+# -------------------------------------------------------------------------
+# Display Agenda of the current day on a 5.7" ACEP e-paper display.
+#
+# This module implements a decoder for palette-indexed run-length images
+# (created by tools/bmp2rle.py). Pixel-values are already indices into
+# UI_PALETTE, so no color-conversion is necessary.
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import displayio
+try:
+  import bitmaptools
+except ImportError:
+  bitmaptools = None
+
+from ui_settings import UI_PALETTE
+
+MAGIC = b"RLE1"
+
+# --- decode image   ---------------------------------------------------------
+
+def load(filename):
+  """ read image and return displayio.Bitmap """
+
+  with open(filename,"rb") as f:
+    data = f.read()
+  if data[:4] != MAGIC:
+    raise ValueError(f"{filename}: no RLE-image")
+  width  = data[4] | (data[5]<<8)
+  height = data[6] | (data[7]<<8)
+
+  # a new bitmap is filled with index 0, so we skip these runs
+  bitmap = displayio.Bitmap(width,height,len(UI_PALETTE))
+  x = y = 0
+  i = 8
+  while i < len(data):
+    b = data[i]
+    color = (b>>4) & 0x07
+    if b & 0x80:
+      n  = (((b & 0x0F)<<8) | data[i+1]) + 1
+      i += 2
+    else:
+      n  = (b & 0x0F) + 1
+      i += 1
+    if color:
+      if bitmaptools:
+        bitmaptools.fill_region(bitmap,x,y,x+n,y+1,color)
+      else:
+        for xi in range(x,x+n):
+          bitmap[xi,y] = color
+    x += n
+    if x >= width:                  # runs never span rows
+      x  = 0
+      y += 1
+  return bitmap
+
+# --- return centered image   ------------------------------------------------
+
+def get_centered(filename,display):
+  """ return TileGrid with image centered on the display """
+
+  pic = load(filename)
+  x = int((display.width-pic.width)/2)
+  y = int((display.height-pic.height)/2)
+  return displayio.TileGrid(pic,x=x,y=y,pixel_shader=UI_PALETTE)
@@ -10,11 +10,8 @@
 
 import board
 
-import busio
-from adafruit_bus_device.i2c_device import I2CDevice
-import struct
-import displayio
-import fourwire
+# Note: imports for the display are within the factory-methods, since
+# they are only needed when the display is actually created
 
 # pinout for Pimoroni Inky-Impression
 SCK_PIN   = board.SCLK
@@ -40,19 +37,28 @@ secrets.retry     = 2
 secrets.debugflag = False
 #secrets.channel   = 6       # optional
 #secrets.timeout   = 10      # optional
+#secrets.connect_wait = 10   # optional: wait for settings.toml-connect (async)
 
 secrets.time_url = 'http://worldtimeapi.org/api/ip'
 secrets.net_update = True    # update time if necessary
+#secrets.time_max_error = 30  # sync only if predicted drift exceeds 30s
+#secrets.time_drift_ppm = 100 # assumed drift until measured (default: 100)
 
 # hardware configuration (optional)  -----------------------------------------
 
 hw_config = Settings()
+#hw_config.HAL = "hal_default"   # skip lookup of board-specific HAL
+#hw_config.wake_policy = {       # skip slots at low battery (see README)
+#  "levels": [(3.3,"hourly"),(3.1,"daily")], "v_empty": 3.0, "min_days": 3}
 
 # --- helper-function for Inky-displays   -------------------------------------
 
 def _get_inky_info():
   """ try to return tuple (width,height,color) """
 
+  import struct
+  from adafruit_bus_device.i2c_device import I2CDevice
+
   # old 7.3 Inky-Impression not supported here
   COLOR = [None, 'black', 'red', 'yellow', None, 'acep7', 'e673', 'el133']
 
@@ -76,6 +82,10 @@ def _get_inky_info():
 def _get_display(config):
   """ create display for Inky-Impression """
 
+  import busio
+  import displayio
+  import fourwire
+
   displayio.release_displays()
   width,height,inky_type = _get_inky_info()
   spi = busio.SPI(SCK_PIN,MOSI=MOSI_PIN,MISO=MISO_PIN)
@@ -105,6 +115,7 @@ def _get_keypad(hal):
 
 hw_config.DISPLAY = _get_display
 hw_config.get_keypad = _get_keypad
+hw_config.KEY_PINS = BTN_PINS        # wake from deep-sleep with the keys
 hw_config.LED     = LED_PIN
 
 # default blink-time
@@ -112,16 +123,28 @@ hw_config.LED     = LED_PIN
 #hw_config.led_blink_power_off = 0.1
 #hw_config.led_blink_data = 0.3
 #hw_config.led_blink_exception = 0.6
+#hw_config.panel_poll = 1.0          # light-sleep while the panel is busy
 
 # key-mappings (value is index into BTN_PINS)
 hw_config.key_on  = 0 # pin A
 hw_config.key_upd = 1 # pin B
 hw_config.key_off = 2 # pin C
+#hw_config.key_page = 3 # pin D: next page of the last agenda (no network)
 
 # app configuration   --------------------------------------------------------
 
 app_config = Settings()
 app_config.data_url = 'http://my-calendar2json-server-url'
+#app_config.async_lifecycle = True  # overlap network and ui-setup (asyncio)
+                                    # association only overlaps with
+                                    # CIRCUITPY_WIFI_SSID in settings.toml,
+                                    # otherwise it blocks before the ui-setup
+#app_config.stream_url = 'http://my-calendar2json-server-url/stream' # asyncio
+#app_config.udp_url = 'udp://my-calendar2json-server:11082' # see README
+#app_config.device_id = 'kitchen' # for the udp-protocol
+#app_config.resident = True         # Linux-hosts: keep running (see README)
+#app_config.payload_cache = None    # disable offline-cache (see README)
+#app_config.heap_profile = True     # heap-profile per phase (see README)
 app_config.time_table = [
   ((9,9,1),(0,0,1)),          # from 9 to 9 every hour, i.e. only at 9
   ((9,9,1),(0,0,1)),          # from minute 0 to 0 every minute, i.e. only at 0
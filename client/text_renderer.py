@@ -0,0 +1,150 @@
+# -------------------------------------------------------------------------
+# Display Agenda of the current day on a 5.7" ACEP e-paper display.
+#
+# This class renders boxes and text directly into a single palette-bitmap.
+# Glyphs are copied from the loaded fonts with bitmaptools (if available),
+# so the complete content needs one Bitmap and one TileGrid instead of a
+# Bitmap and TileGrid for every label.
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import displayio
+try:
+  import bitmaptools
+except ImportError:
+  bitmaptools = None
+
+from ui_settings import UI_PALETTE
+
+# --- BitmapRenderer class   -------------------------------------------------
+
+class BitmapRenderer:
+
+  # index for transparent pixels of colored glyphs (not part of UI_PALETTE)
+  TRANSPARENT = len(UI_PALETTE)
+
+  # --- constructor   --------------------------------------------------------
+
+  def __init__(self,width,height,bg_color):
+    """ constructor: create bitmap """
+
+    # all bitmaps need the same bits per value for bitmaptools.blit()
+    self.bitmap = displayio.Bitmap(width,height,BitmapRenderer.TRANSPARENT+1)
+    self.bitmap.fill(bg_color)
+    self._glyphs = {}
+
+  # --- metrics of text   ----------------------------------------------------
+
+  @staticmethod
+  def text_width(font,text):
+    """ return width of text (sum of glyph-advances) """
+
+    width = 0
+    for c in text:
+      glyph = font.get_glyph(ord(c))
+      if glyph:
+        width += glyph.shift_x
+    return width
+
+  @staticmethod
+  def text_box(font,text):
+    """ return (top,bottom) of the ink of the text relative to the baseline """
+
+    top = bottom = 0
+    for c in text:
+      glyph = font.get_glyph(ord(c))
+      if glyph:
+        top    = max(top,glyph.height+glyph.dy)
+        bottom = min(bottom,glyph.dy)
+    return (top,bottom)
+
+  # --- return TileGrid for bitmap   -----------------------------------------
+
+  def get_tilegrid(self,x=0,y=0):
+    """ return TileGrid """
+    return displayio.TileGrid(self.bitmap,pixel_shader=UI_PALETTE,x=x,y=y)
+
+  # --- fill rectangle   -----------------------------------------------------
+
+  def fill_rect(self,x,y,width,height,color):
+    """ fill rectangle (clipped to the bitmap) """
+
+    x1, y1 = max(x,0), max(y,0)
+    x2 = min(x+width,self.bitmap.width)
+    y2 = min(y+height,self.bitmap.height)
+    if x1 >= x2 or y1 >= y2:
+      return
+    if bitmaptools:
+      bitmaptools.fill_region(self.bitmap,x1,y1,x2,y2,color)
+    else:
+      for yi in range(y1,y2):
+        for xi in range(x1,x2):
+          self.bitmap[xi,yi] = color
+
+  # --- return colored copy of glyph   ---------------------------------------
+
+  def _colored_glyph(self,font,code,glyph,color):
+    """ return (cached) glyph-bitmap with color and transparent background """
+
+    key = (id(font),code,color)
+    bmp = self._glyphs.get(key,None)
+    if not bmp:
+      bmp = displayio.Bitmap(glyph.width,glyph.height,
+                             BitmapRenderer.TRANSPARENT+1)
+      bmp.fill(BitmapRenderer.TRANSPARENT)
+      src = glyph.bitmap
+      for yi in range(glyph.height):
+        for xi in range(glyph.width):
+          if src[xi,yi]:
+            bmp[xi,yi] = color
+      self._glyphs[key] = bmp
+    return bmp
+
+  # --- draw single glyph   --------------------------------------------------
+
+  def _draw_glyph(self,font,code,glyph,x,y,color):
+    """ draw glyph with upper left corner at x,y (clipped vertically) """
+
+    y1 = max(0,-y)
+    y2 = min(glyph.height,self.bitmap.height-y)
+    if y1 >= y2:
+      return
+    if bitmaptools:
+      bitmaptools.blit(self.bitmap,self._colored_glyph(font,code,glyph,color),
+                       x,y+y1,x1=0,y1=y1,x2=glyph.width,y2=y2,
+                       skip_source_index=BitmapRenderer.TRANSPARENT)
+    else:
+      src = glyph.bitmap
+      for yi in range(y1,y2):
+        for xi in range(glyph.width):
+          if src[xi,yi]:
+            self.bitmap[x+xi,y+yi] = color
+
+  # --- draw text   ----------------------------------------------------------
+
+  def text(self,font,text,x,y,color,box=None):
+    """ draw text starting at x, vertically centered at y.
+        box is (top,bottom) from text_box(), default is the box of the text.
+        Glyphs beyond the right border are dropped.
+    """
+
+    top,bottom = box if box else BitmapRenderer.text_box(font,text)
+    baseline   = y + (top+bottom)//2
+    max_x      = self.bitmap.width
+    for c in text:
+      code  = ord(c)
+      glyph = font.get_glyph(code)
+      if not glyph:
+        continue
+      gx = x + glyph.dx
+      if gx + glyph.width > max_x:
+        break
+      if glyph.width and glyph.height and gx >= 0:
+        self._draw_glyph(font,code,glyph,gx,
+                         baseline-glyph.height-glyph.dy,color)
+      x += glyph.shift_x
@@ -52,7 +52,9 @@ UI_SETTINGS.TEXT_FONT = "fonts/DejaVuSerif-20.bdf"
 UI_SETTINGS.STATUS_FONT = "fonts/DejaVuSerif-18.bdf"
 UI_SETTINGS.MARGIN =    5
 UI_SETTINGS.PADDING =   3
+UI_SETTINGS.RENDER_BITMAP = False   # True: render events into one bitmap
+UI_SETTINGS.GC_EVENTS = True        # collect garbage after every event-box
 UI_SETTINGS.FOREGROUND = COLORS.BLACK
 UI_SETTINGS.BACKGROUND = COLORS.WHITE
-UI_SETTINGS.NO_NETWORK = "images/no-server-connection.bmp"
-UI_SETTINGS.NO_EVENTS  = "images/empty-agenda.bmp"
+UI_SETTINGS.NO_NETWORK = "images/no-server-connection.rle"
+UI_SETTINGS.NO_EVENTS  = "images/empty-agenda.rle"
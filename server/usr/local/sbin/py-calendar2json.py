@@ -12,11 +12,19 @@
 CONFIG_FILE = "py-calendar2json.json"
 
 import caldav
+import vobject
 import pytz
 import datetime
+import concurrent.futures, multiprocessing
 from operator import itemgetter
-import locale, http.server, json, signal, os, sys
+import locale, http.server, socketserver, json, signal, os, sys
+import gzip, zlib, threading, time, resource, hmac
+import urllib.parse, re, struct, mmap, bisect
+import dateutil.rrule
 from   argparse import ArgumentParser
+from   xml.etree import ElementTree
+
+ENCODINGS = ["gzip", "deflate"]           # supported content-encodings
 
 # --- helper class to convert a dict to an object   --------------------------
 
@@ -25,156 +33,1870 @@ class Options:
     for key in d:
       setattr(self,key,d[key])
 
-# --- handler class   --------------------------------------------------------
+# --- cache for encoded responses   ------------------------------------------
 
-class Calendar2json(http.server.BaseHTTPRequestHandler):
-  """ Request-handler class """
+class ResponseCache:
+  """ cache responses (plain and precompressed) for a given time """
 
-  def log_request(*args,**kw):
-    """ prevent logging unless in debug mode """
-    if settings.debug:
-      http.server.BaseHTTPRequestHandler.log_request(*args,**kw)
+  def __init__(self,ttl):
+    """ constructor """
+    self._ttl     = ttl
+    self._entries = {}
+    self._lock    = threading.Lock()
 
-  def do_GET(self):
-    """ process get-requests """
-
-    events,is_holiday = self._get_agenda()
-    now = datetime.datetime.now()
+  def get(self,key):
+    """ return cached bodies for key or None if missing/expired """
+    with self._lock:
+      entry = self._entries.get(key)
+    if entry and time.monotonic() - entry[0] < self._ttl:
+      return entry[1]
+    return None
 
-    result = {
-      # time-related fields
-      "day": now.strftime("%d"),        # day of month
-      "weekday": now.strftime("%w") != "0" and not is_holiday,
-      "date": now.strftime("%A %x"),    # Weekday date
-      "now": now.strftime("%x %X"),     # date time
-      # event-data
-      "events": events
+  def put(self,key,data):
+    """ compress and cache data, return dict with all encodings """
+    bodies = {
+      "identity": data,
+      "gzip":     gzip.compress(data,compresslevel=9,mtime=0),
+      "deflate":  zlib.compress(data,9)
       }
-    json_data = json.dumps(result,indent=2).encode(encoding='utf_8')
-    self.send_response(http.HTTPStatus.OK.value)
-    self.send_header("Content-Type","application/json")
-    self.send_header("Content-Length",str(len(json_data)))
-    self.end_headers()
-    self.wfile.write(json_data)
+    now = time.monotonic()
+    with self._lock:
+      for k in [k for k,v in self._entries.items() if now-v[0] >= self._ttl]:
+        del self._entries[k]
+      self._entries[key] = (now,bodies)
+    return bodies
 
-  # --- read agendas from caldav-servers   ------------------------------------
+  def clear(self):
+    """ remove all entries, return number of removed entries """
+    with self._lock:
+      count = len(self._entries)
+      self._entries.clear()
+    return count
+
+# --- metrics in Prometheus text-format   -----------------------------------
+
+class Metrics:
+  """ counters, gauges and histograms with labels. Updates only hold the
+      lock for a few dict-operations, so collection is always on.
+  """
+
+  BUCKETS = [0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10,30]
+
+  # name: (type,help,label-names)
+  DEFINITIONS = {
+    "calendar2json_requests_total":
+      ("counter","requests",("transport","path","status")),
+    "calendar2json_request_duration_seconds":
+      ("histogram","duration of requests",("transport","status")),
+    "calendar2json_response_bytes_total":
+      ("counter","bytes of response-bodies",("transport","encoding")),
+    "calendar2json_cache_requests_total":
+      ("counter","cache-lookups",("cache","result")),
+    "calendar2json_provider_fetch_seconds":
+      ("histogram","duration of reading a provider",("provider",)),
+    "calendar2json_provider_errors_total":
+      ("counter","failed reads of a provider",("provider",)),
+    "calendar2json_calendar_fetch_seconds":
+      ("histogram","duration of reading a calendar",("provider","calendar")),
+    "calendar2json_calendar_events":
+      ("gauge","events of the last read of a calendar",
+       ("provider","calendar")),
+    "calendar2json_ics_files_parsed_total":
+      ("counter","parsed ics-files (new or changed)",("provider","calendar")),
+    }
+
+  def __init__(self):
+    """ constructor """
+    self._values = {name: {} for name in Metrics.DEFINITIONS}
+    self._lock   = threading.Lock()
+
+  def inc(self,name,labels,value=1):
+    """ increment counter """
+    values = self._values[name]
+    with self._lock:
+      values[labels] = values.get(labels,0) + value
+
+  def set(self,name,labels,value):
+    """ set gauge """
+    values = self._values[name]
+    with self._lock:
+      values[labels] = value
+
+  def observe(self,name,labels,value):
+    """ add observation to histogram """
+    values = self._values[name]
+    with self._lock:
+      hist = values.get(labels)
+      if not hist:
+        hist = values[labels] = [[0]*len(Metrics.BUCKETS),0,0.0]
+      for i,bound in enumerate(Metrics.BUCKETS):
+        if value <= bound:
+          hist[0][i] += 1
+      hist[1] += 1
+      hist[2] += value
+
+  @staticmethod
+  def _labels(names,values,extra=""):
+    """ format labels """
+    labels = [f'{n}="{Metrics._escape(v)}"' for n,v in zip(names,values)]
+    if extra:
+      labels.append(extra)
+    return "{" + ",".join(labels) + "}" if labels else ""
+
+  @staticmethod
+  def _escape(value):
+    """ escape label-value """
+    return (str(value).replace("\\","\\\\").replace('"','\\"').
+            replace("\n","\\n"))
+
+  @staticmethod
+  def _rss():
+    """ resident set size of the process """
+    try:
+      with open("/proc/self/statm","r") as f:
+        return int(f.read().split()[1])*os.sysconf("SC_PAGE_SIZE")
+    except (OSError,ValueError):
+      return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*1024
+
+  def expose(self):
+    """ return all metrics in Prometheus text-format """
+
+    lines = []
+    with self._lock:
+      values = {name: dict(v) for name,v in self._values.items()}
+      hists  = {name: {k: (list(h[0]),h[1],h[2]) for k,h in v.items()}
+                for name,v in self._values.items()
+                if Metrics.DEFINITIONS[name][0] == "histogram"}
+    for name,(mtype,text,names) in Metrics.DEFINITIONS.items():
+      lines.append(f"# HELP {name} {text}")
+      lines.append(f"# TYPE {name} {mtype}")
+      if mtype != "histogram":
+        for labels,value in values[name].items():
+          lines.append(f"{name}{Metrics._labels(names,labels)} {value}")
+        continue
+      for labels,(buckets,count,total) in hists[name].items():
+        for bound,n in zip(Metrics.BUCKETS+["+Inf"],buckets+[count]):
+          le = 'le="%s"' % bound
+          lines.append(f"{name}_bucket{Metrics._labels(names,labels,le)} {n}")
+        lines.append(f"{name}_sum{Metrics._labels(names,labels)} {total}")
+        lines.append(f"{name}_count{Metrics._labels(names,labels)} {count}")
+    lines.append("# HELP process_resident_memory_bytes resident memory size")
+    lines.append("# TYPE process_resident_memory_bytes gauge")
+    lines.append(f"process_resident_memory_bytes {Metrics._rss()}")
+    return ("\n".join(lines)+"\n").encode("utf-8")
+
+# --- metrics of a BDF-font   ------------------------------------------------
+
+class FontMetrics:
+  """ glyph-widths of a BDF-font, i.e. the same font as used by the client """
+
+  def __init__(self,filename):
+    """ constructor: read DWIDTH of all glyphs """
+
+    self._widths = {}
+    code = -1
+    with open(filename,"r",encoding="latin-1") as f:
+      for line in f:
+        if line.startswith("ENCODING"):
+          code = int(line.split()[1])
+        elif line.startswith("DWIDTH") and code >= 0:
+          self._widths[chr(code)] = int(line.split()[1])
+          code = -1
+    self.ellipsis = "\u2026" if "\u2026" in self._widths else "..."
+
+  def width(self,text):
+    """ return width of text in pixels (missing glyphs are skipped) """
+    return sum([self._widths.get(c,0) for c in text])
+
+  def split(self,text,max_width):
+    """ split text into the part that fits into max_width and the rest """
+    w = 0
+    for i,c in enumerate(text):
+      w += self._widths.get(c,0)
+      if w > max_width:
+        return (text[:i],text[i:])
+    return (text,"")
+
+  def ellipsize(self,text,max_width):
+    """ shorten text to max_width, append ellipsis if necessary """
+    if self.width(text) <= max_width:
+      return text
+    head,_ = self.split(text,max_width-self.width(self.ellipsis))
+    return head.rstrip() + self.ellipsis
+
+  def wrap(self,text,max_width):
+    """ split text at a word-boundary into two lines """
+    head,rest = self.split(text,max_width)
+    if rest and " " in head:
+      head,_,tail = head.rpartition(" ")
+      rest = tail + rest
+    return (head.rstrip(),rest.lstrip())
+
+# --- lean iCalendar-parser   ------------------------------------------------
+
+class VEvent:
+  """ relevant properties of a VEVENT (times are aware datetimes).
+      The recurrence-properties are only needed for ics-files, results
+      of CalDAV-queries are expanded.
+  """
+
+  __slots__ = ("dtstart","dtend","duration","summary","location",
+               "uid","rrule","rdates","exdates","recurrence_id")
+
+  def __init__(self):
+    """ constructor """
+    self.dtstart  = None
+    self.dtend    = None
+    self.duration = None
+    self.summary  = ""
+    self.location = ""
+    self.uid      = None
+    self.rrule    = None
+    self.rdates   = []
+    self.exdates  = []
+    self.recurrence_id = None
+
+class UnknownTZID(Exception):
+  """ TZID which is not an Olson-name (needs the VTIMEZONE-definition) """
+  pass
+
+# content-lines we are interested in (all others are skipped)
+_PROPERTY = re.compile(
+  r"(BEGIN|END|DTSTART|DTEND|DURATION|SUMMARY|LOCATION|TZID|"
+  r"UID|RRULE|RDATE|EXDATE|RECURRENCE-ID)[;:]",re.I)
+_FOLDING  = re.compile(r"\r?\n[ \t]")
+_ESCAPE   = re.compile(r"\\(.)")
+_DURATION = re.compile(r"([-+])?P(?:(\d+)W)?(?:(\d+)D)?"
+                       r"(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+_TZ_CACHE = {}
+
+def _split_line(line):
+  """ split content-line into (name,params,value) """
+
+  colon = line.find(":")
+  quote = line.find('"')
+  if 0 <= quote < colon:
+    # quoted parameter-values may contain colons
+    in_quote = False
+    for i,c in enumerate(line):
+      if c == '"':
+        in_quote = not in_quote
+      elif c == ":" and not in_quote:
+        colon = i
+        break
+  head = line[:colon].split(";")
+  params = {}
+  for param in head[1:]:
+    key,_,value = param.partition("=")
+    params[key.upper()] = value.strip('"')
+  return (head[0].upper(),params,line[colon+1:])
+
+def _get_tz(tzid):
+  """ map TZID to pytz-timezone """
+
+  tz = _TZ_CACHE.get(tzid,None)
+  if not tz:
+    name = tzid
+    while True:
+      try:
+        tz = pytz.timezone(name)
+        break
+      except pytz.UnknownTimeZoneError:
+        # try suffixes of prefixed names, e.g. /mozilla.org/.../Europe/Berlin
+        if "/" not in name:
+          raise UnknownTZID(tzid)
+        name = name.split("/",1)[1]
+    _TZ_CACHE[tzid] = tz
+  return tz
+
+def _parse_dt(value,params,tz_default):
+  """ parse DATE or DATE-TIME value into aware datetime """
+
+  dt = datetime.datetime(int(value[0:4]),int(value[4:6]),int(value[6:8]))
+  if len(value) >= 15 and params.get("VALUE","DATE-TIME") != "DATE":
+    dt = dt.replace(hour=int(value[9:11]),minute=int(value[11:13]),
+                    second=int(value[13:15]))
+    if value[-1] in "zZ":
+      return pytz.utc.localize(dt)
+    if "TZID" in params:
+      return _get_tz(params["TZID"]).localize(dt)
+  return tz_default.localize(dt)
+
+def _parse_duration(value):
+  """ parse DURATION value into timedelta """
+
+  m = _DURATION.match(value.strip())
+  if not m:
+    raise ValueError(f"invalid duration: {value}")
+  sign,weeks,days,hours,minutes,seconds = m.groups()
+  delta = datetime.timedelta(weeks=int(weeks or 0),days=int(days or 0),
+                             hours=int(hours or 0),minutes=int(minutes or 0),
+                             seconds=int(seconds or 0))
+  return -delta if sign == "-" else delta
+
+def _unescape(value):
+  """ unescape TEXT value """
+
+  if "\\" not in value:
+    return value
+  return _ESCAPE.sub(
+    lambda m: "\n" if m.group(1) in "nN" else m.group(1),value)
+
+def read_events(text,tz_local):
+  """ scan calendar-data once and return list of VEvent-records.
+      Floating times and dates use the timezone of the (first) VTIMEZONE,
+      or tz_local if there is none.
+  """
+
+  lines  = _FOLDING.sub("",text).splitlines()
+  events = []
+  stack  = []
+  tz_default = tz_local
+  tz_defined = False
+  for line in lines:
+    if not _PROPERTY.match(line):
+      continue
+    name,params,value = _split_line(line)
+    if name == "BEGIN":
+      stack.append(value.upper())
+      if stack[-1] == "VEVENT":
+        event = VEvent()
+        events.append(event)
+      continue
+    elif name == "END":
+      if stack:
+        stack.pop()
+      continue
+    component = stack[-1] if stack else None
+    if component == "VTIMEZONE":
+      if name == "TZID" and not tz_defined:
+        tz_default = _get_tz(value)
+        tz_defined = True
+      continue
+    elif component != "VEVENT":
+      continue                     # e.g. DURATION of VALARM
+
+    if name == "DTSTART":
+      event.dtstart = (value,params)
+    elif name == "DTEND":
+      event.dtend = (value,params)
+    elif name == "DURATION":
+      event.duration = _parse_duration(value)
+    elif name == "SUMMARY":
+      event.summary = _unescape(value)
+    elif name == "LOCATION":
+      event.location = _unescape(value)
+    elif name == "UID":
+      event.uid = value
+    elif name == "RRULE":
+      event.rrule = value
+    elif name == "RDATE" and params.get("VALUE") != "PERIOD":
+      event.rdates.extend((v,params) for v in value.split(","))
+    elif name == "EXDATE":
+      event.exdates.extend((v,params) for v in value.split(","))
+    elif name == "RECURRENCE-ID":
+      event.recurrence_id = (value,params)
+
+  # convert times after the scan, since VTIMEZONE might follow the VEVENTs
+  for event in events:
+    if event.dtstart:
+      event.dtstart = _parse_dt(*event.dtstart,tz_default)
+    if event.dtend:
+      event.dtend = _parse_dt(*event.dtend,tz_default)
+    if event.recurrence_id:
+      event.recurrence_id = _parse_dt(*event.recurrence_id,tz_default)
+    event.rdates  = [_parse_dt(v,p,tz_default) for v,p in event.rdates]
+    event.exdates = [_parse_dt(v,p,tz_default) for v,p in event.exdates]
+  return events
+
+# --- parse iCalendar-data   -------------------------------------------------
+
+def _get_timeattr(component,timeattr,default,tzinfo):
+  """ extract time attribute """
+
+  if hasattr(component,timeattr):
+    return _get_timeattr_value(getattr(component,timeattr).value,tzinfo)
+  return _get_timeattr_value(default,tzinfo)
+
+def _get_timeattr_value(dt,tzinfo):
+  """ convert date or datetime to aware datetime """
+
+  if not isinstance(dt,datetime.datetime):
+    dt = datetime.datetime(dt.year, dt.month, dt.day)
+  if not dt.tzinfo:
+    dt = _localize(dt,tzinfo)
+  return dt
+
+def _localize(dt,tzinfo):
+  """ attach timezone to naive datetime (pytz needs localize()) """
+
+  if hasattr(tzinfo,"localize"):
+    return tzinfo.localize(dt)
+  return dt.replace(tzinfo=tzinfo)
+
+def _read_events_vobject(text,tz_local):
+  """ parse calendar-data with vobject (fallback for custom VTIMEZONEs) """
+
+  instance = vobject.readOne(text)
+  if hasattr(instance, 'vtimezone'):
+    tzinfo = instance.vtimezone.gettzinfo()
+  else:
+    tzinfo = tz_local
+  events = []
+  for component in instance.components():
+    if component.name != 'VEVENT':
+      continue
+    event = VEvent()
+    if hasattr(component,'dtstart'):
+      event.dtstart = _get_timeattr(component,'dtstart',None,tzinfo)
+    if hasattr(component,'dtend'):
+      event.dtend = _get_timeattr(component,'dtend',None,tzinfo)
+    if hasattr(component,'duration'):
+      event.duration = component.duration.value
+    for attr in ('summary', 'location', 'uid'):
+      if hasattr(component,attr):
+        setattr(event,attr,getattr(component,attr).value)
+    if hasattr(component,'rrule'):
+      event.rrule = component.rrule.value
+    for attr,values in (('rdate',event.rdates),('exdate',event.exdates)):
+      for line in component.contents.get(attr,[]):
+        values.extend(_get_timeattr_value(v,tzinfo) for v in line.value
+                      if not isinstance(v,tuple))      # no PERIODs
+    if hasattr(component,'recurrence_id'):
+      event.recurrence_id = _get_timeattr(component,'recurrence_id',
+                                          None,tzinfo)
+    events.append(event)
+  return events
+
+def _read_text(text,tz_local):
+  """ return VEvent-records, vobject is only used for unknown TZIDs """
+
+  try:
+    return read_events(text,tz_local)
+  except UnknownTZID:
+    return _read_events_vobject(text,tz_local)
+
+def _get_item(start,end,start_ts,end_ts,tz,summary,location):
+  """ return compact event-tuple (start,end,summary,location). Times
+      (timestamps) are clipped to the day (start_ts,end_ts) and formatted
+      in timezone tz.
+  """
+
+  start = datetime.datetime.fromtimestamp(max(start,start_ts),tz)
+  end   = datetime.datetime.fromtimestamp(min(end,end_ts),tz)
+  return (start.strftime("%H:%M"),end.strftime("%H:%M"),summary,location)
+
+def parse_events(texts,start_of_day,end_of_day,now,tz_name):
+  """ parse iCalendar-texts and return list of compact event-tuples
+      (start,end,summary,location). Old events are dropped.
+      This is a module-level function, so it can run in a worker-process.
+  """
+
+  tz_local = pytz.timezone(tz_name)
+  if start_of_day.tzinfo is None:
+    start_of_day = _localize(start_of_day,tz_local)
+  if end_of_day.tzinfo is None:
+    end_of_day = _localize(end_of_day,tz_local)
+  start_ts = start_of_day.timestamp()
+  end_ts   = end_of_day.timestamp()
+  items = []
+  for text in texts:
+    for event in _read_text(text,tz_local):
+      dtstart = event.dtstart or start_of_day
+      if event.duration is not None:
+        dtend = dtstart + event.duration
+      else:
+        dtend = event.dtend or end_of_day
+      if dtend < now:
+        # ignore old events
+        continue
+      items.append(_get_item(dtstart.timestamp(),dtend.timestamp(),
+                             start_ts,end_ts,tz_local,
+                             event.summary,event.location))
+  return items
+
+# --- pool of parser-processes   ---------------------------------------------
+
+class ParserPool:
+  """ parse iCalendar-data in worker-processes (using all cores).
+      With less than two workers, data is parsed in the calling thread.
+  """
+
+  MIN_CHUNK = 50                  # minimal number of objects per task
+
+  def __init__(self,workers,mp_context="forkserver"):
+    """ constructor """
+
+    self._workers = workers
+    if workers > 1:
+      self._executor = concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context(mp_context))
+    else:
+      self._executor = None
 
-  def _get_agenda(self):
-    """ read agenda for all configured calendars """
+  def parse(self,texts,start_of_day,end_of_day,now,tz_name):
+    """ parse texts, distribute chunks to the workers """
 
-    self.start_of_day = datetime.datetime.combine(datetime.date.today(),
-                                         datetime.time.min)
-    self.end_of_day   = datetime.datetime.combine(datetime.date.today(),
-                                         datetime.time.max)
+    n = min(self._workers,len(texts)//ParserPool.MIN_CHUNK)
+    if not self._executor or n < 2:
+      return parse_events(texts,start_of_day,end_of_day,now,tz_name)
+    futures = [self._executor.submit(parse_events,texts[i::n],
+                                     start_of_day,end_of_day,now,tz_name)
+               for i in range(n)]
+    return [item for future in futures for item in future.result()]
+
+  def shutdown(self):
+    """ stop worker-processes """
+    if self._executor:
+      self._executor.shutdown(cancel_futures=True)
+
+# --- keys of provider-configurations   -------------------------------------
+
+def provider_key(provider):
+  """ key of the complete provider-configuration (including cals) """
+  return json.dumps(provider,sort_keys=True)
+
+def provider_name(provider):
+  """ name of a provider (label of metrics, key of last good results) """
+  return provider.get("dav_url") or provider["ics_dir"]
+
+def connection_key(provider):
+  """ key of the connection-part of a provider-configuration """
+  return (provider["dav_url"],provider["dav_user"],provider["dav_pw"])
+
+# --- warm clients for caldav-servers   --------------------------------------
+
+class ProviderClients:
+  """ keep clients and calendar-lists of providers. Discovery of the
+      calendars is only necessary for new or changed connections.
+  """
+
+  def __init__(self):
+    """ constructor """
+    self._clients = {}
+    self._lock    = threading.Lock()
+
+  def get_calendars(self,provider):
+    """ return calendars of provider, connect and discover if necessary """
+
+    key = connection_key(provider)
+    with self._lock:
+      calendars = self._clients.get(key)
+    if calendars is None:
+      client = caldav.DAVClient(url=provider["dav_url"],
+                                username=provider["dav_user"],
+                                password=provider["dav_pw"])
+      calendars = client.principal().calendars()
+      with self._lock:
+        self._clients[key] = calendars
+    return calendars
+
+  def drop(self,provider):
+    """ drop client of provider """
+    with self._lock:
+      self._clients.pop(connection_key(provider),None)
+
+  def update(self,providers):
+    """ drop clients not used by providers, return number of dropped clients """
+
+    keys = set(connection_key(provider) for provider in providers
+               if "dav_url" in provider)
+    with self._lock:
+      unused = [key for key in self._clients if key not in keys]
+      for key in unused:
+        del self._clients[key]
+    return len(unused)
+
+# --- last good results of calendars   --------------------------------------
+
+class LastGood:
+  """ keep the last good items per calendar and day """
+
+  def __init__(self):
+    """ constructor """
+    self._entries = {}
+    self._lock    = threading.Lock()
+
+  def put(self,key,items):
+    """ save items for key (provider-name,cal_name,day), drop past days """
+    today = datetime.date.today()
+    with self._lock:
+      for k in [k for k in self._entries if k[2] < today]:
+        del self._entries[k]
+      self._entries[key] = (items,time.time())
+
+  def get(self,key):
+    """ return (items,timestamp) or ([],None) """
+    with self._lock:
+      return self._entries.get(key,([],None))
+
+# --- index of local ics-files   ---------------------------------------------
+
+_UNTIL = re.compile(r"UNTIL=(\d{8}T\d{6})Z",re.I)
+
+# components and content-lines of the index of an ics-file. The texts of the
+# events (SUMMARY, LOCATION, ...) are only decoded for requested days.
+_ICS_BLOCK = re.compile(rb"^BEGIN:(VEVENT|VTIMEZONE)\r?$.*?^END:\1\r?$",
+                        re.M|re.S|re.I)
+_ICS_TIMES = re.compile(
+  rb"^(?:BEGIN|END|DTSTART|DTEND|DURATION|UID|RRULE|RDATE|EXDATE|"
+  rb"RECURRENCE-ID)[;:][^\r\n]*(?:\r?\n[ \t][^\r\n]*)*",re.M|re.I)
+
+def index_ics(filename):
+  """ index ics-file through a memory-map: return the calendar-data needed
+      for the times (VTIMEZONEs and the time-properties of the VEVENTs) and
+      the byte-ranges of the VEVENTs in the same order.
+  """
+
+  with open(filename,"rb") as f:
+    if not os.fstat(f.fileno()).st_size:
+      return ("",[])
+    lines  = [b"BEGIN:VCALENDAR"]
+    ranges = []
+    with mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as data:
+      for block in _ICS_BLOCK.finditer(data):
+        if block.group(1).upper() == b"VTIMEZONE":
+          lines.append(block.group())
+        else:
+          ranges.append(block.span())
+          lines.extend(_ICS_TIMES.findall(data,*block.span()))
+    lines.append(b"END:VCALENDAR")
+  return (str(b"\n".join(lines),"utf_8","replace"),ranges)
+
+def _read_texts(text):
+  """ return (summary,location) of a VEVENT (not of its sub-components) """
+
+  summary  = ""
+  location = ""
+  depth    = 0
+  for line in _FOLDING.sub("",text).splitlines():
+    if not _PROPERTY.match(line):
+      continue
+    name,_,value = _split_line(line)
+    if name == "BEGIN":
+      depth += 1
+    elif name == "END":
+      depth -= 1
+    elif depth == 1 and name == "SUMMARY":
+      summary = _unescape(value)
+    elif depth == 1 and name == "LOCATION":
+      location = _unescape(value)
+  return (summary,location)
+
+def read_ics_texts(filename,ranges):
+  """ return {range: (summary,location)} of the VEVENTs at the byte-ranges
+      of index_ics(). Only these ranges of the memory-map are decoded.
+  """
+
+  try:
+    with open(filename,"rb") as f:
+      with mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ) as data:
+        return {(start,end):
+                  _read_texts(str(data[start:end],"utf_8","replace"))
+                for start,end in ranges}
+  except (OSError,ValueError) as ex:           # file changed after the index
+    print(f"{filename}: read failed ({ex})")
+    return {span: ("","") for span in ranges}
+
+def _wall(dt,tz):
+  """ return naive wall-time of aware datetime dt in timezone tz """
+
+  dt = dt.astimezone(tz)
+  if hasattr(tz,"normalize"):
+    dt = tz.normalize(dt)                 # pytz: offset of the target date
+  return dt.replace(tzinfo=None)
+
+class IcsFile:
+  """ events of a single ics-file: single events as timestamps sorted by
+      start (bisection), recurring events as rule-sets of wall-times in
+      the timezone of their DTSTART (expanded per day). Events keep their
+      byte-range in the file, the texts are read for requested days.
+  """
+
+  def __init__(self,filename,tz_local):
+    """ constructor: parse file """
+
+    text,ranges = index_ics(filename)
+    events = _read_text(text,tz_local)
+
+    # occurrences replaced by events with a RECURRENCE-ID
+    replaced = {}
+    for event in events:
+      if event.recurrence_id and event.uid:
+        replaced.setdefault(event.uid,[]).append(event.recurrence_id)
+
+    singles = []
+    self._recurring = []
+    for event,span in zip(events,ranges):
+      if not event.dtstart:
+        continue
+      if event.duration is not None:
+        dtend = event.dtstart + event.duration
+      elif event.dtend:
+        dtend = event.dtend
+      else:
+        dtend = event.dtstart.replace(hour=23,minute=59,second=59)
+      if (event.rrule or event.rdates) and not event.recurrence_id:
+        self._recurring.append(
+          (IcsFile._get_rules(event,replaced.get(event.uid,[])),
+           event.dtstart.tzinfo,(dtend-event.dtstart).total_seconds(),span))
+      else:
+        singles.append((event.dtstart.timestamp(),dtend.timestamp(),span))
+    singles.sort(key=itemgetter(0))
+    self._filename = filename
+    self._singles  = singles
+    self._starts   = [single[0] for single in singles]
+    self._max_duration = max((end-start for start,end,_ in singles),
+                             default=0)
+    self._days     = {}                 # bounds -> occurrences
+
+  @staticmethod
+  def _get_rules(event,replaced):
+    """ return rule-set of the occurrences (naive wall-times) """
+
+    tz = event.dtstart.tzinfo
+    rules = dateutil.rrule.rruleset(cache=True)
+    dtstart = _wall(event.dtstart,tz)
+    rules.rdate(dtstart)                   # DTSTART is always an occurrence
+    if event.rrule:
+      # UNTIL is in UTC, but the rule runs on wall-times
+      rrule = _UNTIL.sub(
+        lambda m: "UNTIL=" + _wall(pytz.utc.localize(
+          datetime.datetime.strptime(m.group(1),"%Y%m%dT%H%M%S")),
+                                   tz).strftime("%Y%m%dT%H%M%S"),
+        event.rrule)
+      rules.rrule(dateutil.rrule.rrulestr(rrule,dtstart=dtstart,cache=True))
+    for dt in event.rdates:
+      rules.rdate(_wall(dt,tz))
+    for dt in event.exdates + replaced:
+      rules.exdate(_wall(dt,tz))
+    return rules
+
+  def occurrences(self,start_ts,end_ts):
+    """ return (start,end,summary,location) of events overlapping the
+        interval (timestamps). Results are kept for the last two intervals
+        (today and tomorrow for the prefetcher).
+    """
+
+    result = self._days.get((start_ts,end_ts))
+    if result is not None:
+      return result
+
+    i = bisect.bisect_left(self._starts,start_ts-self._max_duration)
+    j = bisect.bisect_right(self._starts,end_ts)
+    result = [single for single in self._singles[i:j]
+              if single[1] > start_ts or single[0] >= start_ts]
+
+    for rules,tz,duration,span in self._recurring:
+      after  = datetime.datetime.fromtimestamp(start_ts-duration,tz)
+      before = datetime.datetime.fromtimestamp(end_ts,tz)
+      for dt in rules.between(_wall(after,tz),_wall(before,tz),inc=True):
+        start = _localize(dt,tz).timestamp()
+        end   = start + duration
+        if end > start_ts or start >= start_ts:
+          result.append((start,end,span))
+
+    if result:
+      texts  = read_ics_texts(self._filename,set(span for _,_,span in result))
+      result = [(start,end,*texts[span]) for start,end,span in result]
+    if len(self._days) > 1:
+      self._days.pop(min(self._days),None)
+    self._days[(start_ts,end_ts)] = result
+    return result
+
+class IcsIndex:
+  """ parsed ics-files of calendars of ics-directories. A calendar is
+      either a file <cal_name>.ics or a directory <cal_name> with
+      ics-files (e.g. one file per event, like vdirsyncer). Files are
+      only parsed again if mtime or size change.
+  """
+
+  def __init__(self):
+    """ constructor """
+    self._paths   = {}   # path -> {filename: ((mtime,size,tz),IcsFile)}
+    self._results = {}   # path -> (bounds,occurrences of all files)
+    self._lock    = threading.Lock()
+
+  @staticmethod
+  def _list(path):
+    """ return list of (filename,stat) of a calendar """
+
+    if os.path.isdir(path):
+      return [(entry.path,entry.stat()) for entry in os.scandir(path)
+              if entry.name.endswith(".ics") and entry.is_file()]
+    filename = path + ".ics"
+    return [(filename,os.stat(filename))]
+
+  def _get_files(self,path,tz_local):
+    """ return IcsFile-objects of a calendar and the number of parsed files.
+        Files that fail to parse are skipped until they change.
+    """
+
+    with self._lock:
+      old = self._paths.get(path,{})
+    files  = {}
+    parsed = 0
+    for filename,stat in IcsIndex._list(path):
+      key   = (stat.st_mtime_ns,stat.st_size,tz_local.zone)
+      entry = old.get(filename)
+      if not entry or entry[0] != key:
+        parsed += 1
+        try:
+          entry = (key,IcsFile(filename,tz_local))
+        except Exception as ex:
+          print(f"{filename}: parse failed ({ex}), skipping file")
+          entry = (key,None)
+      files[filename] = entry
+    with self._lock:
+      self._paths[path] = files
+    if parsed or len(files) != len(old):
+      self._results.pop(path,None)        # new, changed or removed files
+    return [ics for _,ics in files.values() if ics],parsed
+
+  def get_items(self,path,start_of_day,end_of_day,now):
+    """ return compact event-tuples (start,end,summary,location) of a
+        calendar for the day (aware datetimes) like parse_events(), and
+        the number of parsed files
+    """
+
+    tz       = start_of_day.tzinfo
+    start_ts = start_of_day.timestamp()
+    end_ts   = end_of_day.timestamp()
+    now_ts   = now.timestamp()
+    files,parsed = self._get_files(path,tz)
+
+    # occurrences of all files are kept until a file changes
+    result = self._results.get(path)
+    if result and result[0] == (start_ts,end_ts):
+      occurrences = result[1]
+    else:
+      occurrences = [occurrence for ics in files
+                     for occurrence in ics.occurrences(start_ts,end_ts)]
+      self._results[path] = ((start_ts,end_ts),occurrences)
+
+    items = [_get_item(start,end,start_ts,end_ts,tz,summary,location)
+             for start,end,summary,location in occurrences
+             if end >= now_ts]            # ignore old events
+    return items,parsed
+
+  def update(self,providers):
+    """ drop calendars not used by providers, return number of dropped
+        calendars
+    """
+
+    paths = set(os.path.join(provider["ics_dir"],cal_info["cal_name"])
+                for provider in providers if "ics_dir" in provider
+                for cal_info in provider["cals"])
+    with self._lock:
+      unused = [path for path in self._paths if path not in paths]
+      for path in unused:
+        del self._paths[path]
+        self._results.pop(path,None)
+    return len(unused)
+
+# --- read agenda from caldav-servers   --------------------------------------
+
+class AgendaReader:
+  """ read agenda of a given day from all configured calendars """
+
+  # calendar-query for the properties used by parse_events(). RRULE and RDATE
+  # are only returned if the server does not expand recurring events.
+  PARTIAL_QUERY = """<?xml version="1.0" encoding="utf-8"?>
+<C:calendar-query xmlns:D="DAV:" xmlns:C="urn:ietf:params:xml:ns:caldav">
+  <D:prop>
+    <C:calendar-data>
+      <C:expand start="{start}" end="{end}"/>
+      <C:comp name="VCALENDAR">
+        <C:comp name="VEVENT">
+          <C:prop name="DTSTART"/>
+          <C:prop name="DTEND"/>
+          <C:prop name="DURATION"/>
+          <C:prop name="SUMMARY"/>
+          <C:prop name="LOCATION"/>
+          <C:prop name="RRULE"/>
+          <C:prop name="RDATE"/>
+        </C:comp>
+        <C:comp name="VTIMEZONE">
+          <C:allprop/>
+          <C:allcomp/>
+        </C:comp>
+      </C:comp>
+    </C:calendar-data>
+  </D:prop>
+  <C:filter>
+    <C:comp-filter name="VCALENDAR">
+      <C:comp-filter name="VEVENT">
+        <C:time-range start="{start}" end="{end}"/>
+      </C:comp-filter>
+    </C:comp-filter>
+  </C:filter>
+</C:calendar-query>"""
+  RECURRENCE = re.compile(r"^(RRULE|RDATE)[;:]",re.M|re.I)
+
+  no_partial = set()            # urls of calendars without partial query
+
+  def __init__(self,day):
+    """ constructor """
+
+    self.start_of_day = datetime.datetime.combine(day,datetime.time.min)
+    self.end_of_day   = datetime.datetime.combine(day,datetime.time.max)
 
     self.tz_local  = pytz.timezone(settings.TZ_NAME)
-    self.now = datetime.datetime.now(self.tz_local)
+    if day == datetime.date.today():
+      self.now = datetime.datetime.now(self.tz_local)
+    else:
+      self.now = self.tz_local.localize(self.start_of_day)
+
+  # --- read agendas from caldav-servers   ------------------------------------
+
+  def read(self,parts=None):
+    """ read agenda for all configured calendars. parts maps provider-keys to
+        (entries,is_holiday,stale) of providers that need not be read again.
+        Returns the merged agenda and the parts of all providers.
+    """
+
+    parts = dict(self.iter_parts(parts))
+    return self.merge(parts),parts
+
+  # --- read agendas of providers in parallel   -------------------------------
+
+  def iter_parts(self,parts=None):
+    """ yield (provider-key,(entries,is_holiday,stale)) of all providers:
+        first the given parts, then the missing providers in the order
+        they complete (read in parallel). Entries are sorted per provider.
+    """
+
+    parts = parts or {}
+    missing = []
+    for provider in settings.providers:
+      key = provider_key(provider)
+      if key in parts:
+        yield key,parts[key]
+      else:
+        missing.append((key,provider))
+    if not missing:
+      return
+
+    with concurrent.futures.ThreadPoolExecutor(len(missing)) as executor:
+      futures = {executor.submit(self._read_provider,provider): key
+                 for key,provider in missing}
+      for future in concurrent.futures.as_completed(futures):
+        yield futures[future],future.result()
+
+  def _read_provider(self,provider):
+    """ read agenda of a single provider """
+
+    entries = []
+    stale   = {}
+    is_holiday = self._get_agenda_for_provider(provider,entries,stale)
+    entries.sort(key=itemgetter('start'))
+    return (entries,is_holiday,stale)
+
+  # --- merge agendas of providers   ------------------------------------------
+
+  def merge(self,parts):
+    """ merge parts of all providers to (entries,is_holiday,stale) """
 
     entries = []
     is_holiday = False
-    for provider in settings.providers:
-      is_holiday = is_holiday or self._get_agenda_for_provider(provider,entries)
+    stale = {}
+    for p_entries,p_is_holiday,p_stale in parts.values():
+      entries.extend(p_entries)
+      is_holiday = is_holiday or p_is_holiday
+      stale.update(p_stale)
+    if stale and len(stale) == sum(len(p["cals"]) for p in settings.providers) \
+       and not any(stale.values()):
+      raise RuntimeError("no calendar available")
     entries.sort(key=itemgetter('start'))
-    return entries,is_holiday
+    return (entries,is_holiday,stale)
 
-  # --- read agenda from caldav-server   --------------------------------------
+  # --- read agenda from caldav-server or ics-directory   ---------------------
 
-  def _get_agenda_for_provider(self,provider,entries):
-    """ read agenda from caldav-server """
+  def _get_agenda_for_provider(self,provider,entries,stale):
+    """ read agenda from caldav-server or ics-directory. If a calendar fails,
+        the last good result is used and the calendar is added to stale
+        (with the time of the last good result or None)
+    """
 
-    client = caldav.DAVClient(url=provider["dav_url"],
-                                username=provider["dav_user"],
-                                password=provider["dav_pw"])
+    # get calendar by name (client and calendars are kept by provider_clients)
+    start = time.monotonic()
+    name  = provider_name(provider)
+    error = None
+    if "dav_url" in provider:
+      try:
+        calendars = provider_clients.get_calendars(provider)
+      except Exception as ex:
+        calendars = []
+        error = ex
 
-    # get calendar by name
-    calendars = client.principal().calendars()
     is_holiday = False
     for cal_info in provider["cals"]:
-      for cal in calendars:
-        if cal.name == cal_info["cal_name"]:
-          is_holiday = is_holiday or self._get_items_for_cal(cal,cal_info,entries)
+      key = (name,cal_info["cal_name"],self.start_of_day.date())
+      try:
+        if error:
+          raise error
+        items = []
+        if "ics_dir" in provider:
+          items = self._get_items_for_ics(provider["ics_dir"],cal_info)
+        else:
+          for cal in calendars:
+            if cal.name == cal_info["cal_name"]:
+              items = self._get_items_for_cal(cal,cal_info,name)
+        last_good.put(key,items)
+      except Exception as ex:
+        # calendars might have changed on the server: discover again next time
+        if "dav_url" in provider:
+          provider_clients.drop(provider)
+        metrics.inc("calendar2json_provider_errors_total",(name,))
+        items,ts = last_good.get(key)
+        stale[cal_info["cal_name"]] = ts
+        print(f"{cal_info['cal_name']}: read failed ({ex}), "
+              f"using {'result from '+time.ctime(ts) if ts else 'no result'}")
+      is_holiday = is_holiday or self._add_items(items,cal_info,entries)
+    metrics.observe("calendar2json_provider_fetch_seconds",
+                    (name,),time.monotonic()-start)
 
     return is_holiday
 
+  # --- query only needed properties   ---------------------------------------
+
+  def _query_partial(self,cal):
+    """ query the needed properties of expanded events from now on (REPORT
+        with calendar-data prop-filtering). Returns list of calendar-data or
+        None, if the query failed. If the server rejects the query or does
+        not expand recurring events, the calendar is added to no_partial.
+    """
+
+    start = self.now.astimezone(pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+    end   = self.tz_local.localize(self.end_of_day).astimezone(
+      pytz.utc).strftime("%Y%m%dT%H%M%SZ")
+    query = AgendaReader.PARTIAL_QUERY.format(start=start,end=end)
+
+    try:
+      response = cal.client.report(str(cal.url),query,depth=1)
+    except Exception as ex:
+      # e.g. network-error or timeout: fallback only for this request
+      print(f"{cal.name}: partial query failed ({ex}), using fallback")
+      return None
+    if 400 <= response.status < 500 or response.status == 501:
+      self._no_partial(cal,f"status {response.status}")
+      return None
+    if response.status >= 300:
+      print(f"{cal.name}: partial query failed (status {response.status}), "
+            "using fallback")
+      return None
+
+    raw = response.raw
+    try:
+      tree = ElementTree.fromstring(raw)
+    except ElementTree.ParseError as ex:
+      self._no_partial(cal,f"invalid response: {ex}")
+      return None
+
+    texts = []
+    for data in tree.iter("{urn:ietf:params:xml:ns:caldav}calendar-data"):
+      if not data.text:
+        continue
+      if AgendaReader.RECURRENCE.search(data.text):
+        # server did not expand recurring events
+        self._no_partial(cal,"no expansion")
+        return None
+      texts.append(data.text)
+    if settings.debug:
+      print(f"{cal.name}: {len(raw)} bytes (partial query)")
+    return texts
+
+  def _no_partial(self,cal,reason):
+    """ disable partial query for the calendar (until the next reload) """
+
+    print(f"{cal.name}: partial query not supported ({reason}), "
+          "using fallback")
+    AgendaReader.no_partial.add(str(cal.url))
+
   # --- read items for given calendar   ---------------------------------------
 
-  def _get_items_for_cal(self,cal,cal_info,entries):
+  def _get_items_for_cal(self,cal,cal_info,dav_url):
     """ read items from caldav-server """
 
     # extract relevant data
-    cal_events = cal.date_search(start=self.start_of_day,
-                                 end=self.end_of_day,expand=True)
-
-    agenda_list = []
-    for cal_event in cal_events:
-      item = {}
-      if hasattr(cal_event.instance, 'vtimezone'):
-        tzinfo = cal_event.instance.vtimezone.gettzinfo()
-      else:
-        tzinfo = self.tz_local
-      components = cal_event.instance.components()
-      for component in components:
-        if component.name != 'VEVENT':
-          continue
-        item['dtstart'] = self._get_timeattr(
-          component,'dtstart',self.start_of_day,tzinfo)
-        if hasattr(component,'duration'):
-          duration = component.duration.value
-          item['dtend'] = item['dtstart'] + duration
-        else:
-          item['dtend']   = self._get_timeattr(
-            component,'dtend',self.end_of_day,tzinfo)
-        if item['dtend'] < self.now:
-          # ignore old events
-          continue
-        if item['dtend'].day != item['dtstart'].day:
-          item['dtend'] = self.end_of_day
-
-        for attr in ('summary', 'location'):
-          if hasattr(component,attr):
-            item[attr] = getattr(component,attr).value
-          else:
-            item[attr] = ""
-        agenda_list.append(item)
+    start = time.monotonic()
+    url = str(cal.url)
+    texts = None
+    if (getattr(settings,"PARTIAL_QUERY",True) and
+        url not in AgendaReader.no_partial):
+      texts = self._query_partial(cal)
+    if texts is None:
+      cal_events = cal.date_search(start=self.start_of_day,
+                                   end=self.end_of_day,expand=True)
+      texts = [cal_event.data for cal_event in cal_events]
+    items = parser_pool.parse(texts,
+                              self.start_of_day,self.end_of_day,self.now,
+                              settings.TZ_NAME)
+    labels = (dav_url,cal_info["cal_name"])
+    metrics.observe("calendar2json_calendar_fetch_seconds",labels,
+                    time.monotonic()-start)
+    metrics.set("calendar2json_calendar_events",labels,len(items))
+    return items
+
+  # --- read items from ics-files   -------------------------------------------
+
+  def _get_items_for_ics(self,ics_dir,cal_info):
+    """ read items from the (indexed) ics-files of a calendar """
+
+    start = time.monotonic()
+    items,parsed = ics_index.get_items(
+      os.path.join(ics_dir,cal_info["cal_name"]),
+      self.tz_local.localize(self.start_of_day),
+      self.tz_local.localize(self.end_of_day),self.now)
+    labels = (ics_dir,cal_info["cal_name"])
+    if parsed:
+      metrics.inc("calendar2json_ics_files_parsed_total",labels,parsed)
+    metrics.observe("calendar2json_calendar_fetch_seconds",labels,
+                    time.monotonic()-start)
+    metrics.set("calendar2json_calendar_events",labels,len(items))
+    return items
+
+  # --- add items to entries   ------------------------------------------------
+
+  def _add_items(self,items,cal_info,entries):
+    """ add items of a calendar to the entries, return holiday-flag """
 
     # check if current calendar is holiday-calendar and we have an event
-    if len(agenda_list) and cal_info["is_holiday"]:
+    if len(items) and cal_info["is_holiday"]:
       is_holiday = True
     else:
       is_holiday = False
 
-    for item in agenda_list:
+    for (start,end,summary,location) in items:
       entries.append(
-        {"start": item['dtstart'].astimezone().strftime("%H:%M"),
-         "end":   item['dtend'].astimezone().strftime("%H:%M"),
-         "summary": item['summary'],
-         "location": item['location'],
+        {"start": start,
+         "end":   end,
+         "summary": summary,
+         "location": location,
          "color": cal_info["cal_color"]
          })
 
     return is_holiday
 
-  # --- extract time attribute   ----------------------------------------------
+# --- cache for agendas   ----------------------------------------------------
+
+class AgendaCache:
+  """ cache agenda per day. Entries are valid for ttl seconds after reading
+      or until the end of the validity requested by the prefetcher.
+      The agenda of every provider is kept separately, so a change of the
+      configuration only needs to read the changed providers.
+  """
+
+  def __init__(self,ttl):
+    """ constructor """
+    self._ttl     = ttl
+    self._entries = {}
+    self._lock    = threading.Lock()
+
+  def get(self,day):
+    """ return (events,is_holiday) for day, read agenda if necessary """
+    with self._lock:
+      entry = self._entries.get(day)
+    if entry and time.time() < entry[0]:
+      if entry[1]:
+        metrics.inc("calendar2json_cache_requests_total",("agenda","hit"))
+        return entry[1]
+      # invalidated: only read missing providers
+      metrics.inc("calendar2json_cache_requests_total",("agenda","partial"))
+      return self.refresh(day,entry[0],entry[2])
+    metrics.inc("calendar2json_cache_requests_total",("agenda","miss"))
+    return self.refresh(day)
+
+  def iter_parts(self,day):
+    """ yield agendas (events,is_holiday,stale) of the providers for day
+        as soon as they are available. The merged agenda is cached after
+        the last provider.
+    """
+    with self._lock:
+      entry = self._entries.get(day)
+    if entry and time.time() < entry[0]:
+      if entry[1]:
+        metrics.inc("calendar2json_cache_requests_total",("agenda","hit"))
+        yield entry[1]
+        return
+      metrics.inc("calendar2json_cache_requests_total",("agenda","partial"))
+      valid_until,parts = entry[0],entry[2]
+    else:
+      metrics.inc("calendar2json_cache_requests_total",("agenda","miss"))
+      valid_until,parts = 0,None
+
+    reader = AgendaReader(day)
+    new_parts = {}
+    for key,part in reader.iter_parts(dict(parts or {})):
+      new_parts[key] = part
+      yield part
+    self._put(day,valid_until,reader.merge(new_parts),new_parts)
+
+  def refresh(self,day,valid_until=0,parts=None):
+    """ read agenda for day and update cache """
+    agenda,parts = AgendaReader(day).read(dict(parts or {}))
+    return self._put(day,valid_until,agenda,parts)
+
+  def _put(self,day,valid_until,agenda,parts):
+    """ save agenda and parts of day, drop past days """
+    valid_until = max(valid_until,time.time()+self._ttl)
+    today = datetime.date.today()
+    with self._lock:
+      for d in [d for d in self._entries if d < today]:
+        del self._entries[d]
+      self._entries[day] = (valid_until,agenda,parts)
+    return agenda
+
+  def invalidate(self,keys=None):
+    """ drop parts of the given provider-keys (default: all) and the merged
+        agendas of all days, return number of dropped parts
+    """
+    count = 0
+    with self._lock:
+      for day,(valid_until,_,parts) in list(self._entries.items()):
+        dropped = [k for k in parts if keys is None or k in keys]
+        count += len(dropped)
+        parts = {k: v for k,v in parts.items() if k not in dropped}
+        self._entries[day] = (valid_until,None,parts)
+    return count
+
+# --- next slot from a time-table   ------------------------------------------
+
+def next_slot(time_table,now):
+  """ return datetime of the first slot after now from a time-table.
+      The time-table has the same format as app_config.time_table
+      of the client: one entry per weekday, starting with Monday.
+  """
+
+  sod = datetime.datetime.combine(now.date(),datetime.time.min)
+  for i in range(8):
+    day = sod + datetime.timedelta(days=i)
+    hours, minutes = time_table[day.weekday()]
+    if not hours:
+      continue
+    for h in range(hours[0],hours[1]+1,hours[2]):
+      for m in range(minutes[0],minutes[1]+1,minutes[2]):
+        slot = day + datetime.timedelta(hours=h,minutes=m)
+        if slot > now:
+          return slot
+  return None
+
+# --- prefetch agendas ahead of client-requests   ----------------------------
+
+class Prefetcher(threading.Thread):
+  """ refresh the agenda-cache shortly before the clients wake up.
+      Wake-slots are declared in the configuration (time-tables) and/or
+      learned from the requests of the clients (minute of day with
+      requests on at least min_days days within the last two weeks).
+      Just before midnight, the agenda of the next day is read.
+  """
+
+  MAX_WAIT     = 60                   # recalculate at least every minute
+  HISTORY_DAYS = 14
+
+  def __init__(self,agenda_cache,config,ttl):
+    """ constructor """
+
+    super().__init__(daemon=True)
+    self._cache     = agenda_cache
+    self._ttl       = ttl
+    self._lead      = config.get("lead",60)
+    self._learn     = config.get("learn",True)
+    self._min_days  = config.get("min_days",2)
+    self._schedules = config.get("schedules",[])
+    self._log       = {}
+    self._lock      = threading.Lock()
+
+  # --- record request of a client   ------------------------------------------
+
+  def record(self,device):
+    """ record time of request (called by the request-handler) """
+
+    if not self._learn:
+      return
+    now    = datetime.datetime.now()
+    minute = now.hour*60 + now.minute
+    cutoff = now.date() - datetime.timedelta(days=Prefetcher.HISTORY_DAYS)
+    with self._lock:
+      days = self._log.setdefault(device,{}).setdefault(minute,set())
+      days.add(now.date())
+      for d in [d for d in days if d < cutoff]:
+        days.remove(d)
+
+  # --- learned slots   -------------------------------------------------------
+
+  def _learned_minutes(self):
+    """ return minutes of day with requests on at least min_days days """
+
+    cutoff = (datetime.date.today() -
+              datetime.timedelta(days=Prefetcher.HISTORY_DAYS))
+    with self._lock:
+      return {minute for slots in self._log.values()
+              for minute,days in slots.items()
+              if len([d for d in days if d >= cutoff]) >= self._min_days}
+
+  # --- next slot   -----------------------------------------------------------
+
+  def _next_slot(self,now):
+    """ return next slot after now (declared, learned or midnight) """
+
+    sod = datetime.datetime.combine(now.date(),datetime.time.min)
+    candidates = [sod + datetime.timedelta(days=1)]            # midnight
+    for time_table in self._schedules:
+      slot = next_slot(time_table,now)
+      if slot:
+        candidates.append(slot)
+    for minute in self._learned_minutes():
+      slot = sod + datetime.timedelta(minutes=minute)
+      if slot <= now:
+        slot += datetime.timedelta(days=1)
+      candidates.append(slot)
+    return min(candidates)
+
+  # --- prefetch loop   -------------------------------------------------------
+
+  def run(self):
+    """ wait for prefetch-time of the next slot and refresh cache """
+
+    lead = datetime.timedelta(seconds=self._lead)
+    while True:
+      now  = datetime.datetime.now()
+      slot = self._next_slot(now+lead)
+      wait = (slot-lead-now).total_seconds()
+      if wait > Prefetcher.MAX_WAIT:
+        time.sleep(Prefetcher.MAX_WAIT)
+        continue
+      time.sleep(max(wait,0))
+      try:
+        start = time.monotonic()
+        self._cache.refresh(slot.date(),slot.timestamp()+self._ttl)
+        if settings.debug:
+          print(f"prefetch for slot {slot}: {time.monotonic()-start:f}s")
+      except Exception as ex:
+        print(f"prefetch for slot {slot} failed: {ex}")
+
+# --- reload configuration   -------------------------------------------------
+
+# keys only evaluated at startup
+RESTART_KEYS = ["PORT","UDP_PORT","CACHE_TTL","PARSE_WORKERS","PREFETCH"]
+
+def load_fonts(config):
+  """ font-metrics (optional) for text-truncation """
+
+  result = {}
+  for role,filename in config.get("FONTS",{}).items():
+    result[role] = FontMetrics(filename)
+  if result and not ("time" in result and "text" in result):
+    print("FONTS: missing time- or text-font, disabling text-truncation")
+    result = {}
+  return result
+
+def reload_config():
+  """ reload configuration-file. Only clients and cache-entries of changed
+      providers are dropped, everything else stays warm.
+  """
+
+  global fonts
+  start = time.monotonic()
+  try:
+    with open(settings.config_file,"r") as f:
+      config = json.load(f)
+  except Exception as ex:
+    print(f"reload of {settings.config_file} failed: {ex}")
+    return
+
+  with reload_lock:
+    old_keys = set(provider_key(p) for p in settings.providers)
+    new_keys = set(provider_key(p) for p in config.get("providers",[]))
+    tz_changed    = config.get("TZ_NAME") != settings.TZ_NAME
+    fonts_changed = config.get("FONTS",{}) != getattr(settings,"FONTS",{})
+    restart = [key for key in RESTART_KEYS
+               if config.get(key) != getattr(settings,key,None)]
+
+    if fonts_changed:
+      fonts = load_fonts(config)
+      settings.FONTS = config.get("FONTS",{})
+    settings.add(config)
+
+    # drop unused clients and affected cache-entries
+    clients = provider_clients.update(settings.providers)
+    ics_index.update(settings.providers)
+    AgendaReader.no_partial.clear()          # retry partial queries
+    if tz_changed:
+      parts = agenda_cache.invalidate()
+    elif old_keys != new_keys:
+      parts = agenda_cache.invalidate(old_keys-new_keys)
+    else:
+      parts = 0
+    if tz_changed or fonts_changed or old_keys != new_keys:
+      responses = cache.clear()
+    else:
+      responses = 0
+
+  if not settings.quiet:
+    print(f"reloaded {settings.config_file} in "
+          f"{time.monotonic()-start:f}s: "
+          f"{len(new_keys-old_keys)} new/changed and "
+          f"{len(old_keys-new_keys)} removed/changed providers, "
+          f"invalidated {parts} provider-agendas, {responses} responses, "
+          f"{clients} clients")
+    if restart:
+      print(f"restart needed for changes of: {', '.join(restart)}")
+
+class ConfigWatcher(threading.Thread):
+  """ reload configuration if the file changes """
+
+  def __init__(self,interval):
+    """ constructor """
+    super().__init__(daemon=True)
+    self._interval = interval
+
+  def run(self):
+    """ poll modification-time of configuration-file """
+
+    mtime = os.stat(settings.config_file).st_mtime
+    while True:
+      time.sleep(self._interval)
+      try:
+        new_mtime = os.stat(settings.config_file).st_mtime
+      except OSError:
+        continue
+      if new_mtime != mtime:
+        mtime = new_mtime
+        reload_config()
+
+# --- result for the clients   ----------------------------------------------
+
+class AgendaResult:
+  """ mixin for request-handlers: create the result for a client """
+
+  # --- create result   ------------------------------------------------------
+
+  def _get_result(self,query):
+    """ read agenda and return result (query: parameters of the client) """
+
+    now = datetime.datetime.now()
+    events,is_holiday,stale = agenda_cache.get(now.date())
+
+    # the agenda might be from the prefetcher: drop events that ended since
+    now_hm = now.strftime("%H:%M")
+    events = self._fit_events([e for e in events if e["end"] >= now_hm],
+                              query)
+
+    result = self._get_header(now,is_holiday)
+    result["events"] = events
+    if stale:
+      # calendars with errors: age of the last good result (null: none)
+      result["stale"] = {name: int(time.time()-ts) if ts else None
+                         for name,ts in stale.items()}
+    result["glyphs"] = self._get_glyphs(result)
+    return result
+
+  # --- time-related fields   ------------------------------------------------
+
+  def _get_header(self,now,is_holiday):
+    """ return time-related fields of the response """
+
+    return {
+      "day": now.strftime("%d"),        # day of month
+      "weekday": now.strftime("%w") != "0" and not is_holiday,
+      "date": now.strftime("%A %x"),    # Weekday date
+      "now": now.strftime("%x %X")      # date time
+      }
+
+  # --- manifest of used characters per font-role   ---------------------------
 
-  def _get_timeattr(self,component,timeattr,default,tzinfo):
-    """ extract time attribute """
+  def _get_glyphs(self,result):
+    """ return characters used per font-role. This allows the client
+        to load all glyphs of a font in a single pass.
+    """
 
-    if hasattr(component,timeattr):
-      dt = getattr(component,timeattr).value
-      if not isinstance(dt,datetime.datetime):
-        dt = datetime.datetime(dt.year, dt.month, dt.day)
+    time_chars = set()
+    text_chars = set()
+    for event in result["events"]:
+      time_chars.update(event["start"],event["end"])
+      text_chars.update(event["summary"],event["location"])
+    return {
+      "day":    "".join(sorted(set(result["day"]))),
+      "date":   "".join(sorted(set(result["date"]))),
+      "time":   "".join(sorted(time_chars)),
+      "text":   "".join(sorted(text_chars)),
+      "status": "".join(sorted(set(result["now"])))
+      }
+
+  # --- fit event-texts to the width of the client   --------------------------
+
+  def _fit_events(self,events,query):
+    """ ellipsize or wrap summary and location to the display-width
+        passed by the client as query-parameters width and margin
+    """
+
+    if not fonts or not "width" in query:
+      return events
+    try:
+      width  = int(query["width"][0])
+      margin = int(query.get("margin",["5"])[0])
+    except ValueError:
+      return events
+
+    # same geometry as the client: time-column, then text-column
+    txt_offset = margin + fonts["time"].width("23:59") + margin
+    max_width  = width - 2*margin - txt_offset
+    if max_width <= 0:
+      return events
+
+    text_font = fonts["text"]
+    result = []
+    for event in events:
+      event = dict(event)
+      if not event["location"]:
+        # use second line for the rest of the summary
+        event["summary"],event["location"] = text_font.wrap(event["summary"],
+                                                            max_width)
+      else:
+        event["summary"] = text_font.ellipsize(event["summary"],max_width)
+      event["location"] = text_font.ellipsize(event["location"],max_width)
+      result.append(event)
+    return result
+
+# --- handler class   --------------------------------------------------------
+
+class Calendar2json(AgendaResult,http.server.BaseHTTPRequestHandler):
+  """ Request-handler class """
+
+  def log_request(*args,**kw):
+    """ prevent logging unless in debug mode """
+    if settings.debug:
+      http.server.BaseHTTPRequestHandler.log_request(*args,**kw)
+
+  def end_headers(self):
+    """ end header-block: a later error can't send a status anymore """
+    http.server.BaseHTTPRequestHandler.end_headers(self)
+    self._headers_sent = True
+
+  def do_GET(self):
+    """ process get-requests """
+
+    start = time.monotonic()
+    path  = urllib.parse.urlparse(self.path).path
+    self._headers_sent = False
+    try:
+      if path == "/metrics":
+        status = self._send_metrics()
+      elif path == "/stream":
+        status = self._send_stream()
+      else:
+        path   = "/"
+        status = self._send_agenda()
+    except Exception:
+      status = http.HTTPStatus.INTERNAL_SERVER_ERROR.value
+      if self._headers_sent:
+        # response is open (e.g. chunked stream): a second status-line would
+        # end up in the body, closing without the last chunk signals the error
+        self.close_connection = True
+      else:
+        try:
+          self.send_error(status)
+        except OSError:
+          pass
+      raise
+    finally:
+      metrics.inc("calendar2json_requests_total",("http",path,status))
+      metrics.observe("calendar2json_request_duration_seconds",
+                      ("http",status),time.monotonic()-start)
+
+  # --- send agenda   ---------------------------------------------------------
+
+  def _send_agenda(self):
+    """ send agenda (cached), return status """
+
+    if prefetcher:
+      prefetcher.record(self.client_address[0])
+    key = (datetime.date.today(),self.path)
+    bodies = cache.get(key)
+    metrics.inc("calendar2json_cache_requests_total",
+                ("response","hit" if bodies else "miss"))
+    if not bodies:
+      bodies = cache.put(key,self._get_response())
+
+    encoding = self._get_encoding()
+    body     = bodies[encoding]
+    self.send_response(http.HTTPStatus.OK.value)
+    self.send_header("Content-Type","application/json")
+    if encoding != "identity":
+      self.send_header("Content-Encoding",encoding)
+    self.send_header("Vary","Accept-Encoding")
+    self.send_header("Content-Length",str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+    metrics.inc("calendar2json_response_bytes_total",("http",encoding),
+                len(body))
+    return http.HTTPStatus.OK.value
+
+  # --- send agenda as stream   ----------------------------------------------
+
+  def _send_stream(self):
+    """ send agenda as newline-delimited json: the header-fields, then the
+        events of every provider as soon as it is read and finally a trailer
+        with is_holiday, stale and glyphs (or error). HTTP/1.1-clients get
+        chunked transfer, all others a response terminated by close.
+    """
+
+    if prefetcher:
+      prefetcher.record(self.client_address[0])
+    chunked = self.request_version == "HTTP/1.1"
+    if chunked:
+      self.protocol_version = "HTTP/1.1"
+    self.send_response(http.HTTPStatus.OK.value)
+    self.send_header("Content-Type","application/x-ndjson")
+    if chunked:
+      self.send_header("Transfer-Encoding","chunked")
+    self.send_header("Connection","close")
+    self.end_headers()
+
+    now = datetime.datetime.now()
+    result = self._get_header(now,False)
+    size = self._write_lines([result],chunked)
+
+    # the agenda might be from the prefetcher: drop events that ended since
+    now_hm = now.strftime("%H:%M")
+    result["events"] = []
+    is_holiday = False
+    stale = {}
+    try:
+      for events,p_is_holiday,p_stale in agenda_cache.iter_parts(now.date()):
+        events = self._fit_events([e for e in events if e["end"] >= now_hm],
+                                  self._get_query())
+        size += self._write_lines(events,chunked)
+        result["events"].extend(events)
+        is_holiday = is_holiday or p_is_holiday
+        stale.update(p_stale)
+      trailer = {"is_holiday": is_holiday}
+      if stale:
+        trailer["stale"] = {name: int(time.time()-ts) if ts else None
+                            for name,ts in stale.items()}
+      trailer["glyphs"] = self._get_glyphs(result)
+    except Exception as ex:
+      print(f"stream: read failed ({ex})")
+      trailer = {"error": str(ex)}
+    size += self._write_lines([trailer],chunked)
+    if chunked:
+      self.wfile.write(b"0\r\n\r\n")
+    metrics.inc("calendar2json_response_bytes_total",("http","identity"),
+                size)
+    return http.HTTPStatus.OK.value
+
+  def _write_lines(self,items,chunked):
+    """ write items as json-lines (in a single chunk), return size """
+
+    if not items:
+      return 0
+    data = "".join(json.dumps(item)+"\n" for item in items).encode("utf_8")
+    if chunked:
+      self.wfile.write(b"%x\r\n%s\r\n" % (len(data),data))
     else:
-      dt = default
-    if not dt.tzinfo:
-      dt = tzinfo.localize(dt)
-    return dt
+      self.wfile.write(data)
+    return len(data)
+
+  # --- send metrics   --------------------------------------------------------
+
+  def _send_metrics(self):
+    """ send metrics in Prometheus text-format, return status """
+
+    body = metrics.expose()
+    self.send_response(http.HTTPStatus.OK.value)
+    self.send_header("Content-Type","text/plain; version=0.0.4")
+    self.send_header("Content-Length",str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+    return http.HTTPStatus.OK.value
+
+  # --- negotiate content-encoding   ------------------------------------------
+
+  def _get_encoding(self):
+    """ return preferred supported encoding from Accept-Encoding """
+
+    accepted = {}
+    for item in self.headers.get("Accept-Encoding","").split(","):
+      name, _, param = item.strip().partition(";")
+      try:
+        q = float(param.strip()[2:]) if param.strip().startswith("q=") else 1.0
+      except ValueError:
+        q = 0.0
+      accepted[name.strip().lower()] = q
+    for encoding in ENCODINGS:
+      if accepted.get(encoding,0.0) > 0.0:
+        return encoding
+    return "identity"
+
+  # --- create json-response   ------------------------------------------------
+
+  def _get_response(self):
+    """ read agenda and return encoded json-data """
+
+    result = self._get_result(self._get_query())
+    return json.dumps(result,indent=2).encode(encoding='utf_8')
+
+  def _get_query(self):
+    """ return query-parameters of the request """
+    return urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
+
+# --- handler class for the UDP-protocol   -----------------------------------
+
+class Calendar2udp(AgendaResult,socketserver.BaseRequestHandler):
+  """ compact request/response protocol on UDP. A request is a single
+      datagram (REQUEST + device-id), the response one or more datagrams
+      (RESPONSE + chunk of the body):
+
+        DATA:      compact json (deflated if requested)
+        UNCHANGED: json with "now", "stale" and the status-glyphs, the rest
+                   of the content has the hash sent by the client
+        ERROR:     error-message
+        COOKIE:    no body, the hash-field is the cookie of the address
+
+      The hash covers the content without these fields. A retry uses the same
+      nonce and the mask of the received chunks, the server resends the
+      missing chunks of the saved response.
+
+      Requests without a valid cookie only get a COOKIE-datagram, which is
+      smaller than the request: the server cannot be used to amplify
+      traffic to spoofed addresses. The cookie is bound to the address and
+      valid for one to two periods of COOKIE_TTL.
+  """
+
+  MAGIC     = b"C2J"
+  VERSION   = 2
+  REQUEST   = "<3sBBIIIIHB"     # magic,version,flags,nonce,cookie,hash,mask,
+                                # width,margin
+  RESPONSE  = "<3sBBIBBII"      # magic,version,type,nonce,seq,count,hash,crc
+  FLAG_DEFLATE = 0x01
+  DATA, UNCHANGED, ERROR, COOKIE = 1, 2, 3, 4
+  CHUNK     = 1200              # payload per datagram (below common MTUs)
+  MAX_CHUNKS = 32               # size of the mask
+  KEEP      = 30                # seconds to keep responses for retries
+  COOKIE_TTL = 86400            # period of the cookie-rotation
+
+  sent = {}                     # (address,nonce) -> (time,datagrams)
+  lock = threading.Lock()
+  secret = os.urandom(16)       # key of the cookies
+
+  @staticmethod
+  def _get_cookie(address,period):
+    """ return cookie of address for the given period """
+
+    digest = hmac.digest(Calendar2udp.secret,
+                         f"{address}/{period}".encode("utf_8"),"sha256")
+    return struct.unpack("<I",digest[:4])[0] or 1
+
+  def handle(self):
+    """ process request-datagram """
+
+    start = time.monotonic()
+    data,sock = self.request
+    size = struct.calcsize(Calendar2udp.REQUEST)
+    try:
+      (magic,version,flags,nonce,cookie,c_hash,
+       mask,width,margin) = struct.unpack(Calendar2udp.REQUEST,data[:size])
+      device = data[size:size+32].decode("utf_8","replace")
+    except struct.error:
+      return
+    if magic != Calendar2udp.MAGIC or version != Calendar2udp.VERSION:
+      return
+
+    # unproven address: answer with the cookie only (no amplification)
+    address = self.client_address[0]
+    period  = int(time.time())//Calendar2udp.COOKIE_TTL
+    if cookie not in (Calendar2udp._get_cookie(address,period),
+                      Calendar2udp._get_cookie(address,period-1)):
+      sock.sendto(struct.pack(Calendar2udp.RESPONSE,Calendar2udp.MAGIC,
+                              Calendar2udp.VERSION,Calendar2udp.COOKIE,
+                              nonce,0,1,
+                              Calendar2udp._get_cookie(address,period),
+                              zlib.crc32(b"")),self.client_address)
+      metrics.inc("calendar2json_requests_total",("udp","/",401))
+      return
+
+    key = (address,nonce)
+    now = time.monotonic()
+    with Calendar2udp.lock:
+      for k in [k for k,v in Calendar2udp.sent.items()
+                if now - v[0] > Calendar2udp.KEEP]:
+        del Calendar2udp.sent[k]
+      entry = Calendar2udp.sent.get(key)
+    if entry:
+      datagrams = entry[1]
+    else:
+      if prefetcher:
+        prefetcher.record(device or self.client_address[0])
+      query = {"width": [str(width)], "margin": [str(margin)]} if width else {}
+      datagrams = self._get_datagrams(nonce,flags,c_hash,query)
+      with Calendar2udp.lock:
+        Calendar2udp.sent[key] = (now,datagrams)
+
+    size = 0
+    for seq,datagram in enumerate(datagrams):
+      if not mask & (1 << seq):
+        sock.sendto(datagram,self.client_address)
+        size += len(datagram)
+    kind   = datagrams[0][4]
+    status = 500 if kind == Calendar2udp.ERROR else 200
+    if kind == Calendar2udp.DATA and flags & Calendar2udp.FLAG_DEFLATE:
+      encoding = "deflate"
+    else:
+      encoding = "identity"
+    metrics.inc("calendar2json_requests_total",("udp","/",status))
+    metrics.observe("calendar2json_request_duration_seconds",("udp",status),
+                    time.monotonic()-start)
+    metrics.inc("calendar2json_response_bytes_total",("udp",encoding),size)
+
+  def _get_datagrams(self,nonce,flags,c_hash,query):
+    """ create datagrams of the response """
+
+    try:
+      result  = self._get_result(query)
+      content = dict(result)
+      content["glyphs"] = dict(result["glyphs"])
+      volatile = {"now":    content.pop("now"),
+                  "status": content["glyphs"].pop("status"),
+                  "stale":  content.pop("stale",None)}
+      s_hash  = zlib.crc32(
+        json.dumps(content,separators=(",",":")).encode("utf_8"))
+      if s_hash == c_hash:
+        kind = Calendar2udp.UNCHANGED
+        body = json.dumps(volatile,separators=(",",":")).encode("utf_8")
+      else:
+        kind = Calendar2udp.DATA
+        body = json.dumps(result,separators=(",",":")).encode("utf_8")
+        if flags & Calendar2udp.FLAG_DEFLATE:
+          body = zlib.compress(body,9)
+      chunks = [body[i:i+Calendar2udp.CHUNK]
+                for i in range(0,len(body),Calendar2udp.CHUNK)] or [b""]
+      if len(chunks) > Calendar2udp.MAX_CHUNKS:
+        raise ValueError(f"response too large ({len(body)} bytes)")
+    except Exception as ex:
+      print(f"udp: request failed ({ex})")
+      kind, s_hash = Calendar2udp.ERROR, 0
+      body   = str(ex).encode("utf_8")[:Calendar2udp.CHUNK]
+      chunks = [body]
+
+    crc = zlib.crc32(body)
+    return [struct.pack(Calendar2udp.RESPONSE,Calendar2udp.MAGIC,
+                        Calendar2udp.VERSION,kind,nonce,seq,len(chunks),
+                        s_hash,crc) + chunk
+            for seq,chunk in enumerate(chunks)]
 
 # --- signal handler   -------------------------------------------------------
 
 def signal_handler(_signo,_stack_frame):
   """ signal-handler for clean shutdown """
+  parser_pool.shutdown()
   sys.exit(0)
 
+def sighup_handler(_signo,_stack_frame):
+  """ signal-handler for reload (not within the signal-handler) """
+  threading.Thread(target=reload_config).start()
+
 # --- cmdline-parser   ------------------------------------------------------
 
 def get_parser():
@@ -216,11 +1938,48 @@ if __name__ == '__main__':
   # set local to default from environment
   locale.setlocale(locale.LC_ALL, '')
 
+  # font-metrics (optional) for text-truncation
+  fonts = load_fonts(vars(settings))
+
+  # clients of the caldav-servers
+  provider_clients = ProviderClients()
+  ics_index = IcsIndex()
+  last_good = LastGood()
+  metrics = Metrics()
+  reload_lock = threading.Lock()
+
+  # parser for iCalendar-data (optional: multiple processes)
+  parser_pool = ParserPool(getattr(settings,"PARSE_WORKERS",0))
+
+  # caches for agendas and responses
+  ttl = getattr(settings,"CACHE_TTL",60)
+  agenda_cache = AgendaCache(ttl)
+  cache = ResponseCache(ttl)
+
+  # prefetch agendas ahead of the wake-slots of the clients
+  if getattr(settings,"PREFETCH",{}).get("enabled",True):
+    prefetcher = Prefetcher(agenda_cache,settings.PREFETCH,ttl)
+    prefetcher.start()
+  else:
+    prefetcher = None
+
   # setup signal-handler
   signal.signal(signal.SIGTERM, signal_handler)
   signal.signal(signal.SIGINT,  signal_handler)
+  signal.signal(signal.SIGHUP,  sighup_handler)
+
+  # reload configuration if the file changes (optional)
+  if getattr(settings,"RELOAD_POLL",0) > 0:
+    ConfigWatcher(settings.RELOAD_POLL).start()
+
+  # compact protocol on UDP (optional)
+  if getattr(settings,"UDP_PORT",0):
+    udpd = socketserver.ThreadingUDPServer(('',settings.UDP_PORT),Calendar2udp)
+    threading.Thread(target=udpd.serve_forever,daemon=True).start()
+    if not settings.quiet:
+      print("running Calendar2udp-Server on: 0.0.0.0:%d" % settings.UDP_PORT)
 
-  httpd = http.server.HTTPServer(('',settings.PORT),Calendar2json)
+  httpd = http.server.ThreadingHTTPServer(('',settings.PORT),Calendar2json)
   if not settings.quiet:
     print("running Calendar2json-Server on: 0.0.0.0:%d" % settings.PORT)
   httpd.serve_forever()
@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+# -------------------------------------------------------------------------
+# Benchmark: lazy glyph-loading (per label) vs. one-shot loading with the
+# glyph-manifest of the server.
+#
+# The benchmark uses an agenda with 20 events with non-ASCII names. It runs
+# with CPython (needs adafruit_bitmap_font and Blinka-displayio) or on the
+# device (copy this file and the fonts-directory to the device).
+#
+# Usage: tools/bench-glyphs.py [font-dir]   (default: client/fonts)
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import sys
+import time
+from adafruit_bitmap_font import bitmap_font
+
+FONTS = {
+  "day":    "DejaVuSerif-Bold-60.bdf",
+  "date":   "DejaVuSans-BoldOblique-35.bdf",
+  "time":   "DejaVuSerif-BoldItalic-20.bdf",
+  "text":   "DejaVuSerif-20.bdf",
+  "status": "DejaVuSerif-18.bdf"
+  }
+
+NAMES = ["Jour fixe Öffentlichkeitsarbeit", "Müller: Übergabe",
+         "Frühstück mit Jürgen", "Größenänderung besprechen",
+         "Straßenfest-Planung", "Zahnarzt Dr. Käßmann"]
+PLACES = ["Büro 3.14", "Kantine", "Rathaus Süd", "", "Grünhof"]
+
+# --- create test-data   -----------------------------------------------------
+
+def get_labels():
+  """ return list of (role,text) in the order the client creates labels """
+
+  labels = [("day","17"),("date","Donnerstag 17.10.2024")]
+  labels += [("time","23:59"),("text","Mg")]
+  for i in range(20):
+    labels.append(("time",f"{7+i//2:02d}:{(i%2)*30:02d}"))
+    labels.append(("time",f"{8+i//2:02d}:{(i%2)*30+15:02d}"))
+    labels.append(("text",f"{NAMES[i%len(NAMES)]} #{i}"))
+    labels.append(("text",PLACES[i%len(PLACES)]))
+  labels += [("status","Updated: 17.10.24 07:00:03"),("status","3.9V")]
+  return labels
+
+def get_manifest(labels):
+  """ return manifest (characters per role) """
+  manifest = {}
+  for role,text in labels:
+    manifest[role] = manifest.get(role,"") + text
+  return manifest
+
+# --- run benchmark   --------------------------------------------------------
+
+def load_fonts(font_dir):
+  """ load fresh fonts (no glyphs loaded) """
+  return {role: bitmap_font.load_font(f"{font_dir}/{name}")
+          for role,name in FONTS.items()}
+
+def run_lazy(font_dir,labels):
+  """ glyphs are loaded on demand, like label.Label does """
+  fonts = load_fonts(font_dir)
+  start = time.monotonic()
+  for role,text in labels:
+    for c in text:
+      fonts[role].get_glyph(ord(c))
+  return time.monotonic()-start
+
+def run_manifest(font_dir,labels):
+  """ glyphs are loaded once per font from the manifest """
+  fonts = load_fonts(font_dir)
+  start = time.monotonic()
+  for role,chars in get_manifest(labels).items():
+    fonts[role].load_glyphs(chars)
+  for role,text in labels:
+    for c in text:
+      fonts[role].get_glyph(ord(c))
+  return time.monotonic()-start
+
+# --- main program   ---------------------------------------------------------
+
+font_dir = sys.argv[1] if len(sys.argv) > 1 else "client/fonts"
+labels   = get_labels()
+t_lazy     = run_lazy(font_dir,labels)
+t_manifest = run_manifest(font_dir,labels)
+print(f"labels:   {len(labels)}")
+print(f"lazy:     {t_lazy:f}s")
+print(f"manifest: {t_manifest:f}s")
+print(f"saved:    {t_lazy-t_manifest:f}s")
@@ -0,0 +1,181 @@
+#!/usr/bin/python3
+# -------------------------------------------------------------------------
+# Benchmark: parse realistic calendar-data with vobject (object-trees) and
+# with the lean streaming parser of the server.
+#
+# The fixtures contain folded lines, escaped text, attendees, alarms (with
+# their own DURATION), all-day events, UTC-times, times with TZID and
+# events without DTEND. Both parsers must return the same items. Every
+# parser runs in a separate process, so the peak RSS is comparable. The
+# agenda is finally created with parse_events() (naive start/end of day,
+# like the AgendaReader).
+#
+# Usage: tools/bench-ical.py [events]   (default: 2000)
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import sys
+import os
+import time
+import datetime
+import importlib.util
+import resource
+import subprocess
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      "..","server","usr","local","sbin","py-calendar2json.py")
+TZ_NAME = "Europe/Berlin"
+
+VTIMEZONE = """BEGIN:VTIMEZONE\r
+TZID:Europe/Berlin\r
+BEGIN:DAYLIGHT\r
+TZOFFSETFROM:+0100\r
+TZOFFSETTO:+0200\r
+TZNAME:CEST\r
+DTSTART:19700329T020000\r
+RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU\r
+END:DAYLIGHT\r
+BEGIN:STANDARD\r
+TZOFFSETFROM:+0200\r
+TZOFFSETTO:+0100\r
+TZNAME:CET\r
+DTSTART:19701025T030000\r
+RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU\r
+END:STANDARD\r
+END:VTIMEZONE\r
+"""
+
+DESCRIPTION = ("Agenda:\\n1. Status\\, open issues\\n2. Planning; "
+               "please prepare the documents in advance. " * 4)
+
+# --- load server-script as module   -----------------------------------------
+
+def load_server():
+  """ load server-script (the name has no valid module-name) """
+
+  spec = importlib.util.spec_from_file_location("py_calendar2json",SERVER)
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+# --- create test-data   -----------------------------------------------------
+
+def fold(line):
+  """ fold content-line at 75 characters """
+  parts = [line[i:i+74] for i in range(0,len(line),74)]
+  return "\r\n ".join(parts) + "\r\n"
+
+def get_event(day,i):
+  """ return iCalendar-text of a single event """
+
+  start = datetime.datetime.combine(day,datetime.time(6+i%14,(i*5)%60))
+  end   = start + datetime.timedelta(minutes=30+15*(i%4))
+  tz    = ""
+  kind  = i%6
+  if kind == 0:                                   # TZID
+    tz     = VTIMEZONE
+    dtstart = f"DTSTART;TZID={TZ_NAME}:{start:%Y%m%dT%H%M%S}\r\n"
+    dtend   = f"DTEND;TZID={TZ_NAME}:{end:%Y%m%dT%H%M%S}\r\n"
+  elif kind == 1:                                 # UTC + DURATION
+    dtstart = f"DTSTART:{start:%Y%m%dT%H%M%S}Z\r\n"
+    dtend   = f"DURATION:PT{30+15*(i%4)}M\r\n"
+  elif kind == 2:                                 # floating
+    dtstart = f"DTSTART:{start:%Y%m%dT%H%M%S}\r\n"
+    dtend   = f"DTEND:{end:%Y%m%dT%H%M%S}\r\n"
+  elif kind == 3:                                 # all-day
+    dtstart = f"DTSTART;VALUE=DATE:{day:%Y%m%d}\r\n"
+    dtend   = f"DTEND;VALUE=DATE:{day+datetime.timedelta(days=1):%Y%m%d}\r\n"
+  elif kind == 4:                                 # all-day without DTEND
+    dtstart = f"DTSTART;VALUE=DATE:{day:%Y%m%d}\r\n"
+    dtend   = ""
+  else:                                           # TZID without DTEND
+    dtstart = f"DTSTART;TZID={TZ_NAME}:{start:%Y%m%dT%H%M%S}\r\n"
+    dtend   = ""
+
+  attendees = "".join(
+    fold(f'ATTENDEE;CN="Person {n}, Team {i%7}";ROLE=REQ-PARTICIPANT;'
+         f'PARTSTAT=NEEDS-ACTION;RSVP=TRUE:mailto:person{n}@example.com')
+    for n in range(5))
+  return ("BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//bench//ical//EN\r\n" +
+          tz + "BEGIN:VEVENT\r\n" +
+          f"UID:bench-{i}@example.com\r\nDTSTAMP:20240101T000000Z\r\n" +
+          dtstart + dtend +
+          fold(f"SUMMARY:Meeting {i}: Jour fixe\\, Öffentlichkeitsarbeit "
+               f"und Straßenfest-Planung für das Quartier Süd") +
+          fold(f'LOCATION;ALTREP="http://example.com/room/{i%100}":'
+               f"Room {i%100}\\; Building B") +
+          fold(f"DESCRIPTION:{DESCRIPTION}") +
+          fold("ORGANIZER;CN=Organizer:mailto:organizer@example.com") +
+          attendees +
+          "BEGIN:VALARM\r\nACTION:DISPLAY\r\nDESCRIPTION:Reminder\r\n" +
+          "TRIGGER:-PT15M\r\nDURATION:PT5M\r\nREPEAT:2\r\nEND:VALARM\r\n" +
+          "END:VEVENT\r\nEND:VCALENDAR\r\n")
+
+def get_calendar(day,count):
+  """ return list of iCalendar-texts """
+  return [get_event(day,i) for i in range(count)]
+
+# --- run a single parser   --------------------------------------------------
+
+def run(parser,events):
+  """ parse all events, print time and items """
+
+  server   = load_server()
+  import pytz
+  tz_local = pytz.timezone(TZ_NAME)
+  day      = datetime.date.today()
+  start_of_day = tz_local.localize(
+    datetime.datetime.combine(day,datetime.time()))
+  end_of_day   = start_of_day + datetime.timedelta(hours=23,minutes=59)
+  texts = get_calendar(day,events)
+  if parser == "vobject":
+    read = server._read_events_vobject
+  else:
+    read = server.read_events
+
+  start = time.monotonic()
+  records = [read(text,tz_local) for text in texts]
+  duration = time.monotonic()-start
+
+  items = []
+  for events in records:
+    for event in events:
+      dtstart = event.dtstart or start_of_day
+      dtend = (dtstart + event.duration if event.duration is not None
+               else event.dtend or end_of_day)
+      items.append((dtstart.astimezone().isoformat(),
+                    dtend.astimezone().isoformat(),
+                    event.summary,event.location))
+  print(duration)
+  print(hash(tuple(items)))
+  print(len(items))
+  print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+  agenda = server.parse_events(
+    texts,datetime.datetime.combine(day,datetime.time.min),
+    datetime.datetime.combine(day,datetime.time.max),start_of_day,TZ_NAME)
+  print(len(agenda))
+
+# --- main program   ---------------------------------------------------------
+
+if len(sys.argv) > 2:
+  run(sys.argv[1],int(sys.argv[2]))
+  sys.exit(0)
+
+events = sys.argv[1] if len(sys.argv) > 1 else "2000"
+results = {}
+for parser in ["vobject","lean"]:
+  env = dict(os.environ,PYTHONHASHSEED="0")
+  out = subprocess.run([sys.executable,__file__,parser,events],env=env,
+                       check=True,capture_output=True,text=True).stdout.split()
+  results[parser] = (float(out[0]),out[1])
+  print(f"{parser:8s} items: {out[2]}  time: {float(out[0]):6.3f}s  "
+        f"peak RSS: {int(out[3])/1024:6.1f}MB  agenda: {out[4]}")
+
+print(f"identical results: {results['vobject'][1] == results['lean'][1]}")
+print(f"speedup: {results['vobject'][0]/results['lean'][0]:.1f}x")
@@ -0,0 +1,139 @@
+#!/usr/bin/python3
+# -------------------------------------------------------------------------
+# Benchmark: read the agenda of a day from a directory of ics-files
+# (provider with ics_dir).
+#
+# The directory contains an exported calendar (one file with events spread
+# over a year, a part of them recurring) and a calendar with one file per
+# event (like vdirsyncer). The program measures the first read (parse and
+# index), reads with an unchanged index, a read after a change of a single
+# file and, for comparison, parsing all files on every read.
+#
+# Usage: tools/bench-ics.py [events] [files] [reads]
+#        (default: 5000 events in the export, 500 files, 100 reads)
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import sys
+import os
+import time
+import datetime
+import tempfile
+import importlib.util
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      "..","server","usr","local","sbin","py-calendar2json.py")
+TZ_NAME = "Europe/Berlin"
+
+# --- load server-script as module   -----------------------------------------
+
+def load_server():
+  """ load server-script (the name has no valid module-name) """
+
+  spec = importlib.util.spec_from_file_location("py_calendar2json",SERVER)
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+# --- create test-data   -----------------------------------------------------
+
+def get_event(i,day,rrule=False):
+  """ return VEVENT for day """
+
+  start = datetime.datetime.combine(day,datetime.time(6+i%14,(i*5)%60))
+  end   = start + datetime.timedelta(minutes=30+15*(i%4))
+  return f"""BEGIN:VEVENT
+UID:bench-{i}@example.com
+DTSTAMP:20240101T000000Z
+DTSTART;TZID={TZ_NAME}:{start:%Y%m%dT%H%M%S}
+DTEND;TZID={TZ_NAME}:{end:%Y%m%dT%H%M%S}
+{"RRULE:FREQ=WEEKLY"+chr(10) if rrule else ""}SUMMARY:Meeting number {i} with a longer summary
+LOCATION:Room {i%100}
+DESCRIPTION:Some description\\, which is not used by the client.
+END:VEVENT
+"""
+
+def create_dir(ics_dir,day,events,files):
+  """ create export.ics and the directory single with one file per event """
+
+  first = day - datetime.timedelta(days=180)
+  with open(os.path.join(ics_dir,"export.ics"),"w") as f:
+    f.write("BEGIN:VCALENDAR\nVERSION:2.0\n")
+    for i in range(events):
+      f.write(get_event(i,first+datetime.timedelta(days=i*365//events),
+                        rrule=i%20 == 0))
+    f.write("END:VCALENDAR\n")
+
+  single = os.path.join(ics_dir,"single")
+  os.mkdir(single)
+  for i in range(files):
+    with open(os.path.join(single,f"{i}.ics"),"w") as f:
+      f.write("BEGIN:VCALENDAR\nVERSION:2.0\n" +
+              get_event(i,day+datetime.timedelta(days=i%30-15)) +
+              "END:VCALENDAR\n")
+
+# --- run reads   ------------------------------------------------------------
+
+def read(server,reader,ics_dir,reads=1):
+  """ read both calendars, return (microseconds per read,items) """
+
+  start = time.perf_counter()
+  for _ in range(reads):
+    items = [item for cal_name in ["export","single"]
+             for item in reader._get_items_for_ics(
+               ics_dir,{"cal_name": cal_name,"cal_color": "red",
+                        "is_holiday": False})]
+  return (time.perf_counter()-start)/reads*1e6,items
+
+def read_file(filename):
+  """ return content of a file """
+
+  with open(filename,encoding="utf_8",errors="replace") as f:
+    return f.read()
+
+def read_all(server,reader,ics_dir):
+  """ parse all files of both calendars (no index) """
+
+  start = time.perf_counter()
+  texts = [read_file(os.path.join(ics_dir,"export.ics"))]
+  single = os.path.join(ics_dir,"single")
+  texts.extend(read_file(os.path.join(single,name))
+               for name in os.listdir(single))
+  items = server.parse_events(texts,reader.start_of_day,reader.end_of_day,
+                              reader.now,TZ_NAME)
+  return (time.perf_counter()-start)*1e6,items
+
+# --- main program   ---------------------------------------------------------
+
+events = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+files  = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+reads  = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+
+server = load_server()
+server.settings  = server.Options()
+server.settings.add({"TZ_NAME": TZ_NAME})
+server.metrics   = server.Metrics()
+server.ics_index = server.IcsIndex()
+
+with tempfile.TemporaryDirectory() as ics_dir:
+  day = datetime.date.today()
+  create_dir(ics_dir,day,events,files)
+  reader = server.AgendaReader(day)
+  reader.now = reader.tz_local.localize(reader.start_of_day)
+
+  print(f"events: {events} (export.ics), files: {files} (single)")
+  duration,items = read(server,reader,ics_dir)
+  print(f"first read (parse):    {duration:10.0f}us  items: {len(items)}")
+  duration,items = read(server,reader,ics_dir,reads)
+  print(f"unchanged index:       {duration:10.0f}us  items: {len(items)}")
+  os.utime(os.path.join(ics_dir,"single","0.ics"))
+  duration,items = read(server,reader,ics_dir)
+  print(f"one changed file:      {duration:10.0f}us  items: {len(items)}")
+  duration,items = read_all(server,reader,ics_dir)
+  print(f"parse all (no index):  {duration:10.0f}us  items: {len(items)} "
+        f"(no day-filter, no recurrences)")
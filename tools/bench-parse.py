@@ -0,0 +1,130 @@
+#!/usr/bin/python3
+# -------------------------------------------------------------------------
+# Benchmark: parse a large synthetic calendar with a varying number of
+# parser-processes (setting PARSE_WORKERS of the server).
+#
+# The calendar consists of separate VCALENDAR-objects (like the results of
+# a CalDAV-query), a part of them with their own VTIMEZONE.
+#
+# The workers use the start-method of the server (forkserver): every worker
+# imports this program, which loads the server-script by path, just like
+# the workers of the server run the server-script. The program reports the
+# start-up time of the pool (first parse) and the parse-time.
+#
+# Usage: tools/bench-parse.py [events] [max-workers] [start-method]
+#        (default: 5000 events, number of cpus, forkserver)
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import sys
+import os
+import time
+import datetime
+import importlib.util
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      "..","server","usr","local","sbin","py-calendar2json.py")
+TZ_NAME = "Europe/Berlin"
+
+VTIMEZONE = """BEGIN:VTIMEZONE
+TZID:Europe/Berlin
+BEGIN:DAYLIGHT
+TZOFFSETFROM:+0100
+TZOFFSETTO:+0200
+TZNAME:CEST
+DTSTART:19700329T020000
+RRULE:FREQ=YEARLY;BYMONTH=3;BYDAY=-1SU
+END:DAYLIGHT
+BEGIN:STANDARD
+TZOFFSETFROM:+0200
+TZOFFSETTO:+0100
+TZNAME:CET
+DTSTART:19701025T030000
+RRULE:FREQ=YEARLY;BYMONTH=10;BYDAY=-1SU
+END:STANDARD
+END:VTIMEZONE
+"""
+
+# --- load server-script as module   -----------------------------------------
+
+def load_server():
+  """ load server-script (the name has no valid module-name) """
+
+  spec = importlib.util.spec_from_file_location("py_calendar2json",SERVER)
+  module = importlib.util.module_from_spec(spec)
+  sys.modules["py_calendar2json"] = module     # needed for pickling
+  spec.loader.exec_module(module)
+  return module
+
+# --- create test-data   -----------------------------------------------------
+
+def get_calendar(day,count):
+  """ return list of iCalendar-texts """
+
+  texts = []
+  for i in range(count):
+    start = datetime.datetime.combine(day,datetime.time(6+i%14,(i*5)%60))
+    end   = start + datetime.timedelta(minutes=30+15*(i%4))
+    if i%2:
+      tz   = VTIMEZONE
+      tzid = f";TZID={TZ_NAME}"
+    else:
+      tz   = ""
+      tzid = ""
+    texts.append(f"""BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//bench//parse//EN
+{tz}BEGIN:VEVENT
+UID:bench-{i}@example.com
+DTSTAMP:20240101T000000Z
+DTSTART{tzid}:{start:%Y%m%dT%H%M%S}
+DTEND{tzid}:{end:%Y%m%dT%H%M%S}
+SUMMARY:Meeting number {i} with a longer summary
+LOCATION:Room {i%100}
+DESCRIPTION:Some description\\, which is not used by the client.
+END:VEVENT
+END:VCALENDAR
+""")
+  return texts
+
+# --- main program   ---------------------------------------------------------
+
+# also executed by every worker (the workers need the server-module)
+server = load_server()
+
+if __name__ == '__main__':
+  events      = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+  max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+  mp_context  = sys.argv[3] if len(sys.argv) > 3 else "forkserver"
+
+  import pytz
+  tz_local     = pytz.timezone(TZ_NAME)
+  day          = datetime.date.today()
+  start_of_day = tz_local.localize(
+    datetime.datetime.combine(day,datetime.time()))
+  end_of_day   = start_of_day + datetime.timedelta(hours=23,minutes=59)
+  texts        = get_calendar(day,events)
+
+  print(f"events: {events}, cpus: {os.cpu_count()}, "
+        f"start-method: {mp_context}")
+  base = None
+  for workers in range(1,max_workers+1):
+    pool = server.ParserPool(workers,mp_context=mp_context)
+    server.parser_pool = pool
+    start = time.monotonic()
+    pool.parse(texts[:workers*pool.MIN_CHUNK],     # start worker-processes
+               start_of_day,end_of_day,start_of_day,TZ_NAME)
+    startup = time.monotonic()-start
+    start = time.monotonic()
+    items = pool.parse(texts,start_of_day,end_of_day,start_of_day,TZ_NAME)
+    duration = time.monotonic()-start
+    pool.shutdown()
+    base = base or duration
+    print(f"workers: {workers:2d}  items: {len(items)}  "
+          f"start-up: {startup:6.3f}s  time: {duration:6.3f}s  "
+          f"speedup: {base/duration:4.1f}")
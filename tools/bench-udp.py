@@ -0,0 +1,229 @@
+#!/usr/bin/python3
+# -------------------------------------------------------------------------
+# Benchmark: fetch a synthetic agenda with HTTP (new TCP-connection, like
+# the client) and with the compact UDP-protocol (UDP_PORT of the server).
+#
+# The program counts the bytes on the wire and the packets (exact for UDP,
+# estimated for TCP), measures the latency on localhost and models the
+# radio-on time of the client from round-trips, bytes and packets.
+# Option -l drops response-datagrams to exercise the retries. The client
+# keeps the cookie of the server (like in the state-store), the row
+# "udp-cookie" shows the additional exchange of a client without cookie.
+#
+# Usage: tools/bench-udp.py [-e events] [-n requests] [-l loss]
+#                           [--rtt ms] [--rate Mbit/s] [--per-packet ms]
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import sys
+import os
+import time
+import random
+import socket
+import threading
+import http.server
+import socketserver
+import importlib.util
+import types
+from argparse import ArgumentParser
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      "..","server","usr","local","sbin","py-calendar2json.py")
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "..","client"))
+from base_app import udp_client
+
+MSS        = 1460                   # TCP payload per segment
+IP_TCP     = 40                     # IP+TCP header
+IP_UDP     = 28                     # IP+UDP header
+WIDTH      = 400                    # geometry of the client
+MARGIN     = 5
+
+# --- load server-script as module   -----------------------------------------
+
+def load_server():
+  """ load server-script (the name has no valid module-name) """
+
+  spec = importlib.util.spec_from_file_location("py_calendar2json",SERVER)
+  module = importlib.util.module_from_spec(spec)
+  spec.loader.exec_module(module)
+  return module
+
+# --- synthetic agenda   -----------------------------------------------------
+
+class StaticAgenda:
+  """ replacement for the AgendaCache of the server """
+
+  def __init__(self,count):
+    """ constructor """
+    self.events = [{"start":    f"{(8+i)%24:02d}:{(i*15)%60:02d}",
+                    "end":      "23:59",
+                    "summary":  f"Meeting {i} with the project-team",
+                    "location": "Room 4.0{i%10}" if i%2 else "",
+                    "color":    ["red","black"][i%2]}
+                   for i in range(count)]
+
+  def get(self,day):
+    """ return (events,is_holiday,stale) """
+    return (self.events,False,{})
+
+# --- start servers   --------------------------------------------------------
+
+def start_servers(m,options):
+  """ start HTTP- and UDP-server on free ports """
+
+  m.settings = types.SimpleNamespace(debug=False)
+  m.fonts        = {}
+  m.metrics      = m.Metrics()
+  m.agenda_cache = StaticAgenda(options.events)
+  m.cache        = m.ResponseCache(60)
+  m.prefetcher   = None
+
+  class LossyUdp(m.Calendar2udp):
+    """ drop response-datagrams with the given probability """
+    def handle(self):
+      data,sock = self.request
+      sendto = sock.sendto
+      class Lossy:
+        def sendto(self,datagram,address):
+          if random.random() >= options.loss:
+            sendto(datagram,address)
+      self.request = (data,Lossy())
+      m.Calendar2udp.handle(self)
+
+  httpd = http.server.ThreadingHTTPServer(('127.0.0.1',0),m.Calendar2json)
+  udpd  = socketserver.ThreadingUDPServer(('127.0.0.1',0),LossyUdp)
+  for server in [httpd,udpd]:
+    threading.Thread(target=server.serve_forever,daemon=True).start()
+  return httpd.server_address[1],udpd.server_address[1]
+
+# --- HTTP-request   ---------------------------------------------------------
+
+def fetch_http(port):
+  """ fetch agenda with a new connection, return (request,response)-bytes """
+
+  request = (f"GET /?width={WIDTH}&margin={MARGIN} HTTP/1.1\r\n"
+             f"Host: 127.0.0.1:{port}\r\n"
+             "User-Agent: Adafruit CircuitPython\r\n"
+             "Accept-Encoding: deflate\r\n"
+             "Connection: close\r\n\r\n").encode()
+  with socket.create_connection(("127.0.0.1",port)) as sock:
+    sock.sendall(request)
+    size = 0
+    while True:
+      data = sock.recv(4096)
+      if not data:
+        break
+      size += len(data)
+  return len(request),size
+
+def tcp_model(req,resp):
+  """ return (packets,wire-bytes,round-trips) of a TCP-exchange """
+
+  req_segs  = -(-req//MSS)
+  resp_segs = -(-resp//MSS)
+  packets = (3 +                         # SYN, SYN-ACK, ACK
+             req_segs + resp_segs +
+             1 + -(-resp_segs//2) +      # (delayed) ACKs
+             4)                          # FIN, ACK, FIN, ACK
+  return packets, req + resp + packets*IP_TCP, 2
+
+# --- UDP-request   ----------------------------------------------------------
+
+def fetch_udp(port,last_hash,cookie):
+  """ fetch agenda, return (response,request-bytes,response-bytes) """
+
+  response = udp_client.get(socket,f"udp://127.0.0.1:{port}",
+                            device_id="bench",last_hash=last_hash,
+                            width=WIDTH,margin=MARGIN,deflate=True,
+                            timeout=0.2,retries=5,cookie=cookie)
+  req  = response.sent*(udp_client.struct.calcsize(udp_client.REQUEST)+5)
+  resp = response.received*udp_client.RESPONSE_SIZE + len(response.body)
+  return response,req,resp
+
+# --- radio-on time   --------------------------------------------------------
+
+def radio_time(options,packets,wire,rtts):
+  """ model of the radio-on time (ms) """
+
+  return (rtts*options.rtt + wire*8/(options.rate*1000) +
+          packets*options.per_packet)
+
+# --- run benchmark   --------------------------------------------------------
+
+def run(options):
+  """ run benchmark and print results """
+
+  m = load_server()
+  http_port,udp_port = start_servers(m,options)
+  results = {}
+
+  # HTTP
+  times = []
+  for _ in range(options.requests):
+    start = time.perf_counter()
+    req,resp = fetch_http(http_port)
+    times.append(time.perf_counter()-start)
+  packets,wire,rtts = tcp_model(req,resp)
+  results["http"] = (req+resp,packets,wire,rtts,times)
+
+  # UDP: without cookie, first request (data), then with the hash
+  # (unchanged)
+  cookie = fetch_udp(udp_port,0,0)[0].cookie
+  for name,unchanged in [("udp-cookie",False),("udp",False),
+                         ("udp-unchanged",True)]:
+    times, packets, wire, rtts = [], 0, 0, 0
+    last_hash = 0
+    if unchanged:
+      last_hash = fetch_udp(udp_port,0,cookie)[0].hash
+    for _ in range(options.requests):
+      start = time.perf_counter()
+      response,req,resp = fetch_udp(udp_port,last_hash,
+                                    0 if name == "udp-cookie" else cookie)
+      times.append(time.perf_counter()-start)
+      packets += response.sent + response.received
+      wire    += req + resp + (response.sent+response.received)*IP_UDP
+      rtts    += response.sent
+    n = options.requests
+    results[name] = (req+resp,packets/n,wire/n,rtts/n,times)
+
+  print(f"events: {options.events}, requests: {options.requests}, "
+        f"loss: {options.loss:.0%}, model: rtt {options.rtt}ms, "
+        f"{options.rate}Mbit/s, {options.per_packet}ms/packet")
+  print(f"{'protocol':14s} {'payload':>8s} {'packets':>8s} {'wire':>7s} "
+        f"{'rtts':>5s} {'latency':>9s} {'radio':>9s}")
+  for name,(payload,packets,wire,rtts,times) in results.items():
+    times.sort()
+    print(f"{name:14s} {payload:8d} {packets:8.1f} {wire:7.0f} {rtts:5.1f} "
+          f"{times[len(times)//2]*1000:7.2f}ms "
+          f"{radio_time(options,packets,wire,rtts):7.2f}ms")
+
+# --- cmdline-parser   ------------------------------------------------------
+
+def get_parser():
+  """ configure cmdline-parser """
+
+  parser = ArgumentParser(description='compare HTTP and UDP-protocol')
+  parser.add_argument('-e', '--events', type=int, default=12,
+                      help='number of events (default: 12)')
+  parser.add_argument('-n', '--requests', type=int, default=50,
+                      help='number of requests (default: 50)')
+  parser.add_argument('-l', '--loss', type=float, default=0.0,
+                      help='loss-rate of response-datagrams (default: 0)')
+  parser.add_argument('--rtt', type=float, default=5.0,
+                      help='round-trip time in ms (default: 5)')
+  parser.add_argument('--rate', type=float, default=6.0,
+                      help='effective data-rate in Mbit/s (default: 6)')
+  parser.add_argument('--per-packet', type=float, default=0.3,
+                      help='overhead per packet in ms (default: 0.3)')
+  return parser
+
+# --- main program   ---------------------------------------------------------
+
+if __name__ == '__main__':
+  run(get_parser().parse_args())
@@ -0,0 +1,133 @@
+#!/usr/bin/python3
+# -------------------------------------------------------------------------
+# Convert BMP-images to the palette-indexed run-length format of the client.
+#
+# Every pixel is mapped to the nearest color of UI_PALETTE (see
+# client/ui_settings.py), so the client needs no color-conversion.
+#
+# File format (all numbers little endian):
+#
+#   b"RLE1", width (uint16), height (uint16)
+#   runs in row-major order, a run never spans two rows:
+#     0ccc nnnn             : color ccc, length nnnn+1 (1-16)
+#     1ccc nnnn nnnn nnnn   : color ccc, length n+1 (1-4096)
+#
+# Usage: tools/bmp2rle.py image.bmp [...] -o target-dir
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import os
+import struct
+from argparse import ArgumentParser
+
+# must match UI_PALETTE in client/ui_settings.py
+UI_PALETTE = [0xFFFFFF, 0x000000, 0x0000FF, 0x00FF00,
+              0xFF0000, 0xFFFF00, 0xFFA500]
+
+MAGIC = b"RLE1"
+
+# --- read BMP   -------------------------------------------------------------
+
+def read_bmp(filename):
+  """ read uncompressed BMP, return (width,height,rows of RGB-values) """
+
+  with open(filename,"rb") as f:
+    data = f.read()
+  if data[:2] != b"BM":
+    raise ValueError(f"{filename}: not a BMP-file")
+  offset, = struct.unpack_from("<I",data,10)
+  dib_size, width, height, _, bpp, compression = struct.unpack_from(
+    "<IiiHHI",data,14)
+  if compression not in [0,3]:
+    raise ValueError(f"{filename}: compressed BMPs are not supported")
+  top_down = height < 0
+  height   = abs(height)
+
+  palette = []
+  if bpp <= 8:
+    colors, = struct.unpack_from("<I",data,46)
+    colors = colors or 2**bpp
+    for i in range(colors):
+      b,g,r,_ = data[14+dib_size+4*i:14+dib_size+4*i+4]
+      palette.append((r<<16) | (g<<8) | b)
+
+  stride = ((width*bpp+31)//32)*4
+  rows = []
+  for y in range(height):
+    row_start = offset + stride*(y if top_down else height-1-y)
+    row = []
+    for x in range(width):
+      if bpp <= 8:
+        bit = x*bpp
+        byte = data[row_start+bit//8]
+        index = (byte >> (8-bpp-bit%8)) & ((1<<bpp)-1)
+        row.append(palette[index])
+      else:
+        b,g,r = data[row_start+x*bpp//8:row_start+x*bpp//8+3]
+        row.append((r<<16) | (g<<8) | b)
+    rows.append(row)
+  return (width,height,rows)
+
+# --- map RGB to nearest palette-index   -------------------------------------
+
+def nearest_index(rgb,cache={}):
+  """ return index of nearest color in UI_PALETTE """
+
+  if rgb not in cache:
+    r,g,b = rgb>>16, (rgb>>8) & 0xFF, rgb & 0xFF
+    dist = [(r-(c>>16))**2 + (g-((c>>8)&0xFF))**2 + (b-(c&0xFF))**2
+            for c in UI_PALETTE]
+    cache[rgb] = dist.index(min(dist))
+  return cache[rgb]
+
+# --- encode image   ---------------------------------------------------------
+
+def encode(width,height,rows):
+  """ encode rows as runs """
+
+  out = bytearray(MAGIC + struct.pack("<HH",width,height))
+  for row in rows:
+    x = 0
+    while x < width:
+      color = nearest_index(row[x])
+      n = 1
+      while x+n < width and n < 4096 and nearest_index(row[x+n]) == color:
+        n += 1
+      if n <= 16:
+        out.append((color<<4) | (n-1))
+      else:
+        out.append(0x80 | (color<<4) | ((n-1)>>8))
+        out.append((n-1) & 0xFF)
+      x += n
+  return out
+
+# --- cmdline-parser   ------------------------------------------------------
+
+def get_parser():
+  """ configure cmdline-parser """
+
+  parser = ArgumentParser(description='convert BMP to RLE')
+  parser.add_argument('-o', '--output', dest='output', default='.',
+                      help='target directory (default: current directory)')
+  parser.add_argument('files', nargs='+', metavar='image.bmp',
+                      help='BMP-files')
+  return parser
+
+# --- main program   ---------------------------------------------------------
+
+if __name__ == '__main__':
+  options = get_parser().parse_args()
+  for filename in options.files:
+    width,height,rows = read_bmp(filename)
+    data = encode(width,height,rows)
+    target = os.path.join(options.output,
+                  os.path.splitext(os.path.basename(filename))[0] + ".rle")
+    with open(target,"wb") as f:
+      f.write(data)
+    print(f"{filename} ({os.path.getsize(filename)} bytes) -> "
+          f"{target} ({len(data)} bytes)")
@@ -0,0 +1,63 @@
+# -------------------------------------------------------------------------
+# Print an import-time profile of the client.
+#
+# Copy this file to the device and run it from the REPL with
+#
+#   import import_profile
+#
+# after a soft-reset. Modules are imported in the same order as during
+# startup of main.py, so every line shows the incremental cost of the
+# module (including dependencies not yet loaded). The last line is the
+# lookup of the HAL: the first run probes for the file and saves the name
+# in the state-store, later runs (also after deep-sleep) read the name.
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import time
+import gc
+
+MODULES = [
+  # startup (main.py)
+  "settings",
+  "base_app.ui_application",
+  "ui_settings",
+  "agenda",
+  # phases (deferred imports)
+  "adafruit_bitmap_font.bitmap_font",
+  "frame",
+  "adafruit_display_text.label",
+  "text_renderer",
+  "adafruit_requests",
+  "asyncio",
+  ]
+
+total = 0
+print(f"{'module':<34}{'time (ms)':>10}{'mem (bytes)':>12}")
+for name in MODULES:
+  gc.collect()
+  mem = gc.mem_free()
+  start = time.monotonic_ns()
+  try:
+    __import__(name)
+  except ImportError as ex:
+    print(f"{name:<34}   {ex}")
+    continue
+  duration = (time.monotonic_ns()-start)/1000000
+  total += duration
+  gc.collect()
+  print(f"{name:<34}{duration:>10.1f}{mem-gc.mem_free():>12}")
+print(f"{'total':<34}{total:>10.1f}")
+
+from base_app.ui_application import UIApplication
+app = UIApplication.__new__(UIApplication)
+app._debug = True
+start = time.monotonic_ns()
+hal = app._get_hal()
+print(f"{'HAL lookup and import':<34}"
+      f"{(time.monotonic_ns()-start)/1000000:>10.1f}")
+hal.impl.get_state_store().commit()
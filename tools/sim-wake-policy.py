@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+# -------------------------------------------------------------------------
+# Simulation of the battery-aware wake-policy (client/base_app/wake_policy.py).
+#
+# The simulation replays the discharge curve of a LiPo-battery: every wake
+# consumes a fixed charge, deep-sleep consumes a constant current. The
+# program runs the time-table with and without the policy and prints the
+# runtime, the number of refreshes and the refreshes per mode.
+#
+# Usage: tools/sim-wake-policy.py [-c capacity_mAh] [-w wake_mAh]
+#                                 [-s sleep_uA] [-p policy-json]
+#
+# Author: Bernhard Bablok
+# License: GPL3
+#
+# Website: https://github.com/bablokb/pico-e-ink-daily
+#
+# -------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import json
+import tempfile
+from argparse import ArgumentParser
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "..","client"))
+from base_app.wake_policy import WakePolicy
+from base_app.state_store import StateStore, FileMemory
+
+# (fraction of capacity, volts) of a typical LiPo
+CURVE = [(1.00,4.20), (0.90,4.05), (0.80,3.95), (0.70,3.87), (0.60,3.82),
+         (0.50,3.79), (0.40,3.75), (0.30,3.70), (0.20,3.62), (0.10,3.45),
+         (0.05,3.30), (0.02,3.10), (0.00,3.00)]
+
+# every 15 minutes from 06:00 to 22:45
+TIME_TABLE = [((6,22,1),(0,45,15))]*7
+
+POLICY = {
+  "levels":   [[3.3,"hourly"],[3.1,"daily"]],
+  "v_empty":  3.0,
+  "min_days": 3
+  }
+
+START = 1704067200                  # 2024-01-01 00:00 UTC
+
+# --- voltage from remaining charge   ----------------------------------------
+
+def voltage(fraction):
+  """ interpolate voltage from discharge-curve """
+
+  for (f1,v1),(f2,v2) in zip(CURVE,CURVE[1:]):
+    if fraction >= f2:
+      return v2 + (v1-v2)*(fraction-f2)/(f1-f2)
+  return CURVE[-1][1]
+
+# --- run simulation   -------------------------------------------------------
+
+def simulate(options,policy_config):
+  """ simulate until the battery is empty, return (days,wakes,modes) """
+
+  with tempfile.TemporaryDirectory() as tmpdir:
+    filename = os.path.join(tmpdir,"state_store.bin")
+    charge = options.capacity
+    now    = START
+    wakes  = 0
+    modes  = {}
+    while charge > 0:
+      store  = StateStore(FileMemory(filename))   # like a real wake
+      policy = WakePolicy(policy_config,store)
+      policy.record(voltage(charge/options.capacity),now)
+      mode  = policy.mode()
+      modes[mode] = modes.get(mode,0) + 1
+      slot  = policy.next_slot(TIME_TABLE,now)
+      store.commit()
+      charge -= options.wake + options.sleep/1000*(slot-now)/3600
+      now    = slot
+      wakes += 1
+  return ((now-START)/86400,wakes,modes)
+
+# --- cmdline-parser   ------------------------------------------------------
+
+def get_parser():
+  """ configure cmdline-parser """
+
+  parser = ArgumentParser(description='simulate wake-policy')
+  parser.add_argument('-c', '--capacity', type=float, default=1200,
+                      help='battery capacity in mAh (default: 1200)')
+  parser.add_argument('-w', '--wake', type=float, default=1.0,
+                      help='charge per wake in mAh (default: 1.0)')
+  parser.add_argument('-s', '--sleep', type=float, default=30,
+                      help='deep-sleep current in uA (default: 30)')
+  parser.add_argument('-p', '--policy', default=None,
+                      help='policy as json (default: built-in example)')
+  return parser
+
+# --- main program   ---------------------------------------------------------
+
+if __name__ == '__main__':
+  os.environ["TZ"] = "UTC"
+  time.tzset()
+  options = get_parser().parse_args()
+  policy = json.loads(options.policy) if options.policy else POLICY
+  for name,config in [("time-table",{}),("wake-policy",policy)]:
+    days,wakes,modes = simulate(options,config)
+    print(f"{name:12s} runtime: {days:6.1f} days, refreshes: {wakes:5d}, "
+          f"modes: {modes}")